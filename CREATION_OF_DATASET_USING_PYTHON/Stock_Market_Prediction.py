@@ -1,12 +1,45 @@
 import pandas as pd
 import numpy as np
+import argparse
+import gzip
+import io
+import json
 import os
-import random
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
-# reproducibility
-np.random.seed(42)
-random.seed(42)
+
+# Seeding scheme. Nothing uses global random state: every random stream
+# comes from one root seed through numpy's SeedSequence, keyed by
+#
+#     SeedSequence(seed, spawn_key=(crc32(dataset), crc32(market), position))
+#
+# where position is the company's place in the universe (indices and
+# macro series use their name instead). A company's rows therefore
+# depend only on the seed, the dataset, the market and its position,
+# not on how many companies are generated, in what order or in how many
+# blocks, so any slice of a universe can be regenerated on its own.
+SEED = 42
+
+# Companies whose price paths are built together as one array block.
+COMPANY_BLOCK = 256
+
+# Sharded mode: companies per shard. This, not the worker count, fixes
+# which companies land in which part file.
+SHARD_COMPANIES = 100
+
+# Rows generated and flushed to disk at a time; peak memory follows
+# this, not the size of the output.
+CHUNK_ROWS = 1_000_000
+
+OUTPUT_FORMATS = {
+    "csv": ".csv",
+    "csv.gz": ".csv.gz",
+    "parquet": ".parquet"
+}
+
+MARKETS = ["NSE", "BSE"]
 
 # base directory
 base_dir = "stock_market_dataset"
@@ -22,9 +55,6 @@ folders = [
     "logs"
 ]
 
-for folder in folders:
-    os.makedirs(os.path.join(base_dir, folder), exist_ok=True)
-
 start_date = datetime(2015, 1, 1)
 end_date = datetime(2026, 2, 1)
 
@@ -133,86 +163,215 @@ sector_growth = {
 
 trading_days = 252
 
+# Lowest one-day price factor; keeps a path positive on extreme draws
+# (the price floor of 5 then applies to the emitted bars).
+MIN_FACTOR = 0.05
 
-def generate_stock_prices(market):
 
-    data = []
+def stream(seed, dataset, *key):
 
-    for company in companies:
+    # Independent generator for one dataset and entity (see SEED).
+    return np.random.default_rng(
+        np.random.SeedSequence(
+            seed,
+            spawn_key=tuple(
+                part if isinstance(part, int) else zlib.crc32(str(part).encode())
+                for part in (dataset, *key)
+            )
+        )
+    )
 
-        sector = company_sector_map[company]
 
-        volatility = sector_volatility[sector]
+def company_blocks(companies, size=COMPANY_BLOCK, offset=0):
 
-        annual_growth = sector_growth[sector]
+    # (positions, companies) in blocks; offset is the universe position
+    # of companies[0].
+    for start in range(0, len(companies), size):
 
-        daily_growth = annual_growth / trading_days
+        block = companies[start:start + size]
 
-        price = random.uniform(100, 2500)
+        yield list(range(offset + start, offset + start + len(block))), block
 
-        for date in dates:
 
-            drift = price * daily_growth
+def chunk_companies(dates, chunk_rows=CHUNK_ROWS):
 
-            shock = price * np.random.normal(0, volatility)
+    # Companies per chunk so that a chunk holds about chunk_rows rows
+    # (one company's full history at the least).
+    return max(1, chunk_rows // max(1, len(dates)))
 
-            open_price = price + shock
 
-            close_price = open_price + price * np.random.normal(0, volatility)
+class ChunkWriter:
 
-            high_price = max(open_price, close_price) * random.uniform(1.001, 1.02)
+    # Appends DataFrame chunks to one file, so a dataset never has to be
+    # held in memory whole. csv.gz is written with a fixed header time,
+    # so reruns produce identical bytes; parquet needs pyarrow.
 
-            low_price = min(open_price, close_price) * random.uniform(0.98, 0.999)
+    def __init__(self, path, output_format="csv"):
 
-            open_price = max(open_price, 5)
-            close_price = max(close_price, 5)
-            high_price = max(high_price, open_price, close_price)
-            low_price = max(min(low_price, open_price, close_price), 5)
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format: {output_format}")
 
-            data.append([
-             date,
-             market,
-             company,
-             round(open_price, 2),
-             round(high_price, 2),
-             round(low_price, 2),
-             round(close_price, 2)
-            ])
+        self.path = path + OUTPUT_FORMATS[output_format]
+        self.output_format = output_format
+        self.rows = 0
 
+        self.handle = None
+        self.parquet = None
 
-            price = close_price + drift
+        if output_format == "csv":
+            self.handle = open(self.path, "w", newline="")
 
-    df = pd.DataFrame(
-        data,
-        columns=[
-                  "date",
-                  "market",
-                  "company",
-                  "open",
-                  "high",
-                  "low",
-                  "close"
-                ])
+        elif output_format == "csv.gz":
+            self.handle = io.TextIOWrapper(
+                gzip.GzipFile(self.path, "wb", mtime=0),
+                newline=""
+            )
 
-    return df
+    def write(self, df):
 
+        if self.output_format == "parquet":
 
-nse = generate_stock_prices("NSE")
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise RuntimeError("The parquet format needs pyarrow installed")
 
-bse = generate_stock_prices("BSE")
+            table = pa.Table.from_pandas(df, preserve_index=False)
 
+            if self.parquet is None:
+                self.parquet = pq.ParquetWriter(self.path, table.schema)
 
-nse.to_csv(
-    f"{base_dir}/raw_data/nse_prices.csv",
-    index=False
-)
+            self.parquet.write_table(table)
 
-bse.to_csv(
-    f"{base_dir}/raw_data/bse_prices.csv",
-    index=False
-)
+        else:
+            df.to_csv(self.handle, header=self.rows == 0, index=False)
+
+        self.rows += len(df)
+
+    def close(self):
+
+        if self.handle is not None:
+            self.handle.close()
+
+        if self.parquet is not None:
+            self.parquet.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_dataset(chunks, path, output_format="csv"):
+
+    with ChunkWriter(path, output_format) as writer:
+
+        for df in chunks:
+            writer.write(df)
+
+    return writer.rows
+
+
+def make_universe(size):
+
+    # The 50 listed companies first, then synthetic tickers spread
+    # evenly over the same sectors, for datasets of any size.
+
+    universe = list(companies[:size])
+    sector_map = {
+        company: company_sector_map[company]
+        for company in universe
+    }
+
+    sectors = list(sector_volatility)
+
+    for number in range(len(universe), size):
+
+        company = f"SYN{number + 1:05d}"
+
+        universe.append(company)
+        sector_map[company] = sectors[number % len(sectors)]
+
+    return universe, sector_map
+
+
+def price_block(market, companies, positions, dates, sector_map, seed=SEED):
+
+    # One block of companies as (companies, days) arrays. Each company's
+    # shocks are drawn in one call from its own stream; the price path is
+    # then a cumulative product over days:
+    #     open_t  = price_t * (1 + e_open)
+    #     close_t = open_t + price_t * e_close
+    #     price_t+1 = close_t + price_t * daily_growth
+    # with high/low spread around the open-close range.
+
+    days = len(dates)
+
+    volatility = np.array([sector_volatility[sector_map[company]] for company in companies])[:, None]
+    growth = np.array([sector_growth[sector_map[company]] for company in companies])[:, None] / trading_days
 
-print("✅ NSE and BSE datasets generated successfully")
+    start = np.empty((len(companies), 1))
+    open_shock = np.empty((len(companies), days))
+    close_shock = np.empty((len(companies), days))
+    high_factor = np.empty((len(companies), days))
+    low_factor = np.empty((len(companies), days))
+
+    for row, position in enumerate(positions):
+
+        rng = stream(seed, "prices", market, position)
+
+        start[row] = rng.uniform(100, 2500)
+        open_shock[row] = rng.normal(0, 1, days)
+        close_shock[row] = rng.normal(0, 1, days)
+        high_factor[row] = rng.uniform(1.001, 1.02, days)
+        low_factor[row] = rng.uniform(0.98, 0.999, days)
+
+    open_shock *= volatility
+    close_shock *= volatility
+
+    factor = np.maximum(1 + open_shock + close_shock + growth, MIN_FACTOR)
+
+    price = np.empty_like(factor)
+    price[:, 0] = 1
+    np.cumprod(factor[:, :-1], axis=1, out=price[:, 1:])
+    price *= start
+
+    open_price = price * (1 + open_shock)
+    close_price = open_price + price * close_shock
+
+    high_price = np.maximum(open_price, close_price) * high_factor
+    low_price = np.minimum(open_price, close_price) * low_factor
+
+    open_price = np.maximum(open_price, 5)
+    close_price = np.maximum(close_price, 5)
+    high_price = np.maximum(high_price, np.maximum(open_price, close_price))
+    low_price = np.maximum(np.minimum(low_price, np.minimum(open_price, close_price)), 5)
+
+    return pd.DataFrame({
+        "date": np.tile(dates.values, len(companies)),
+        "market": market,
+        "company": np.repeat(companies, days),
+        "open": open_price.ravel().round(2),
+        "high": high_price.ravel().round(2),
+        "low": low_price.ravel().round(2),
+        "close": close_price.ravel().round(2)
+    })
+
+
+def price_chunks(market, companies, dates, sector_map, seed=SEED, offset=0, size=COMPANY_BLOCK):
+
+    for positions, block in company_blocks(companies, size, offset):
+        yield price_block(market, block, positions, dates, sector_map, seed)
+
+
+def generate_stock_prices(market, companies=companies, dates=dates, sector_map=company_sector_map, seed=SEED, offset=0):
+
+    return pd.concat(
+        price_chunks(market, companies, dates, sector_map, seed, offset),
+        ignore_index=True
+    )
 
 
 
@@ -239,39 +398,37 @@ index_config = {
     }
 }
 
-global_data = []
-
 trading_days_per_year = 252
 
-for idx, cfg in index_config.items():
 
-    value = random.uniform(cfg["start"][0], cfg["start"][1])
+def generate_global_indices(dates=dates, seed=SEED):
 
-    daily_growth = cfg["annual_growth"] / trading_days_per_year
+    # value_t = value_t-1 * (1 + daily_growth) + noise_t, solved for all
+    # days at once: discount every shock back to day 0, cumsum, and
+    # compound forward again.
 
-    for i, date in enumerate(dates):
+    steps = np.arange(1, len(dates) + 1)
 
-        noise = np.random.normal(0, cfg["daily_volatility"])
+    frames = []
 
-        growth = value * daily_growth
+    for idx, cfg in index_config.items():
 
-        value = value + noise + growth
+        rng = stream(seed, "global_indices", idx)
 
-        global_data.append([
-            date,
-            idx,
-            round(value, 2)
-        ])
+        value = rng.uniform(cfg["start"][0], cfg["start"][1])
+        noise = rng.normal(0, cfg["daily_volatility"], len(dates))
 
-pd.DataFrame(
-    global_data,
-    columns=["date", "index", "value"]
-).to_csv(
-    f"{base_dir}/raw_data/global_indices.csv",
-    index=False
-)
+        growth = 1 + cfg["annual_growth"] / trading_days_per_year
+
+        values = growth ** steps * (value + np.cumsum(noise * growth ** -steps))
+
+        frames.append(pd.DataFrame({
+            "date": dates.values,
+            "index": idx,
+            "value": values.round(2)
+        }))
 
-print("✅ Realistic Global Indices Generated Successfully")
+    return pd.concat(frames, ignore_index=True)
 
 
 sector_pe_range = {
@@ -301,45 +458,39 @@ sector_roe_range = {
     "Auto": (10, 22)
 }
 
-fundamentals = []
-
-for company in companies:
-
-    sector = company_sector_map[company]
-
-    pe_low, pe_high = sector_pe_range[sector]
-    de_low, de_high = sector_de_range[sector]
-    roe_low, roe_high = sector_roe_range[sector]
-
-    pe = round(random.uniform(pe_low, pe_high), 2)
-    de = round(random.uniform(de_low, de_high), 2)
-    roe = round(random.uniform(roe_low, roe_high), 2)
-
-    fundamentals.append([
-        company,
-        sector,
-        pe,
-        de,
-        roe
-    ])
-
-fundamentals_df = pd.DataFrame(
-    fundamentals,
-    columns=[
-        "company",
-        "sector",
-        "pe_ratio",
-        "debt_equity",
-        "roe"
-    ]
-)
 
-fundamentals_df.to_csv(
-    f"{base_dir}/company_data/company_fundamentals.csv",
-    index=False
-)
+def generate_fundamentals(companies=companies, sector_map=company_sector_map, seed=SEED, offset=0):
+
+    fundamentals = []
+
+    for position, company in enumerate(companies, start=offset):
 
-print("✅ Realistic Fundamentals Generated Successfully")
+        sector = sector_map[company]
+
+        rng = stream(seed, "fundamentals", position)
+
+        pe_low, pe_high = sector_pe_range[sector]
+        de_low, de_high = sector_de_range[sector]
+        roe_low, roe_high = sector_roe_range[sector]
+
+        fundamentals.append([
+            company,
+            sector,
+            round(rng.uniform(pe_low, pe_high), 2),
+            round(rng.uniform(de_low, de_high), 2),
+            round(rng.uniform(roe_low, roe_high), 2)
+        ])
+
+    return pd.DataFrame(
+        fundamentals,
+        columns=[
+            "company",
+            "sector",
+            "pe_ratio",
+            "debt_equity",
+            "roe"
+        ]
+    )
 
 
 sector_sentiment_bias = {
@@ -360,71 +511,58 @@ company_sentiment_bias = {
     "SBIN": 0.17
 }
 
-sentiment = []
-
-for company in companies:
 
-    sector = company_sector_map[company]
+def sentiment_block(companies, positions, dates, sector_map, seed=SEED):
 
-    sector_bias = sector_sentiment_bias[sector]
+    days = len(dates)
 
-    company_bias = company_sentiment_bias.get(company, random.uniform(0.02, 0.10))
+    cycle = 0.15 * np.sin(np.arange(days) / 250)
 
-    base_bias = sector_bias + company_bias
+    scores = np.empty((len(companies), days))
 
-    for i, date in enumerate(dates):
+    for row, (position, company) in enumerate(zip(positions, companies)):
 
-        cycle = 0.15 * np.sin(i / 250)
-        noise = random.uniform(-0.15, 0.15)
-        spike = 0
-        if random.random() < 0.04:
-            spike = random.uniform(-0.4, 0.6)
+        rng = stream(seed, "sentiment", position)
 
-        sentiment_score = (
-            base_bias +
-            cycle +
-            noise +
-            spike
-        )
+        company_bias = company_sentiment_bias.get(company, rng.uniform(0.02, 0.10))
 
-        sentiment_score = max(-1, min(1, sentiment_score))
+        base_bias = sector_sentiment_bias[sector_map[company]] + company_bias
 
-        sentiment.append([
-            date,
-            company,
-            round(sentiment_score, 3)
-        ])
+        noise = rng.uniform(-0.15, 0.15, days)
 
+        # News spikes on about 4% of days.
+        spike = np.where(
+            rng.random(days) < 0.04,
+            rng.uniform(-0.4, 0.6, days),
+            0
+        )
 
-sentiment_df = pd.DataFrame(
-    sentiment,
-    columns=["date", "company", "sentiment_score"]
-)
+        scores[row] = base_bias + cycle + noise + spike
 
-sentiment_df.to_csv(
-    f"{base_dir}/news_sentiment/daily_sentiment.csv",
-    index=False
-)
+    return pd.DataFrame({
+        "date": np.tile(dates.values, len(companies)),
+        "company": np.repeat(companies, days),
+        "sentiment_score": np.clip(scores, -1, 1).ravel().round(3)
+    })
 
-print("✅ Fixed Realistic Sentiment Generated Successfully")
 
-large_caps = ["RELIANCE", "HDFCBANK", "ICICIBANK", "TCS", "INFY", "SBIN"]
-mid_caps = ["AXISBANK", "KOTAKBANK", "NTPC", "POWERGRID", "HCLTECH", "WIPRO"]
-small_caps = list(set(companies) - set(large_caps) - set(mid_caps))
+def sentiment_chunks(companies, dates, sector_map, seed=SEED, offset=0, size=COMPANY_BLOCK):
 
-company_base_volume = {}
+    for positions, block in company_blocks(companies, size, offset):
+        yield sentiment_block(block, positions, dates, sector_map, seed)
 
-for company in companies:
 
-    if company in large_caps:
-        company_base_volume[company] = random.randint(8000000, 15000000)
+def generate_sentiment(companies=companies, dates=dates, sector_map=company_sector_map, seed=SEED, offset=0):
 
-    elif company in mid_caps:
-        company_base_volume[company] = random.randint(3000000, 7000000)
+    return pd.concat(
+        sentiment_chunks(companies, dates, sector_map, seed, offset),
+        ignore_index=True
+    )
 
-    else:
-        company_base_volume[company] = random.randint(500000, 2500000)
 
+large_caps = ["RELIANCE", "HDFCBANK", "ICICIBANK", "TCS", "INFY", "SBIN"]
+mid_caps = ["AXISBANK", "KOTAKBANK", "NTPC", "POWERGRID", "HCLTECH", "WIPRO"]
+small_caps = list(set(companies) - set(large_caps) - set(mid_caps))
 
 sector_multiplier = {
     "Finance": 1.5,
@@ -435,102 +573,357 @@ sector_multiplier = {
     "Auto": 1.0
 }
 
-volume = []
 
-for company in companies:
+def volume_block(companies, positions, dates, sector_map, seed=SEED):
 
-    base = company_base_volume[company]
+    days = len(dates)
 
-    sector = company_sector_map[company]
+    seasonal = 1 + 0.2 * np.sin(np.arange(days) / 200)
 
-    multiplier = sector_multiplier[sector]
+    volumes = np.empty((len(companies), days))
 
-    for i, date in enumerate(dates):
+    for row, (position, company) in enumerate(zip(positions, companies)):
 
-        seasonal = 1 + 0.2 * np.sin(i / 200)
+        rng = stream(seed, "volume", position)
 
-        noise = random.uniform(0.7, 1.3)
+        if company in large_caps:
+            base = rng.integers(8000000, 15000000, endpoint=True)
 
-        spike = 1
-        if random.random() < 0.02:
-            spike = random.uniform(1.5, 4)
+        elif company in mid_caps:
+            base = rng.integers(3000000, 7000000, endpoint=True)
 
-        daily_volume = int(
-            base *
-            multiplier *
-            seasonal *
-            noise *
-            spike
+        else:
+            base = rng.integers(500000, 2500000, endpoint=True)
+
+        noise = rng.uniform(0.7, 1.3, days)
+
+        # Volume spikes on about 2% of days.
+        spike = np.where(
+            rng.random(days) < 0.02,
+            rng.uniform(1.5, 4, days),
+            1
         )
 
-        volume.append([
-            date,
-            company,
-            daily_volume
-        ])
+        volumes[row] = base * sector_multiplier[sector_map[company]] * seasonal * noise * spike
 
+    return pd.DataFrame({
+        "date": np.tile(dates.values, len(companies)),
+        "company": np.repeat(companies, days),
+        "volume": volumes.ravel().astype(np.int64)
+    })
 
-volume_df = pd.DataFrame(
-    volume,
-    columns=["date", "company", "volume"]
-)
 
-volume_df.to_csv(
-    f"{base_dir}/trading_data/volumes.csv",
-    index=False
-)
+def volume_chunks(companies, dates, sector_map, seed=SEED, offset=0, size=COMPANY_BLOCK):
 
-print("✅ Realistic Volume Generated Successfully")
+    for positions, block in company_blocks(companies, size, offset):
+        yield volume_block(block, positions, dates, sector_map, seed)
 
 
-pd.DataFrame({
-    "column": ["open","close","sentiment_score","inflation"],
-    "description": [
-        "Opening price of stock",
-        "Closing price of stock",
-        "News sentiment score (-1 to 1)",
-        "Inflation percentage"
-    ]
-}).to_csv(f"{base_dir}/metadata/data_dictionary.csv", index=False)
+def generate_volume(companies=companies, dates=dates, sector_map=company_sector_map, seed=SEED, offset=0):
 
-with open(f"{base_dir}/logs/generation_log.txt", "w") as f:
-    f.write("Stock Market Dataset Generated Successfully")
+    return pd.concat(
+        volume_chunks(companies, dates, sector_map, seed, offset),
+        ignore_index=True
+    )
 
-print("✅ Dataset Generated Successfully")
 
+def clamped_walk(start, steps, low, high):
 
-macro_data = []
+    # Each step is clamped before the next one is added, so this stays a
+    # loop, but over one pre-drawn array instead of per-day RNG calls.
 
-inflation = 5.5
-interest_rate = 6.5
+    values = np.empty(len(steps))
+    value = start
 
-for i, date in enumerate(dates):
+    for i, step in enumerate(steps.tolist()):
 
-    inflation += np.random.normal(0, 0.02)
+        value = max(low, min(value + step, high))
+        values[i] = value
 
-    interest_rate += np.random.normal(0, 0.015)
+    return values
 
-    inflation = max(2.5, min(inflation, 9))
-    interest_rate = max(3.5, min(interest_rate, 10))
 
-    macro_data.append([
-        date,
-        round(inflation, 2),
-        round(interest_rate, 2)
-    ])
+def generate_macro(dates=dates, seed=SEED):
 
-macro_df = pd.DataFrame(
-    macro_data,
-    columns=[
-        "date",
-        "inflation",
-        "interest_rate"
-    ]
-)
+    rng = stream(seed, "macro")
+
+    inflation = clamped_walk(5.5, rng.normal(0, 0.02, len(dates)), 2.5, 9)
+    interest_rate = clamped_walk(6.5, rng.normal(0, 0.015, len(dates)), 3.5, 10)
+
+    return pd.DataFrame({
+        "date": dates.values,
+        "inflation": inflation.round(2),
+        "interest_rate": interest_rate.round(2)
+    })
+
+
+def company_datasets(markets=MARKETS):
+
+    # Company-level datasets by name, with their path under the output
+    # directory (no extension). In sharded mode each path is a directory
+    # of part-00000, part-00001, ... files; reading the parts in order
+    # gives the same rows as an unsharded run.
+
+    datasets = {
+        f"{market.lower()}_prices": f"raw_data/{market.lower()}_prices"
+        for market in markets
+    }
+
+    datasets["company_fundamentals"] = "company_data/company_fundamentals"
+    datasets["daily_sentiment"] = "news_sentiment/daily_sentiment"
+    datasets["volumes"] = "trading_data/volumes"
+
+    return datasets
+
+
+def write_company_data(paths, universe, sector_map, dates, seed=SEED, offset=0, markets=MARKETS, output_format="csv", chunk_rows=CHUNK_ROWS):
+
+    # Streams every company dataset to its path in chunks of about
+    # chunk_rows rows; returns the rows written per dataset.
+
+    size = chunk_companies(dates, chunk_rows)
+
+    chunks = {
+        f"{market.lower()}_prices": price_chunks(market, universe, dates, sector_map, seed, offset, size)
+        for market in markets
+    }
+
+    chunks["company_fundamentals"] = (
+        generate_fundamentals(block, sector_map, seed, positions[0])
+        for positions, block in company_blocks(universe, chunk_rows, offset)
+    )
+    chunks["daily_sentiment"] = sentiment_chunks(universe, dates, sector_map, seed, offset, size)
+    chunks["volumes"] = volume_chunks(universe, dates, sector_map, seed, offset, size)
+
+    return {
+        name: write_dataset(chunks[name], path, output_format)
+        for name, path in paths.items()
+    }
+
+
+def write_shard(output, shard, universe, sector_map, offset, dates, seed, markets, output_format, chunk_rows):
+
+    # Runs in a worker process. Every company draws from its own streams
+    # (keyed by its universe position), so a shard's files are the same
+    # whichever worker writes them and in whatever order.
+
+    paths = {
+        name: os.path.join(output, path, f"part-{shard:05d}")
+        for name, path in company_datasets(markets).items()
+    }
+
+    return write_company_data(
+        paths,
+        universe,
+        sector_map,
+        dates,
+        seed,
+        offset,
+        markets,
+        output_format,
+        chunk_rows
+    )
+
+
+def generate_sharded(
+    output,
+    size,
+    dates=dates,
+    seed=SEED,
+    workers=None,
+    shard_companies=SHARD_COMPANIES,
+    markets=MARKETS,
+    output_format="csv",
+    chunk_rows=CHUNK_ROWS
+):
+
+    universe, sector_map = make_universe(size)
+
+    datasets = company_datasets(markets)
+
+    for path in datasets.values():
+        os.makedirs(os.path.join(output, path), exist_ok=True)
+
+    shards = range(0, len(universe), shard_companies)
+
+    rows = dict.fromkeys(datasets, 0)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+
+        futures = [
+            executor.submit(
+                write_shard,
+                output,
+                shard,
+                universe[offset:offset + shard_companies],
+                {
+                    company: sector_map[company]
+                    for company in universe[offset:offset + shard_companies]
+                },
+                offset,
+                dates,
+                seed,
+                markets,
+                output_format,
+                chunk_rows
+            )
+            for shard, offset in enumerate(shards)
+        ]
+
+        for future in futures:
+
+            for name, count in future.result().items():
+                rows[name] += count
+
+    manifest = {
+        "seed": seed,
+        "companies": len(universe),
+        "shard_companies": shard_companies,
+        "shards": len(shards),
+        "start_date": str(dates[0].date()),
+        "end_date": str(dates[-1].date()),
+        "markets": list(markets),
+        "format": output_format,
+        "datasets": datasets,
+        "rows": rows
+    }
+
+    with open(os.path.join(output, "metadata", "shards.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"✅ {len(shards)} shards of {len(universe)} companies generated successfully")
+
+    return manifest
+
+
+def parse_args():
+
+    parser = argparse.ArgumentParser(
+        description="Generate the synthetic stock market dataset."
+    )
+
+    parser.add_argument("--output", default=base_dir)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument(
+        "--companies",
+        type=int,
+        default=len(companies),
+        help="universe size; synthetic tickers are added beyond the listed companies"
+    )
+    parser.add_argument("--start", default=start_date.strftime("%Y-%m-%d"))
+    parser.add_argument("--end", default=end_date.strftime("%Y-%m-%d"))
+    parser.add_argument(
+        "--markets",
+        default=",".join(MARKETS),
+        help="comma-separated markets, one price dataset each"
+    )
+    parser.add_argument("--format", choices=list(OUTPUT_FORMATS), default="csv")
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=CHUNK_ROWS,
+        help="rows generated and written at a time"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="generate company datasets as sharded part files in this many processes"
+    )
+    parser.add_argument("--shard-companies", type=int, default=SHARD_COMPANIES)
+
+    return parser.parse_args()
+
+
+def main():
+
+    args = parse_args()
+
+    output = args.output
+
+    universe_dates = pd.date_range(start=args.start, end=args.end, freq="B")
+
+    markets = [market.strip().upper() for market in args.markets.split(",") if market.strip()]
+
+    for folder in folders:
+        os.makedirs(os.path.join(output, folder), exist_ok=True)
+
+    if args.workers:
+
+        generate_sharded(
+            output,
+            args.companies,
+            universe_dates,
+            args.seed,
+            args.workers,
+            args.shard_companies,
+            markets,
+            args.format,
+            args.chunk_rows
+        )
+
+    else:
+
+        universe, sector_map = make_universe(args.companies)
+
+        rows = write_company_data(
+            {
+                name: os.path.join(output, path)
+                for name, path in company_datasets(markets).items()
+            },
+            universe,
+            sector_map,
+            universe_dates,
+            args.seed,
+            markets=markets,
+            output_format=args.format,
+            chunk_rows=args.chunk_rows
+        )
+
+        print(f"✅ {' and '.join(markets)} datasets generated successfully")
+
+        print("✅ Realistic Fundamentals Generated Successfully")
+
+        print("✅ Fixed Realistic Sentiment Generated Successfully")
+
+        print("✅ Realistic Volume Generated Successfully")
+
+        print(f"   {sum(rows.values())} company rows written")
+
+
+    write_dataset(
+        [generate_global_indices(universe_dates, args.seed)],
+        f"{output}/raw_data/global_indices",
+        args.format
+    )
+
+    print("✅ Realistic Global Indices Generated Successfully")
+
+
+    pd.DataFrame({
+        "column": ["open","close","sentiment_score","inflation"],
+        "description": [
+            "Opening price of stock",
+            "Closing price of stock",
+            "News sentiment score (-1 to 1)",
+            "Inflation percentage"
+        ]
+    }).to_csv(f"{output}/metadata/data_dictionary.csv", index=False)
+
+    with open(f"{output}/logs/generation_log.txt", "w") as f:
+        f.write("Stock Market Dataset Generated Successfully")
+
+    print("✅ Dataset Generated Successfully")
+
+
+    write_dataset(
+        [generate_macro(universe_dates, args.seed)],
+        f"{output}/macro_data/inflation_interest",
+        args.format
+    )
+
+    print("✅ Realistic Macro Data Generated Successfully")
 
-macro_df.to_csv(
-    f"{base_dir}/macro_data/inflation_interest.csv",
-    index=False
-)
 
-print("✅ Realistic Macro Data Generated Successfully")
+if __name__ == "__main__":
+    main()
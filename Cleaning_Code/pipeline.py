@@ -0,0 +1,665 @@
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import sys
+import time
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+RAW_PATH = os.path.join(BASE_DIR, "..", "stock_market_unclean_dataset")
+CLEAN_PATH = os.path.join(BASE_DIR, "..", "stock_market_clean_dataset_with_Feature_Eng")
+
+# Kept in the output directory: per stage, the hash of its inputs and
+# code that produced the current output, and the output's own hash.
+CACHE_FILE = ".pipeline_cache.json"
+
+
+# Stages. Each one is the cleaning notebook of the same name as a
+# function from its input DataFrames (keyed by input name) to the
+# cleaned DataFrame; the notebooks stay as the exploratory record.
+
+
+def clean_nse_prices(inputs):
+
+    # nse_price_cleaning.ipynb
+    df = inputs["nse_prices"]
+
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df.dropna(subset=["date"], inplace=True)
+    df.sort_values(by=["company", "date"], inplace=True)
+
+    df["company"] = df["company"].str.strip().str.upper()
+
+    df["close"] = df.groupby("company")["close"].ffill()
+    df["close"] = df.groupby("company")["close"].bfill()
+
+    df = df[(df["high"] >= df["low"]) &
+            (df["high"] >= df["open"]) &
+            (df["high"] >= df["close"]) &
+            (df["low"] <= df["open"]) &
+            (df["low"] <= df["close"])]
+
+    price_cols = ["open", "high", "low", "close"]
+    df = df[(df[price_cols] > 0).all(axis=1)]
+
+    df = df.drop_duplicates(subset=["date", "company"])
+
+    df = df[(df["open"] < df["open"].quantile(0.999)) &
+            (df["close"] < df["close"].quantile(0.999))]
+
+    df = df.reset_index(drop=True)
+
+    df = df.rename(columns={"date": "trade_date"})
+
+    return df[["trade_date", "company", "open", "high", "low", "close"]]
+
+
+def clean_volumes(inputs):
+
+    # volume_cleaning.ipynb
+    df = inputs["volumes"]
+
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df.dropna(subset=["date"], inplace=True)
+    df.sort_values(by=["company", "date"], inplace=True)
+
+    df["company"] = df["company"].str.strip().str.upper()
+
+    df = df[df["volume"] >= 0]
+
+    df = df.drop_duplicates(subset=["date", "company"])
+
+    df = df[df["volume"] < df["volume"].quantile(0.999)]
+
+    df = df.reset_index(drop=True)
+
+    df["avg_volume_7d"] = (
+        df.groupby("company")["volume"]
+        .rolling(7)
+        .mean()
+        .reset_index(level=0, drop=True)
+    )
+
+    df["volume_spike"] = df["volume"] > df["avg_volume_7d"]
+
+    df = df.dropna(subset=["avg_volume_7d"])
+
+    df["avg_volume_7d_million"] = (df["avg_volume_7d"] / 1_000_000).round(2)
+
+    df = df.rename(columns={"date": "trade_date"})
+
+    return df[[
+        "company",
+        "trade_date",
+        "volume",
+        "avg_volume_7d",
+        "avg_volume_7d_million",
+        "volume_spike"
+    ]]
+
+
+def clean_sentiment(inputs):
+
+    # news_sentiment.ipynb
+    df = inputs["daily_sentiment"]
+
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df.dropna(subset=["date"], inplace=True)
+
+    df["company"] = df["company"].str.strip().str.upper()
+
+    df = df[df["sentiment_score"].between(-1, 1)]
+
+    df = df.drop_duplicates()
+
+    df["sentiment_label"] = np.select(
+        [df["sentiment_score"] > 0, df["sentiment_score"] < 0],
+        ["Positive", "Negative"],
+        "Neutral"
+    )
+
+    df = df.rename(columns={"date": "trade_date"})
+
+    return df[["trade_date", "company", "sentiment_score", "sentiment_label"]]
+
+
+def clean_macro(inputs):
+
+    # macro_data_cleaning.ipynb
+    df = inputs["inflation_interest"]
+
+    df = df.rename(columns={"inflation": "inflation_rate"})
+
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df.dropna(subset=["date"], inplace=True)
+    df.sort_values(by="date", inplace=True)
+
+    df = df.dropna().drop_duplicates()
+
+    df = df[df["inflation_rate"] >= 0]
+
+    df = df.reset_index(drop=True)
+
+    df["real_interest_rate"] = df["interest_rate"] - df["inflation_rate"]
+    df["inflation_trend"] = df["inflation_rate"].diff()
+    df["interest_rate_trend"] = df["interest_rate"].diff()
+
+    df["macro_environment"] = np.where(df["real_interest_rate"] > 0, "Tight", "Loose")
+
+    df = df.dropna()
+
+    df = df.rename(columns={"date": "trade_date"})
+
+    return df[[
+        "trade_date",
+        "inflation_rate",
+        "interest_rate",
+        "real_interest_rate",
+        "inflation_trend",
+        "interest_rate_trend",
+        "macro_environment"
+    ]]
+
+
+def clean_global_indices(inputs):
+
+    # global_indices_cleaning.ipynb
+    df = inputs["global_indices"]
+
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df.dropna(subset=["date"], inplace=True)
+
+    df["index"] = df["index"].str.strip().str.upper()
+
+    df.sort_values(by=["index", "date"], inplace=True)
+    df = df.drop_duplicates(subset=["index", "date"])
+
+    df = df[df["value"] > 0]
+    df = df[df["value"] < df["value"].quantile(0.999)]
+
+    df = df.reset_index(drop=True)
+
+    df["index_return"] = df.groupby("index")["value"].pct_change()
+    df["volatility_7d"] = (
+        df.groupby("index")["index_return"]
+        .rolling(7)
+        .std()
+        .reset_index(level=0, drop=True)
+    )
+
+    # Drops each index's first week, before the returns below are taken
+    # again over the remaining rows.
+    df = df.dropna().sort_values(["index", "date"])
+
+    def rolling(column, window, how):
+
+        return (
+            getattr(df.groupby("index")[column].rolling(window), how)()
+            .reset_index(level=0, drop=True)
+        )
+
+    df["daily_return"] = df.groupby("index")["value"].pct_change()
+
+    df["return_7d"] = rolling("daily_return", 7, "mean")
+    df["return_21d"] = rolling("daily_return", 21, "mean")
+
+    df["volatility_7d"] = rolling("daily_return", 7, "std")
+    df["volatility_21d"] = rolling("daily_return", 21, "std")
+
+    df["ma_7"] = rolling("value", 7, "mean")
+    df["ma_21"] = rolling("value", 21, "mean")
+
+    df["trend_flag"] = (df["ma_7"] > df["ma_21"]).astype(int)
+
+    df["momentum"] = df["return_7d"] - df["return_21d"]
+
+    df["rolling_max"] = df.groupby("index")["value"].cummax()
+    df["drawdown"] = (df["value"] - df["rolling_max"]) / df["rolling_max"]
+
+    # Cut points come from the whole history, before incomplete 21-day
+    # windows are dropped.
+    low = df["volatility_21d"].quantile(0.20)
+    high = df["volatility_21d"].quantile(0.70)
+
+    df["Market_Volatility_Level"] = pd.cut(
+        df["volatility_21d"],
+        bins=[0, low, high, df["volatility_21d"].max()],
+        labels=["Low Volatility", "Medium Volatility", "High Volatility"]
+    )
+
+    df = df.dropna(subset=["return_21d", "volatility_21d", "ma_21"])
+
+    df = df.rename(columns={
+        "date": "trade_date",
+        "index": "index_name",
+        "value": "index_price",
+        "index_return": "index_daily_return_pct",
+        "return_7d": "avg_return_7d",
+        "return_21d": "avg_return_21d",
+        "volatility_7d": "volatility_7d_pct",
+        "volatility_21d": "volatility_21d_pct",
+        "ma_7": "moving_avg_7d",
+        "ma_21": "moving_avg_21d",
+        "momentum": "return_momentum",
+        "rolling_max": "all_time_high_till_date",
+        "drawdown": "drawdown_pct"
+    })
+
+    return df[[
+        "index_name",
+        "trade_date",
+        "index_price",
+        "index_daily_return_pct",
+        "avg_return_7d",
+        "avg_return_21d",
+        "volatility_7d_pct",
+        "volatility_21d_pct",
+        "moving_avg_7d",
+        "moving_avg_21d",
+        "trend_flag",
+        "return_momentum",
+        "all_time_high_till_date",
+        "drawdown_pct",
+        "Market_Volatility_Level"
+    ]]
+
+
+def clean_fundamentals(inputs):
+
+    # company_data_cleaning.ipynb
+    df = inputs["company_fundamentals"]
+
+    df = df.rename(columns={
+        "company": "company_name",
+        "sector": "business_sector",
+        "pe_ratio": "price_earnings_ratio",
+        "debt_equity": "debt_to_equity",
+        "roe": "return_on_equity"
+    })
+
+    df["company_name"] = df["company_name"].str.strip().str.upper()
+    df["business_sector"] = df["business_sector"].str.strip().str.title()
+
+    df = df[df["price_earnings_ratio"] > 0]
+    df = df[df["return_on_equity"] >= 0]
+    df = df[(df["price_earnings_ratio"] < 100) & (df["debt_to_equity"] < 10)]
+
+    df["performance"] = np.where(df["return_on_equity"] >= 15, "Good", "Average")
+
+    df = df.drop_duplicates()
+
+    df["valuation_type"] = pd.cut(
+        df["price_earnings_ratio"],
+        bins=[0, 15, 25, 100],
+        labels=["Undervalued", "Fair", "Overvalued"]
+    )
+
+    df["leverage_risk"] = np.where(df["debt_to_equity"] > 3, "High", "Low")
+
+    df["profitability_flag"] = np.where(df["return_on_equity"] > 20, 1, 0)
+
+    df["investment_grade"] = np.where(
+        (df["return_on_equity"] >= 15) & (df["debt_to_equity"] <= 3),
+        "Good",
+        "Risky"
+    )
+
+    return df
+
+
+# The DAG. Inputs are files under the raw directory, or "clean/<file>"
+# for another stage's output, which makes that stage a dependency.
+# Optional stages read raw files that are not shipped with the repo
+# (the generator writes raw_data/nse_prices.csv); without them the stage
+# is reported as missing instead of failing the run.
+STAGES = [
+    {
+        "name": "nse_prices",
+        "run": clean_nse_prices,
+        "inputs": {"nse_prices": "raw_data/nse_prices.csv"},
+        "output": "nse_prices.csv",
+        "optional": True
+    },
+    {
+        "name": "volumes",
+        "run": clean_volumes,
+        "inputs": {"volumes": "trading_data/volumes.csv"},
+        "output": "volumes.csv"
+    },
+    {
+        "name": "news_sentiment",
+        "run": clean_sentiment,
+        "inputs": {"daily_sentiment": "news_sentiment/daily_sentiment.csv"},
+        "output": "daily_sentiment.csv"
+    },
+    {
+        "name": "macro_data",
+        "run": clean_macro,
+        "inputs": {"inflation_interest": "macro_data/inflation_interest.csv"},
+        "output": "inflation_interest.csv"
+    },
+    {
+        "name": "global_indices",
+        "run": clean_global_indices,
+        "inputs": {"global_indices": "raw_data/global_indices.csv"},
+        "output": "global_indices.csv"
+    },
+    {
+        "name": "company_data",
+        "run": clean_fundamentals,
+        "inputs": {"company_fundamentals": "company_data/company_fundamentals.csv"},
+        "output": "company_fundamentals.csv"
+    }
+]
+
+STAGE_BY_NAME = {stage["name"]: stage for stage in STAGES}
+
+
+def file_hash(path, block_size=1 << 20):
+
+    digest = hashlib.sha1()
+
+    with open(path, "rb") as f:
+
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def input_path(stage_input, raw_path, clean_path):
+
+    if stage_input.startswith("clean/"):
+        return os.path.join(clean_path, stage_input[len("clean/"):])
+
+    return os.path.join(raw_path, stage_input)
+
+
+def dependencies(stage):
+
+    outputs = {other["output"]: other["name"] for other in STAGES}
+
+    return {
+        outputs[stage_input[len("clean/"):]]
+        for stage_input in stage["inputs"].values()
+        if stage_input.startswith("clean/")
+    }
+
+
+def stage_key(stage, raw_path, clean_path):
+
+    # Changes when an input file's content, the stage function's source
+    # or the pandas version changes; the pipeline's other code does not
+    # affect a stage's output.
+
+    digest = hashlib.sha1()
+
+    digest.update(inspect.getsource(stage["run"]).encode())
+    digest.update(pd.__version__.encode())
+
+    for name, stage_input in sorted(stage["inputs"].items()):
+
+        digest.update(name.encode())
+        digest.update(file_hash(input_path(stage_input, raw_path, clean_path)).encode())
+
+    return digest.hexdigest()
+
+
+def run_stage(name, raw_path, clean_path):
+
+    # Runs in a worker process. The output is written beside its final
+    # path and renamed into place, so an interrupted stage never leaves
+    # a half-written CSV behind.
+
+    stage = STAGE_BY_NAME[name]
+
+    start = time.perf_counter()
+
+    inputs = {
+        input_name: pd.read_csv(input_path(stage_input, raw_path, clean_path), low_memory=False)
+        for input_name, stage_input in stage["inputs"].items()
+    }
+
+    df = stage["run"](inputs)
+
+    output = os.path.join(clean_path, stage["output"])
+
+    df.to_csv(output + ".tmp", index=False)
+    os.replace(output + ".tmp", output)
+
+    return {
+        "rows": len(df),
+        "seconds": time.perf_counter() - start,
+        "output_hash": file_hash(output)
+    }
+
+
+def read_cache(clean_path):
+
+    try:
+        with open(os.path.join(clean_path, CACHE_FILE)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def write_cache(clean_path, cache):
+
+    path = os.path.join(clean_path, CACHE_FILE)
+
+    with open(path + ".tmp", "w") as f:
+        json.dump(cache, f, indent=2)
+
+    os.replace(path + ".tmp", path)
+
+
+def is_cached(stage, key, cache, clean_path):
+
+    # Up to date when it was built from the same inputs and code and its
+    # output has not been changed or removed since.
+
+    entry = cache.get(stage["name"])
+
+    output = os.path.join(clean_path, stage["output"])
+
+    return (
+        entry is not None
+        and entry["key"] == key
+        and os.path.exists(output)
+        and file_hash(output) == entry["output_hash"]
+    )
+
+
+def run_pipeline(raw_path=RAW_PATH, clean_path=CLEAN_PATH, names=None, workers=None, force=False):
+
+    # Runs the selected stages (all by default, plus whatever they depend
+    # on) in a process pool, each as soon as its dependencies are done.
+    # Stages whose cache key is unchanged are skipped; a stage with a
+    # missing input or a failed dependency is reported and skipped. An
+    # optional stage with missing raw input is "missing" instead.
+
+    selected = set(names or STAGE_BY_NAME)
+
+    unknown = selected - set(STAGE_BY_NAME)
+
+    if unknown:
+        raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+    pending = list(selected)
+
+    while pending:
+
+        for dependency in dependencies(STAGE_BY_NAME[pending.pop()]):
+
+            if dependency not in selected:
+                selected.add(dependency)
+                pending.append(dependency)
+
+    os.makedirs(clean_path, exist_ok=True)
+
+    cache = read_cache(clean_path)
+
+    remaining = {
+        stage["name"]: dependencies(stage)
+        for stage in STAGES
+        if stage["name"] in selected
+    }
+
+    results = {}
+    running = {}
+
+    def finish(name, status, **info):
+
+        results[name] = {"status": status, **info}
+
+        for waiting in remaining.values():
+            waiting.discard(name)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+
+        while remaining or running:
+
+            ready = [
+                name
+                for name, waiting in remaining.items()
+                if not waiting
+            ]
+
+            for name in ready:
+
+                del remaining[name]
+
+                stage = STAGE_BY_NAME[name]
+
+                failed = [
+                    dependency
+                    for dependency in dependencies(stage)
+                    if results[dependency]["status"] in ("failed", "skipped", "missing")
+                ]
+
+                missing = [
+                    stage_input
+                    for stage_input in stage["inputs"].values()
+                    if not os.path.exists(input_path(stage_input, raw_path, clean_path))
+                ]
+
+                if missing and not failed and stage.get("optional"):
+
+                    print(f"{name}: not built, optional input {', '.join(missing)} is not present")
+
+                    finish(name, "missing", inputs=missing)
+
+                    continue
+
+                if failed or missing:
+
+                    reason = f"needs {', '.join(failed or missing)}"
+
+                    print(f"❌ {name}: skipped, {reason}")
+
+                    finish(name, "skipped", reason=reason)
+
+                    continue
+
+                # Dependencies have finished, so their outputs can be
+                # hashed now.
+                key = stage_key(stage, raw_path, clean_path)
+
+                if not force and is_cached(stage, key, cache, clean_path):
+
+                    print(f"✅ {name}: up to date")
+
+                    finish(name, "cached")
+
+                    continue
+
+                running[executor.submit(run_stage, name, raw_path, clean_path)] = (name, key)
+
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+            for future in done:
+
+                name, key = running.pop(future)
+
+                try:
+                    result = future.result()
+
+                except Exception as e:
+
+                    print(f"❌ {name}: {e}")
+
+                    cache.pop(name, None)
+
+                    finish(name, "failed", error=str(e))
+
+                    continue
+
+                cache[name] = {
+                    "key": key,
+                    "output_hash": result["output_hash"],
+                    "rows": result["rows"],
+                    "built_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+                }
+
+                write_cache(clean_path, cache)
+
+                print(f"✅ {name}: {result['rows']} rows in {result['seconds']:.2f}s")
+
+                finish(name, "built", rows=result["rows"], seconds=result["seconds"])
+
+    return results
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Clean the raw stock market dataset into the feature-engineered CSVs."
+    )
+
+    parser.add_argument("--raw", default=RAW_PATH, help="raw dataset directory")
+    parser.add_argument("--out", default=CLEAN_PATH, help="directory for the cleaned CSVs")
+    parser.add_argument("--stages", default=None, help="comma-separated stage names; all by default")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="rebuild even when cached")
+    parser.add_argument("--list", action="store_true", help="print the stages and exit")
+
+    args = parser.parse_args()
+
+    if args.list:
+
+        for stage in STAGES:
+
+            inputs = ", ".join(stage["inputs"].values())
+
+            optional = " (optional)" if stage.get("optional") else ""
+
+            print(f"{stage['name']:<16}{inputs} -> {stage['output']}{optional}")
+
+        return
+
+    names = args.stages.split(",") if args.stages else None
+
+    for name in names or []:
+
+        if name not in STAGE_BY_NAME:
+            parser.error(f"unknown stage {name}; see --list")
+
+    results = run_pipeline(args.raw, args.out, names, args.workers, args.force)
+
+    if any(result["status"] in ("failed", "skipped") for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,37 @@
-
-
-from fastapi import FastAPI
+from fastapi import FastAPI, BackgroundTasks, Header
 from fastapi.middleware.cors import CORSMiddleware
-import pandas as pd
-import joblib
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.routing import APIRoute
+import contextvars
+import hmac
 import os
+import threading
+import time
+
+import numpy as np
+
+from feature_index import COLUMN_POSITION
+from features import validate_bar
+from bar_log import BarLog
+from batcher import MicroBatcher
+from metrics import registry, stage_timer
+from prediction_cache import PredictionCache
+from serving_state import ServingState, load_state, resolve_model_paths, watched_version
+from sharding import ShardedModel
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Models come from the registry written by train_model.py: the newest
+# version, or the one pinned by MODEL_VERSION. stock_model.pkl is used
+# while the registry is empty.
+MODEL_REGISTRY = os.environ.get("MODEL_REGISTRY", os.path.join(BASE_DIR, "registry"))
+MODEL_VERSION = os.environ.get("MODEL_VERSION", "latest")
+
+# MODEL_SHARDS points at a shard bundle from train_model.py --shard-by
+# to serve per-sector or per-company models instead.
+MODEL_SHARDS = os.environ.get("MODEL_SHARDS", "")
+
 MODEL_PATH = os.path.join(BASE_DIR, "stock_model.pkl")
 ENCODER_PATH = os.path.join(BASE_DIR, "company_encoder.pkl")
 
@@ -19,8 +42,104 @@ DATA_PATH = os.path.join(
     "nse_prices.csv"
 )
 
+SNAPSHOT_PATH = os.path.join(BASE_DIR, "feature_snapshot")
+
+# Cleaned sentiment, volume, macro and index CSVs for models trained
+# with train_model.py --store.
+FEATURE_STORE_PATH = os.environ.get(
+    "FEATURE_STORE_PATH",
+    os.path.join(BASE_DIR, "..", "stock_market_clean_dataset_with_Feature_Eng")
+)
+
+BAR_LOG_PATH = os.environ.get(
+    "BAR_LOG_PATH",
+    os.path.join(BASE_DIR, "ingested_bars.jsonl")
+)
+
+# Micro-batching of concurrent /predict calls; MICRO_BATCHING=0 disables it.
+MICRO_BATCHING = os.environ.get("MICRO_BATCHING", "1") != "0"
+BATCH_WINDOW_MS = float(os.environ.get("BATCH_WINDOW_MS", "2"))
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", "64"))
+
+# Prediction cache; PREDICTION_CACHE_SIZE=0 disables it.
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "4096"))
+PREDICTION_CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", "300"))
+
+# Model evaluation backend: "sklearn" or "compiled" (flattened NumPy forest).
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "sklearn")
+
+# Hot reload; RELOAD_POLL_SECONDS > 0 also watches the artifact files.
+RELOAD_POLL_SECONDS = float(os.environ.get("RELOAD_POLL_SECONDS", "0"))
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+# LOAD_ARTIFACTS=0 starts with an empty snapshot instead of loading the
+# files above on import, for callers (benchmark.py, tests) that install
+# their own state.
+LOAD_ARTIFACTS = os.environ.get("LOAD_ARTIFACTS", "1") != "0"
+
+
+current_endpoint = contextvars.ContextVar("current_endpoint", default="")
+
+
+class TimedJSONResponse(JSONResponse):
+
+    def render(self, content):
+
+        with stage_timer(current_endpoint.get(), "serialize"):
+            return super().render(content)
+
+
+class TimedRoute(APIRoute):
+
+    # Times the whole route handler, which includes running the endpoint
+    # and serialising its response, and counts requests by status.
+
+    def get_route_handler(self):
+
+        handler = super().get_route_handler()
+        endpoint = self.name
+
+        async def timed_handler(request):
+
+            token = current_endpoint.set(endpoint)
+            start = time.perf_counter()
+            status = 500
+
+            try:
+                response = await handler(request)
+                status = response.status_code
+                return response
+
+            finally:
+
+                current_endpoint.reset(token)
+
+                registry.observe(
+                    "stock_api_request_seconds",
+                    time.perf_counter() - start,
+                    endpoint=endpoint
+                )
+
+                registry.inc(
+                    "stock_api_requests_total",
+                    endpoint=endpoint,
+                    status=status
+                )
 
-app = FastAPI(title="Stock Market Prediction API")
+        return timed_handler
+
+
+app = FastAPI(
+    title="Stock Market Prediction API",
+    default_response_class=(
+        TimedJSONResponse
+        if registry.enabled
+        else JSONResponse
+    )
+)
+
+if registry.enabled:
+    app.router.route_class = TimedRoute
 
 
 app.add_middleware(
@@ -32,222 +151,762 @@ app.add_middleware(
 )
 
 
-model = None
-encoder = None
+bar_log = BarLog(BAR_LOG_PATH)
 
-try:
-    model = joblib.load(MODEL_PATH)
-    encoder = joblib.load(ENCODER_PATH)
+# Held while bars are written to the log and the engine, and while a
+# reload catches up on the log and swaps snapshots, so no bar can land
+# in a snapshot that is about to be replaced.
+ingest_lock = threading.Lock()
 
-    print("✅ Model and Encoder Loaded")
+def model_paths():
+
+    return resolve_model_paths(
+        MODEL_REGISTRY,
+        MODEL_VERSION,
+        MODEL_PATH,
+        ENCODER_PATH,
+        shards=MODEL_SHARDS
+    )
 
-except Exception as e:
-    print("❌ Model load error:", str(e))
 
+if LOAD_ARTIFACTS:
+    state = load_state(
+        *model_paths(),
+        DATA_PATH,
+        snapshot_path=SNAPSHOT_PATH,
+        bar_log=bar_log,
+        backend=INFERENCE_BACKEND,
+        store_path=FEATURE_STORE_PATH
+    )
+else:
+    state = ServingState(None, None, None, None)
 
-df = None
 
-try:
+prediction_cache = None
 
-    df = pd.read_csv(DATA_PATH)
+if PREDICTION_CACHE_SIZE > 0:
 
-    df["company"] = (
-        df["company"]
-        .astype(str)
-        .str.strip()
-        .str.upper()
+    prediction_cache = PredictionCache(
+        max_entries=PREDICTION_CACHE_SIZE,
+        ttl_seconds=PREDICTION_CACHE_TTL
     )
 
-    for col in ["open", "high", "low", "close"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
 
-    df["trade_date"] = pd.to_datetime(
-        df["trade_date"],
-        errors="coerce"
-    )
+reload_lock = threading.Lock()
 
-    df.dropna(inplace=True)
+reload_status = {
+    "reloading": False,
+    "last_reload": None,
+    "last_error": None,
+    "reloads": 0
+}
 
-    df = df.sort_values(
-        ["company", "trade_date"]
-    )
 
+def reload_state():
 
-    df["company_encoded"] = df["company"].apply(
-        lambda x:
-        encoder.transform([x])[0]
-        if x in encoder.classes_
-        else None
-    )
+    # Builds a complete new snapshot off to the side and only then
+    # rebinds the module global, so requests see either the old state
+    # or the new one and never anything in between.
+    global state
+
+    if not reload_lock.acquire(blocking=False):
+        return False
+
+    try:
+
+        reload_status["reloading"] = True
+
+        new_state = load_state(
+            *model_paths(),
+            DATA_PATH,
+            snapshot_path=SNAPSHOT_PATH,
+            bar_log=bar_log,
+            backend=INFERENCE_BACKEND,
+            strict=True,
+            store_path=FEATURE_STORE_PATH
+        )
+
+        with ingest_lock:
+
+            # Bars ingested while the new snapshot was being built.
+            bar_log.replay(new_state.engine)
+
+            state = new_state
+
+        if prediction_cache is not None:
+            prediction_cache.clear()
+
+        reload_status["last_reload"] = time.time()
+        reload_status["last_error"] = None
+        reload_status["reloads"] += 1
+
+        print("✅ Reloaded model version", new_state.version)
+
+        return True
+
+    except Exception as e:
+
+        reload_status["last_error"] = str(e)
+
+        print("❌ Reload error:", str(e))
+
+        return False
+
+    finally:
+
+        reload_status["reloading"] = False
+        reload_lock.release()
+
+
+def watch_artifacts():
+
+    while True:
+
+        time.sleep(RELOAD_POLL_SECONDS)
 
-    df.dropna(subset=["company_encoded"], inplace=True)
+        current = watched_version(
+            *model_paths(),
+            DATA_PATH,
+            SNAPSHOT_PATH,
+            FEATURE_STORE_PATH
+        )
 
-    df["prev_close"] = (
-        df.groupby("company")["close"]
-        .shift(1)
+        if current != state.version:
+            reload_state()
+
+
+if RELOAD_POLL_SECONDS > 0:
+
+    threading.Thread(
+        target=watch_artifacts,
+        name="artifact-watcher",
+        daemon=True
+    ).start()
+
+
+def cache_key(current, company, last_date, open_price, high_price, low_price, close_price):
+
+    # Cache keys carry the snapshot version and the date of the feature
+    # row being scored (read with it by engine.latest), so entries
+    # computed against an older model, encoder, dataset or feature state
+    # can never be returned.
+    return (
+        current.version,
+        company,
+        last_date,
+        open_price,
+        high_price,
+        low_price,
+        close_price
     )
 
-    df["ma_5"] = (
-        df.groupby("company")["close"]
-        .rolling(5)
-        .mean()
-        .reset_index(0, drop=True)
+
+def predict_rows(current, rows):
+
+    return current.predictor(rows)
+
+
+def prediction_values(prediction):
+
+    # One float per horizon, as a tuple the cache can hold.
+    return tuple(
+        float(value)
+        for value in np.atleast_1d(prediction)
     )
 
-    df["ma_10"] = (
-        df.groupby("company")["close"]
-        .rolling(10)
-        .mean()
-        .reset_index(0, drop=True)
+
+def trend(prediction, close_price):
+
+    return (
+        "UP"
+        if prediction > close_price
+        else "DOWN"
     )
 
-    df["volatility"] = df["high"] - df["low"]
 
-    df.dropna(inplace=True)
+def forecast(current, values, close_price):
+
+    # Top-level prediction and trend are the shortest horizon, exactly
+    # as for a single-horizon model. Multi-horizon models also return
+    # every horizon, all from the same inference call.
+
+    body = {
+
+        "prediction":
+        round(values[0], 2),
+
+        "trend":
+        trend(values[0], close_price)
+    }
+
+    if len(current.horizons) > 1:
+
+        body["horizons"] = {
+            f"{horizon}d": {
+                "prediction": round(value, 2),
+                "trend": trend(value, close_price)
+            }
+            for horizon, value in zip(current.horizons, values)
+        }
+
+    return body
+
+
+def predict_queued(items):
+
+    # Items are (snapshot, row) pairs. Rows queued across a reload are
+    # scored by the snapshot they were submitted with.
+    predictions = [None] * len(items)
+    groups = {}
 
-    print("✅ Dataset Loaded Successfully")
+    for position, (current, row) in enumerate(items):
 
-except Exception as e:
+        group = groups.setdefault(id(current), (current, [], []))
+        group[1].append(position)
+        group[2].append(row)
 
-    print("❌ Dataset load error:", str(e))
+    for current, positions, rows in groups.values():
 
+        for position, prediction in zip(
+            positions,
+            predict_rows(current, rows)
+        ):
+            predictions[position] = prediction
+
+    return predictions
+
+
+batcher = None
+
+if MICRO_BATCHING:
+
+    batcher = MicroBatcher(
+        predict_queued,
+        max_batch_size=BATCH_MAX_SIZE,
+        max_wait_ms=BATCH_WINDOW_MS
+    )
 
 
 @app.get("/")
 def home():
 
+    current = state
+
     return {
         "status": "running",
-        "model_loaded": model is not None,
-        "dataset_loaded": df is not None
+        "model_loaded": current.model is not None,
+        "dataset_loaded": current.feature_index is not None
+    }
+
+
+
+@app.get("/stats")
+def stats():
+
+    current = state
+
+    return {
+        "version": current.version,
+        "model_version": current.model_version,
+        "shards":
+        current.model.loaded_shards()
+        if isinstance(current.model, ShardedModel)
+        else None,
+        "feature_store":
+        current.store.names
+        if current.store is not None
+        else None,
+        "batcher":
+        batcher.stats()
+        if batcher is not None
+        else None,
+        "cache":
+        prediction_cache.stats()
+        if prediction_cache is not None
+        else None
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+
+    current = state
+
+    # Only the serving snapshot's labels, not every version seen since
+    # startup.
+    registry.replace(
+        "stock_api_model_info",
+        1,
+        version=current.version,
+        model_version=current.model_version or "",
+        backend=INFERENCE_BACKEND,
+        model_loaded=current.model is not None
+    )
+
+    registry.set("stock_api_loaded_timestamp_seconds", current.loaded_at)
+
+    registry.set(
+        "stock_api_companies",
+        len(current.feature_index)
+        if current.feature_index is not None
+        else 0
+    )
+
+    registry.set("stock_api_reloads", reload_status["reloads"])
+
+    if batcher is not None:
+
+        batcher_stats = batcher.stats()
+
+        registry.set("stock_api_batcher_queue_depth", batcher_stats["queue_depth"])
+        registry.set("stock_api_batcher_batches", batcher_stats["batches"])
+        registry.set("stock_api_batcher_rows", batcher_stats["rows"])
+        registry.set("stock_api_batcher_mean_batch_size", batcher_stats["mean_batch_size"])
+
+    if prediction_cache is not None:
+
+        cache_stats = prediction_cache.stats()
+
+        for name in ["entries", "hits", "misses", "evictions", "expirations"]:
+            registry.set(f"stock_api_cache_{name}", cache_stats[name])
+
+    return registry.render()
+
 
 @app.get("/companies")
 def get_companies():
 
-    if df is None:
+    current = state
+
+    if current.feature_index is None:
         return {"error": "Dataset not loaded"}
 
-    return sorted(
-        df["company"].unique().tolist()
-    )
+    return sorted(current.feature_index.companies)
 
 
 @app.get("/latest/{company}")
 def latest_price(company: str):
 
-    if df is None:
+    current = state
+
+    if current.feature_index is None:
         return {"error": "Dataset not loaded"}
 
-    company = company.strip().upper()
+    with stage_timer("latest_price", "lookup"):
 
-    company_data = df[
-        df["company"] == company
-    ]
+        company = company.strip().upper()
 
-    if company_data.empty:
-        return {"error": "Company not found"}
+        latest, _ = current.engine.latest(company)
 
-    latest = company_data.iloc[-1]
+    if latest is None:
+        return {"error": "Company not found"}
 
     return {
 
         "company": company,
 
-        "open": float(latest["open"]),
+        "open": float(latest[COLUMN_POSITION["open"]]),
 
-        "high": float(latest["high"]),
+        "high": float(latest[COLUMN_POSITION["high"]]),
 
-        "low": float(latest["low"]),
+        "low": float(latest[COLUMN_POSITION["low"]]),
 
-        "close": float(latest["close"])
+        "close": float(latest[COLUMN_POSITION["close"]])
     }
 
 
 @app.post("/predict")
 def predict(data: dict):
 
-    if model is None or df is None:
+    current = state
+
+    if current.model is None or current.feature_index is None:
 
         return {
             "error":
             "Model or dataset not loaded"
         }
 
-    company = (
-        data.get("company", "")
-        .strip()
-        .upper()
-    )
+    with stage_timer("predict", "lookup"):
 
-    if company not in encoder.classes_:
+        company = (
+            data.get("company", "")
+            .strip()
+            .upper()
+        )
+
+        latest, last_date = (
+            current.engine.latest(company)
+            if company in current.supported
+            else (None, None)
+        )
+
+    if company not in current.supported:
 
         return {
             "error":
             "Company not supported"
         }
 
-    company_data = df[
-        df["company"] == company
-    ]
+    if latest is None:
 
-    latest = company_data.iloc[-1]
+        return {
+            "error":
+            "Company not found"
+        }
 
     open_price = float(data.get("open"))
     high_price = float(data.get("high"))
     low_price = float(data.get("low"))
     close_price = float(data.get("close"))
 
-    input_df = pd.DataFrame([{
+    with stage_timer("predict", "cache"):
 
-        "company_encoded":
-        latest["company_encoded"],
+        key = cache_key(
+            current,
+            company,
+            last_date,
+            open_price,
+            high_price,
+            low_price,
+            close_price
+        )
 
-        "open":
-        open_price,
+        prediction = (
+            prediction_cache.get(key)
+            if prediction_cache is not None
+            else None
+        )
 
-        "high":
-        high_price,
+    if prediction is None:
 
-        "low":
-        low_price,
+        with stage_timer("predict", "features"):
 
-        "close":
-        close_price,
+            row = current.feature_row(
+                company,
+                latest,
+                last_date,
+                open_price,
+                high_price,
+                low_price,
+                close_price
+            )
 
-        "prev_close":
-        latest["prev_close"],
+        if row is None:
 
-        "ma_5":
-        latest["ma_5"],
+            return {
+                "error":
+                "No feature store data for company"
+            }
 
-        "ma_10":
-        latest["ma_10"],
+        with stage_timer("predict", "model"):
 
-        "volatility":
-        high_price - low_price
+            if batcher is not None:
+                prediction = prediction_values(batcher.predict((current, row)))
+            else:
+                prediction = prediction_values(predict_rows(current, [row])[0])
 
-    }])
+        if prediction_cache is not None:
+            prediction_cache.put(key, prediction)
 
-    prediction = float(
-        model.predict(input_df)[0]
-    )
+    return {
 
-    trend = (
-        "UP"
-        if prediction > close_price
-        else "DOWN"
-    )
+        "company": company,
+
+        **forecast(current, prediction, close_price)
+    }
+
+
+@app.post("/predict/batch")
+def predict_batch(data: dict):
+
+    current = state
+
+    if current.model is None or current.feature_index is None:
+
+        return {
+            "error":
+            "Model or dataset not loaded"
+        }
+
+    items = data.get("items")
+
+    if not isinstance(items, list):
+
+        return {
+            "error":
+            "items must be a list"
+        }
+
+    results = []
+    rows = []
+    pending = []
+
+    for item in items:
+
+        if isinstance(item, str):
+            item = {"company": item}
+
+        if not isinstance(item, dict):
+
+            results.append({"error": "Invalid item"})
+            continue
+
+        company = (
+            str(item.get("company", ""))
+            .strip()
+            .upper()
+        )
+
+        if company not in current.supported:
+
+            results.append({
+                "company": company,
+                "error": "Company not supported"
+            })
+            continue
+
+        latest, last_date = current.engine.latest(company)
+
+        if latest is None:
+
+            results.append({
+                "company": company,
+                "error": "Company not found"
+            })
+            continue
+
+        # OHLC fields not supplied fall back to the latest known bar.
+        try:
+
+            ohlc = [
+                float(item[col])
+                if item.get(col) is not None
+                else float(latest[COLUMN_POSITION[col]])
+                for col in ["open", "high", "low", "close"]
+            ]
+
+        except (TypeError, ValueError):
+
+            results.append({
+                "company": company,
+                "error": "Invalid price value"
+            })
+            continue
+
+        key = cache_key(current, company, last_date, *ohlc)
+
+        prediction = (
+            prediction_cache.get(key)
+            if prediction_cache is not None
+            else None
+        )
+
+        if prediction is None:
+
+            row = current.feature_row(company, latest, last_date, *ohlc)
+
+            if row is None:
+
+                results.append({
+                    "company": company,
+                    "error": "No feature store data for company"
+                })
+                continue
+
+            rows.append(row)
+            pending.append((len(results), key))
+
+        results.append((company, ohlc[3], prediction))
+
+    if rows:
+
+        with stage_timer("predict_batch", "model"):
+            predictions = predict_rows(current, rows)
+
+        for (position, key), prediction in zip(pending, predictions):
+
+            company, close_price, _ = results[position]
+            prediction = prediction_values(prediction)
+
+            results[position] = (company, close_price, prediction)
+
+            if prediction_cache is not None:
+                prediction_cache.put(key, prediction)
+
+    for position, result in enumerate(results):
+
+        if isinstance(result, dict):
+            continue
+
+        company, close_price, prediction = result
+
+        results[position] = {
+
+            "company": company,
+
+            **forecast(current, prediction, close_price)
+        }
 
     return {
+        "count": len(results),
+        "results": results
+    }
 
-        "company": company,
 
-        "prediction":
-        round(prediction, 2),
+@app.post("/admin/reload")
+def admin_reload(
+    background_tasks: BackgroundTasks,
+    wait: bool = False,
+    x_admin_token: str = Header(default="")
+):
 
-        "trend":
-        trend
+    # Disabled unless ADMIN_TOKEN is set; the API allows any origin.
+    if not ADMIN_TOKEN:
+
+        return JSONResponse(
+            {"error": "Admin reload is disabled; set ADMIN_TOKEN"},
+            status_code=403
+        )
+
+    if not hmac.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+
+        return JSONResponse(
+            {"error": "Invalid admin token"},
+            status_code=401
+        )
+
+    if reload_lock.locked():
+
+        return {
+            "status": "already reloading",
+            "version": state.version
+        }
+
+    if wait:
+
+        reloaded = reload_state()
+
+        return {
+            "status":
+            "reloaded"
+            if reloaded
+            else "failed",
+            "version": state.version,
+            "error": reload_status["last_error"]
+        }
+
+    background_tasks.add_task(reload_state)
+
+    return {
+        "status": "reloading",
+        "version": state.version
+    }
+
+
+@app.get("/admin/reload")
+def admin_reload_status():
+
+    return {
+        "version": state.version,
+        **reload_status
+    }
+
+
+@app.post("/bars")
+def ingest_bars(data: dict):
+
+    current = state
+
+    if current.engine is None:
+        return {"error": "Dataset not loaded"}
+
+    bars = data.get("bars", [data] if "company" in data else None)
+
+    if not isinstance(bars, list):
+
+        return {
+            "error":
+            "bars must be a list"
+        }
+
+    results = []
+    valid = []
+
+    for bar in bars:
+
+        try:
+            bar = validate_bar(bar)
+        except ValueError as e:
+            results.append({"error": str(e)})
+            continue
+
+        if bar["company"] not in current.supported:
+
+            results.append({
+                "company": bar["company"],
+                "error": "Company not supported"
+            })
+            continue
+
+        valid.append((len(results), bar))
+        results.append(None)
+
+    valid.sort(key=lambda item: item[1]["trade_date"])
+
+    with ingest_lock:
+
+        # A reload may have swapped snapshots while this request waited.
+        current = state
+
+        newer = current.engine.newer_bars([bar for _, bar in valid])
+
+        accepted = [
+            bar
+            for (_, bar), is_newer in zip(valid, newer)
+            if is_newer
+        ]
+
+        # Logged (and fsynced) before the engine sees them, so a bar that
+        # /predict can use is always durable, and a failed write leaves
+        # the served state untouched.
+        try:
+            bar_log.append(accepted)
+        except OSError as e:
+
+            print("❌ Bar log error:", str(e))
+
+            return {"error": "Could not write the bar log"}
+
+        for (position, bar), is_newer in zip(valid, newer):
+
+            if is_newer:
+
+                current.engine.update(
+                    bar["company"],
+                    bar["trade_date"],
+                    bar["open"],
+                    bar["high"],
+                    bar["low"],
+                    bar["close"]
+                )
+
+                results[position] = {
+                    "company": bar["company"],
+                    "trade_date": bar["trade_date"],
+                    "status": "accepted"
+                }
+
+            else:
+
+                results[position] = {
+                    "company": bar["company"],
+                    "trade_date": bar["trade_date"],
+                    "error": "Bar is not newer than the latest bar"
+                }
+
+    return {
+        "accepted": len(accepted),
+        "rejected": len(results) - len(accepted),
+        "results": results
     }
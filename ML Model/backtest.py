@@ -0,0 +1,241 @@
+import json
+import os
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from sklearn.metrics import mean_absolute_error, r2_score
+
+from features import FEATURES
+from train_model import build_model
+
+
+# Set once per worker process by _init_worker, so the feature matrix
+# is sent to each worker once instead of once per fold.
+_data = {}
+
+
+def walk_forward_folds(dates, folds=8, mode="expanding", window=None, min_train=0.5, gap=1):
+
+    # Splits the sorted unique trade dates into `folds` contiguous test
+    # blocks after an initial training period. Expanding folds train on
+    # everything before the block; rolling folds on the last `window`
+    # trading days before it. The `gap` trading days right before each
+    # block are purged from training: a row's target is the close its
+    # horizon ahead, so without the gap the last training labels would
+    # be test-window prices. gap must be at least the longest target
+    # horizon (1 for "target").
+
+    dates = np.unique(dates)
+
+    start = max(int(len(dates) * min_train), 1)
+    blocks = np.array_split(np.arange(start, len(dates)), folds)
+
+    if window is None:
+        window = start
+
+    result = []
+
+    for block in blocks:
+
+        if not len(block):
+            continue
+
+        train_end = block[0] - 1 - gap
+
+        if train_end < 0:
+            continue
+
+        train_from = 0 if mode == "expanding" else max(0, train_end - window + 1)
+
+        result.append({
+            "train_start": dates[train_from],
+            "train_end": dates[train_end],
+            "test_start": dates[block[0]],
+            "test_end": dates[block[-1]]
+        })
+
+    return result
+
+
+def directional_accuracy(close, actual, predicted):
+
+    return float(np.mean((predicted > close) == (actual > close)))
+
+
+def _init_worker(X, y, dates):
+
+    _data["X"] = X
+    _data["y"] = y
+    _data["dates"] = dates
+
+
+def _run_fold(position, fold, params):
+
+    X = _data["X"]
+    y = _data["y"]
+    dates = _data["dates"]
+
+    train_rows = (dates >= fold["train_start"]) & (dates <= fold["train_end"])
+    test_rows = (dates >= fold["test_start"]) & (dates <= fold["test_end"])
+
+    start = time.perf_counter()
+
+    # Folds already run in parallel, so each forest uses one core.
+    model = build_model(**{**params, "n_jobs": 1})
+    model.fit(X[train_rows], y[train_rows])
+
+    predictions = model.predict(X[test_rows])
+
+    return position, np.flatnonzero(test_rows), predictions, time.perf_counter() - start
+
+
+def run_backtest(df, folds=8, mode="expanding", window=None, workers=None, params=None, gap=1):
+
+    df = df.sort_values(["trade_date", "company"])
+
+    X = df[FEATURES].to_numpy(dtype=np.float64)
+    y = df["target"].to_numpy(dtype=np.float64)
+    dates = df["trade_date"].to_numpy()
+    close = df["close"].to_numpy(dtype=np.float64)
+    companies = df["company"].to_numpy()
+
+    plan = walk_forward_folds(dates, folds=folds, mode=mode, window=window, gap=gap)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    workers = max(1, min(workers, len(plan)))
+
+    print(f"Running {len(plan)} {mode} folds on {workers} workers")
+
+    started = time.perf_counter()
+
+    results = [None] * len(plan)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(X, y, dates)
+    ) as executor:
+
+        futures = [
+            executor.submit(_run_fold, position, fold, params or {})
+            for position, fold in enumerate(plan)
+        ]
+
+        for future in futures:
+
+            position, rows, predictions, seconds = future.result()
+            results[position] = (rows, predictions, seconds)
+
+            print(f"Fold {position + 1}/{len(plan)} done in {seconds:.1f}s")
+
+    fold_reports = []
+    all_rows = []
+    all_predictions = []
+
+    for fold, (rows, predictions, seconds) in zip(plan, results):
+
+        fold_reports.append({
+            "train_start": str(fold["train_start"])[:10],
+            "train_end": str(fold["train_end"])[:10],
+            "test_start": str(fold["test_start"])[:10],
+            "test_end": str(fold["test_end"])[:10],
+            "train_rows": int(((dates >= fold["train_start"]) & (dates <= fold["train_end"])).sum()),
+            "test_rows": int(len(rows)),
+            "mae": float(mean_absolute_error(y[rows], predictions)),
+            "r2": float(r2_score(y[rows], predictions)),
+            "directional_accuracy": directional_accuracy(close[rows], y[rows], predictions),
+            "seconds": seconds
+        })
+
+        all_rows.append(rows)
+        all_predictions.append(predictions)
+
+    rows = np.concatenate(all_rows)
+    predictions = np.concatenate(all_predictions)
+
+    frame = pd.DataFrame({
+        "company": companies[rows],
+        "close": close[rows],
+        "actual": y[rows],
+        "predicted": predictions
+    })
+
+    company_reports = {}
+
+    for company, group in frame.groupby("company", sort=True):
+
+        company_reports[str(company)] = {
+            "rows": int(len(group)),
+            "mae": float(mean_absolute_error(group["actual"], group["predicted"])),
+            "r2": (
+                float(r2_score(group["actual"], group["predicted"]))
+                if len(group) > 1
+                else None
+            ),
+            "directional_accuracy": directional_accuracy(
+                group["close"].to_numpy(),
+                group["actual"].to_numpy(),
+                group["predicted"].to_numpy()
+            )
+        }
+
+    return {
+        "mode": mode,
+        "gap": gap,
+        "folds": fold_reports,
+        "companies": company_reports,
+        "overall": {
+            "rows": int(len(rows)),
+            "mae": float(mean_absolute_error(y[rows], predictions)),
+            "r2": float(r2_score(y[rows], predictions)),
+            "directional_accuracy": directional_accuracy(close[rows], y[rows], predictions)
+        },
+        "workers": workers,
+        "seconds": time.perf_counter() - started
+    }
+
+
+def print_report(report):
+
+    print("\nWALK-FORWARD RESULTS:")
+
+    for position, fold in enumerate(report["folds"], start=1):
+
+        print(
+            f"Fold {position}: test {fold['test_start']} → {fold['test_end']}"
+            f" | MAE {fold['mae']:.2f}"
+            f" | R2 {fold['r2']:.4f}"
+            f" | Direction {fold['directional_accuracy']:.2%}"
+        )
+
+    overall = report["overall"]
+
+    print("\nOverall MAE:", round(overall["mae"], 2))
+    print("Overall R2 Score:", round(overall["r2"], 4))
+    print("Overall Directional Accuracy:", f"{overall['directional_accuracy']:.2%}")
+
+    worst = sorted(
+        report["companies"].items(),
+        key=lambda item: item[1]["directional_accuracy"]
+    )[:5]
+
+    print("\nLowest directional accuracy:")
+
+    for company, result in worst:
+        print(f"{company}: {result['directional_accuracy']:.2%} (MAE {result['mae']:.2f})")
+
+    print(f"\nBacktest finished in {report['seconds']:.1f}s")
+
+
+def write_report(report, path):
+
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print("Backtest report written to", path)
@@ -0,0 +1,137 @@
+import queue
+import threading
+import time
+
+from concurrent.futures import Future
+
+
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+
+
+class MicroBatcher:
+
+    # Collects single-row prediction requests from many threads and
+    # scores them together. A batch is closed when it reaches
+    # max_batch_size rows or when max_wait_ms has passed since its
+    # first row arrived, whichever comes first.
+
+    def __init__(self, predict_fn, max_batch_size=64, max_wait_ms=2.0):
+
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self.requests = queue.Queue()
+        self.lock = threading.Lock()
+
+        self.batches = 0
+        self.rows = 0
+        self.errors = 0
+        self.largest_batch = 0
+        self.size_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+
+        self.worker = threading.Thread(
+            target=self._run,
+            name="micro-batcher",
+            daemon=True
+        )
+        self.worker.start()
+
+    def submit(self, row):
+
+        future = Future()
+        self.requests.put((row, future))
+
+        return future
+
+    def predict(self, row, timeout=None):
+
+        return self.submit(row).result(timeout)
+
+    def _run(self):
+
+        while True:
+
+            batch = [self.requests.get()]
+            deadline = time.perf_counter() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+
+                remaining = deadline - time.perf_counter()
+
+                try:
+
+                    if remaining > 0:
+                        batch.append(self.requests.get(timeout=remaining))
+                    else:
+                        batch.append(self.requests.get_nowait())
+
+                except queue.Empty:
+                    break
+
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+
+        rows = [row for row, _ in batch]
+
+        try:
+
+            predictions = self.predict_fn(rows)
+
+        except Exception as e:
+
+            with self.lock:
+                self.errors += 1
+
+            for _, future in batch:
+                future.set_exception(e)
+
+            return
+
+        for (_, future), prediction in zip(batch, predictions):
+            future.set_result(prediction)
+
+        self._record(len(batch))
+
+    def _record(self, size):
+
+        bucket = len(BATCH_SIZE_BUCKETS)
+
+        for position, bound in enumerate(BATCH_SIZE_BUCKETS):
+            if size <= bound:
+                bucket = position
+                break
+
+        with self.lock:
+
+            self.batches += 1
+            self.rows += size
+            self.largest_batch = max(self.largest_batch, size)
+            self.size_counts[bucket] += 1
+
+    def stats(self):
+
+        with self.lock:
+
+            histogram = {
+                str(bound): count
+                for bound, count in zip(BATCH_SIZE_BUCKETS, self.size_counts)
+            }
+            histogram["+Inf"] = self.size_counts[-1]
+
+            return {
+                "queue_depth": self.requests.qsize(),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "batches": self.batches,
+                "rows": self.rows,
+                "errors": self.errors,
+                "largest_batch": self.largest_batch,
+                "mean_batch_size": (
+                    self.rows / self.batches
+                    if self.batches
+                    else 0.0
+                ),
+                "batch_size_histogram": histogram
+            }
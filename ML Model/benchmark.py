@@ -0,0 +1,394 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from sklearn.preprocessing import LabelEncoder
+
+from feature_index import COLUMN_POSITION
+from features import (
+    FEATURES,
+    FeatureEngine,
+    add_features,
+    add_targets,
+    encoder_mapping,
+    load_prices
+)
+from inference import INFERENCE_BACKENDS, make_predictor
+from training_data import peak_rss_mb
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+GENERATOR_DIR = os.path.join(BASE_DIR, "..", "CREATION_OF_DATASET_USING_PYTHON")
+
+REPORT_PATH = os.path.join(BASE_DIR, "benchmark.json")
+
+SIZES = [50, 500, 5000]
+
+START_DATE = "2024-01-01"
+END_DATE = "2025-12-31"
+
+# Rows scored by the batch predict stage.
+BATCH_ROWS = 10_000
+
+
+def generate_prices(companies, start, end, seed, path):
+
+    # Synthetic NSE prices from the dataset generator, written in the
+    # cleaned CSV layout that training reads.
+
+    if GENERATOR_DIR not in sys.path:
+        sys.path.insert(0, GENERATOR_DIR)
+
+    import Stock_Market_Prediction as generator
+
+    universe, sector_map = generator.make_universe(companies)
+
+    df = generator.generate_stock_prices(
+        "NSE",
+        universe,
+        pd.date_range(start, end, freq="B"),
+        sector_map,
+        seed=seed
+    )
+
+    df.rename(columns={"date": "trade_date"}).drop(columns="market").to_csv(path, index=False)
+
+    return len(df)
+
+
+def percentiles(samples):
+
+    samples = np.asarray(samples) * 1000
+
+    return {
+        "count": int(len(samples)),
+        "mean_ms": float(samples.mean()),
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "p99_ms": float(np.percentile(samples, 99))
+    }
+
+
+@contextmanager
+def stage(stages, name):
+
+    # Wall time of the stage, and the process's peak RSS once it is done
+    # (a high-water mark, so it only grows from stage to stage).
+
+    result = {}
+    start = time.perf_counter()
+
+    yield result
+
+    result["seconds"] = time.perf_counter() - start
+    result["peak_rss_mb"] = peak_rss_mb()
+
+    stages[name] = result
+
+
+def api_client(model, encoder, engine, predictor, workdir):
+
+    # The real app, in process, serving the benchmark model. app.py is
+    # told not to load the repo's artifacts on import, and the benchmark
+    # snapshot is installed as /admin/reload would. The prediction cache
+    # is off so every request reaches the model.
+
+    os.environ["LOAD_ARTIFACTS"] = "0"
+    os.environ["PREDICTION_CACHE_SIZE"] = "0"
+    os.environ["RELOAD_POLL_SECONDS"] = "0"
+    os.environ["MODEL_REGISTRY"] = os.path.join(workdir, "registry")
+    os.environ["BAR_LOG_PATH"] = os.path.join(workdir, "ingested_bars.jsonl")
+
+    from fastapi.testclient import TestClient
+
+    import app
+    from serving_state import ServingState
+
+    app.state = ServingState(model, encoder, engine, "benchmark", predictor)
+
+    return TestClient(app.app), app.MICRO_BATCHING
+
+
+def run_universe(
+    companies,
+    start=START_DATE,
+    end=END_DATE,
+    seed=42,
+    params=None,
+    backend="sklearn",
+    repeat=500,
+    api_requests=500
+):
+
+    # One universe size, run in its own process so that peak RSS
+    # belongs to this size alone.
+
+    from train_model import build_model
+
+    workdir = tempfile.mkdtemp(prefix="stock_benchmark_")
+    csv_path = os.path.join(workdir, "nse_prices.csv")
+
+    stages = {}
+
+    try:
+
+        with stage(stages, "generate") as result:
+            result["rows"] = generate_prices(companies, start, end, seed, csv_path)
+            result["csv_mb"] = os.path.getsize(csv_path) / (1024 * 1024)
+
+        with stage(stages, "csv_load") as result:
+            df = load_prices(csv_path)
+            result["rows"] = int(len(df))
+
+        with stage(stages, "features") as result:
+
+            encoder = LabelEncoder()
+            df["company_encoded"] = encoder.fit_transform(df["company"])
+
+            engine = FeatureEngine.from_frame(df, encoder_mapping(encoder))
+
+            df = add_targets(add_features(df)).dropna()
+
+            X = df[FEATURES]
+            y = df["target"]
+
+            result["rows"] = int(len(X))
+
+        with stage(stages, "fit") as result:
+
+            model = build_model(**(params or {}))
+            model.fit(X, y)
+
+            result["trees"] = len(model.estimators_)
+
+        rows = X.iloc[-BATCH_ROWS:].to_numpy(dtype=np.float64)
+
+        predictor = make_predictor(model, backend, sample=rows[:256])
+
+        with stage(stages, "batch_predict") as result:
+
+            predictor(rows)
+
+            result["rows"] = int(len(rows))
+
+        result["rows_per_second"] = len(rows) / result["seconds"]
+
+        with stage(stages, "single_predict") as result:
+
+            timings = []
+
+            for position in range(repeat):
+
+                row = rows[position % len(rows)][None, :]
+
+                begin = time.perf_counter()
+                predictor(row)
+                timings.append(time.perf_counter() - begin)
+
+            result.update(percentiles(timings))
+
+        client, micro_batching = api_client(model, encoder, engine, predictor, workdir)
+
+        names = sorted(engine.index.companies)
+        rng = np.random.default_rng(seed)
+
+        with stage(stages, "api_predict") as result:
+
+            timings = []
+            errors = 0
+
+            for company in rng.choice(names, size=api_requests):
+
+                latest = engine.index.get(company)
+
+                payload = {
+                    "company": str(company),
+                    **{
+                        column: float(latest[COLUMN_POSITION[column]])
+                        for column in ["open", "high", "low", "close"]
+                    }
+                }
+
+                begin = time.perf_counter()
+                response = client.post("/predict", json=payload)
+                timings.append(time.perf_counter() - begin)
+
+                if response.status_code != 200 or "error" in response.json():
+                    errors += 1
+
+            result.update(percentiles(timings))
+            result["errors"] = errors
+            result["micro_batching"] = micro_batching
+
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "companies": companies,
+        "rows": stages["generate"]["rows"],
+        "stages": stages
+    }
+
+
+def git_commit():
+
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_result(result):
+
+    stages = result["stages"]
+
+    print(f"\n{result['companies']} companies, {result['rows']} rows")
+
+    for name, values in stages.items():
+
+        line = f"  {name:<15}{values['seconds']:>9.3f}s  peak RSS {values['peak_rss_mb'] or 0:>8.1f} MB"
+
+        if "p50_ms" in values:
+            line += f"  p50 {values['p50_ms']:.2f}ms p95 {values['p95_ms']:.2f}ms p99 {values['p99_ms']:.2f}ms"
+
+        if values.get("errors"):
+            line += f"  {values['errors']} errors"
+
+        if "rows_per_second" in values:
+            line += f"  {values['rows_per_second']:,.0f} rows/s"
+
+        print(line)
+
+
+def compare(report, baseline):
+
+    # Seconds per stage against an earlier report; > 1.00x is slower.
+
+    previous = {
+        result["companies"]: result["stages"]
+        for result in baseline["results"]
+    }
+
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'}:")
+
+    for result in report["results"]:
+
+        old = previous.get(result["companies"])
+
+        if old is None:
+            continue
+
+        for name, values in result["stages"].items():
+
+            if name not in old:
+                continue
+
+            print(
+                f"  {result['companies']:>6} {name:<15}"
+                f"{old[name]['seconds']:>9.3f}s -> {values['seconds']:>9.3f}s"
+                f"  {values['seconds'] / max(old[name]['seconds'], 1e-9):.2f}x"
+            )
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark training and inference on synthetic universes."
+    )
+
+    parser.add_argument(
+        "--sizes",
+        default=",".join(map(str, SIZES)),
+        help="comma-separated company counts"
+    )
+    parser.add_argument("--start", default=START_DATE)
+    parser.add_argument("--end", default=END_DATE)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--backend", choices=INFERENCE_BACKENDS, default="sklearn")
+    parser.add_argument("--repeat", type=int, default=500, help="single-row predictions timed")
+    parser.add_argument("--api-requests", type=int, default=500)
+    parser.add_argument("--output", default=REPORT_PATH)
+    parser.add_argument("--compare", default=None, help="earlier report to compare against")
+
+    args = parser.parse_args()
+
+    from train_model import load_model_params
+
+    params, _ = load_model_params()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "sizes": sizes,
+            "start": args.start,
+            "end": args.end,
+            "seed": args.seed,
+            "backend": args.backend,
+            "params": params,
+            "repeat": args.repeat,
+            "api_requests": args.api_requests
+        },
+        "results": []
+    }
+
+    for size in sizes:
+
+        print(f"Benchmarking {size} companies...")
+
+        # A fresh process per size keeps the peak RSS figures separate.
+        with ProcessPoolExecutor(max_workers=1) as executor:
+
+            result = executor.submit(
+                run_universe,
+                size,
+                args.start,
+                args.end,
+                args.seed,
+                params,
+                args.backend,
+                args.repeat,
+                args.api_requests
+            ).result()
+
+        report["results"].append(result)
+
+        print_result(result)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print("\nSaved benchmark report to", args.output)
+
+    if args.compare:
+
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
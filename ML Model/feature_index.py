@@ -0,0 +1,75 @@
+import numpy as np
+
+
+LATEST_COLUMNS = [
+    "company_encoded",
+    "prev_close",
+    "ma_5",
+    "ma_10",
+    "open",
+    "high",
+    "low",
+    "close"
+]
+
+COLUMN_POSITION = {
+    column: position
+    for position, column in enumerate(LATEST_COLUMNS)
+}
+
+
+class FeatureIndex:
+
+    # One float64 row per company holding its latest feature state,
+    # plus a dict from company name to row number, so lookups never
+    # touch the full price history.
+
+    def __init__(self, companies, values):
+
+        self.companies = list(companies)
+
+        self.values = np.ascontiguousarray(
+            values,
+            dtype=np.float64
+        )
+
+        self.positions = {
+            company: position
+            for position, company in enumerate(self.companies)
+        }
+
+    def get(self, company):
+
+        position = self.positions.get(company)
+
+        if position is None:
+            return None
+
+        # A copy: set() overwrites rows in place.
+        return self.values[position].copy()
+
+    def set(self, company, row):
+
+        position = self.positions.get(company)
+
+        if position is not None:
+            self.values[position] = row
+            return
+
+        # New companies get a fresh array. It is published before the
+        # position, so a concurrent reader never indexes past the end.
+        self.values = np.vstack([
+            self.values,
+            np.asarray(row, dtype=np.float64)[None, :]
+        ])
+
+        self.companies.append(company)
+        self.positions[company] = len(self.companies) - 1
+
+    def __contains__(self, company):
+
+        return company in self.positions
+
+    def __len__(self):
+
+        return len(self.companies)
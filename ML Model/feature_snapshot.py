@@ -0,0 +1,125 @@
+import json
+import os
+import time
+
+import numpy as np
+
+from feature_index import LATEST_COLUMNS
+from features import FeatureEngine, WINDOW, encoder_mapping
+
+
+# A snapshot is a directory of plain .npy files plus a small JSON
+# header. Plain .npy (not .npz) is what lets np.load memory-map them.
+# It holds the FeatureEngine state: the ring buffer of recent closes,
+# the last bar and last trade date for every company.
+COMPANIES_FILE = "companies.npy"
+CLASSES_FILE = "encoder_classes.npy"
+ARRAY_FILES = {
+    "closes": "closes.npy",
+    "heads": "heads.npy",
+    "counts": "counts.npy",
+    "bars": "bars.npy",
+    "dates": "dates.npy"
+}
+META_FILE = "meta.json"
+
+
+def source_signature(data_path):
+
+    # Size and modification time of the CSV the snapshot was built from.
+    # The path itself is left out, since training and serving may refer
+    # to the same file through different relative paths.
+    info = os.stat(data_path)
+
+    return {
+        "size": info.st_size,
+        "mtime_ns": info.st_mtime_ns
+    }
+
+
+def save_snapshot(path, engine, encoder, data_path):
+
+    os.makedirs(path, exist_ok=True)
+
+    # Drop the header first and write it last, so a snapshot that is
+    # interrupted half way is never picked up as valid.
+    meta_path = os.path.join(path, META_FILE)
+
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    np.save(
+        os.path.join(path, COMPANIES_FILE),
+        np.asarray(engine.companies, dtype=str)
+    )
+
+    np.save(
+        os.path.join(path, CLASSES_FILE),
+        np.asarray(encoder.classes_, dtype=str)
+    )
+
+    for name, filename in ARRAY_FILES.items():
+
+        array = getattr(engine, name)
+
+        if name == "dates":
+            array = array.astype("datetime64[ns]").view(np.int64)
+
+        np.save(
+            os.path.join(path, filename),
+            np.ascontiguousarray(array)
+        )
+
+    meta = {
+        "columns": LATEST_COLUMNS,
+        "window": WINDOW,
+        "companies": len(engine.companies),
+        "source": source_signature(data_path),
+        "created_at": time.time()
+    }
+
+    with open(meta_path, "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+def load_snapshot(path, encoder, data_path=None):
+
+    # Returns a FeatureEngine backed by copy-on-write memory maps, or
+    # None when the snapshot is missing or no longer matches the
+    # encoder or the source CSV.
+
+    meta_path = os.path.join(path, META_FILE)
+
+    if not os.path.exists(meta_path):
+        return None
+
+    with open(meta_path) as f:
+        meta = json.load(f)
+
+    if meta.get("columns") != LATEST_COLUMNS or meta.get("window") != WINDOW:
+        return None
+
+    if (
+        data_path is not None
+        and os.path.exists(data_path)
+        and meta.get("source") != source_signature(data_path)
+    ):
+        return None
+
+    classes = np.load(os.path.join(path, CLASSES_FILE))
+
+    if not np.array_equal(classes, np.asarray(encoder.classes_, dtype=str)):
+        return None
+
+    arrays = {
+        name: np.load(os.path.join(path, filename), mmap_mode="c")
+        for name, filename in ARRAY_FILES.items()
+    }
+
+    arrays["dates"] = arrays["dates"].view("datetime64[ns]")
+
+    return FeatureEngine(
+        encoder_mapping(encoder),
+        np.load(os.path.join(path, COMPANIES_FILE)).tolist(),
+        **arrays
+    )
@@ -0,0 +1,310 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# Cleaned auxiliary datasets joined onto the price rows by
+# (company, trade_date) with as-of semantics: each row gets the most
+# recent value known on its trade date. "exact" sources may use the
+# same day's value; global indices only the previous session's, since
+# the US markets close after the NSE.
+STORE_SOURCES = [
+    {
+        "name": "sentiment",
+        "file": "daily_sentiment.csv",
+        "company": True,
+        "columns": ["sentiment_score"],
+        "exact": True
+    },
+    {
+        "name": "volume",
+        "file": "volumes.csv",
+        "company": True,
+        "columns": ["volume", "avg_volume_7d", "volume_spike"],
+        "exact": True
+    },
+    {
+        "name": "macro",
+        "file": "inflation_interest.csv",
+        "company": False,
+        "columns": ["inflation_rate", "interest_rate", "real_interest_rate"],
+        "exact": True
+    },
+    {
+        "name": "global",
+        "file": "global_indices.csv",
+        "company": False,
+        "pivot": "index_name",
+        "columns": [
+            "index_daily_return_pct",
+            "avg_return_7d",
+            "volatility_7d_pct",
+            "drawdown_pct"
+        ],
+        "exact": False
+    }
+]
+
+# Company ids and day numbers packed into one sortable int64 key.
+_DAY_OFFSET = 1 << 31
+_COMPANY_SHIFT = 1 << 32
+
+
+def _days(dates):
+
+    return (
+        pd.to_datetime(dates, errors="coerce")
+        .to_numpy(dtype="datetime64[D]")
+        .astype(np.int64)
+    )
+
+
+class _Source:
+
+    # One source as sorted columnar arrays. Company sources are sorted
+    # by (company id, day) under a packed key; market sources by day.
+
+    def __init__(self, spec, columns, days, values, companies=None, codes=None):
+
+        self.spec = spec
+        self.name = spec["name"]
+        self.columns = columns
+        self.exact = spec["exact"]
+        self.values = values
+
+        self.companies = companies
+        self.days = days
+
+        if companies is None:
+            self.keys = days
+        else:
+            self.codes = codes
+            self.keys = codes * _COMPANY_SHIFT + days + _DAY_OFFSET
+
+    @classmethod
+    def read(cls, spec, path):
+
+        df = pd.read_csv(path, low_memory=False)
+
+        df["trade_date"] = pd.to_datetime(df["trade_date"], errors="coerce")
+
+        for column in spec["columns"]:
+
+            # Flags such as volume_spike come back as True/False text
+            # when the column also has blanks.
+            df[column] = pd.to_numeric(
+                df[column].replace({"True": 1, "False": 0}),
+                errors="coerce"
+            ).astype(np.float64)
+
+        df.dropna(subset=["trade_date"], inplace=True)
+
+        if spec.get("pivot"):
+
+            # One column per (index, feature); each index keeps its own
+            # last value on days the others traded and it did not.
+            df[spec["pivot"]] = df[spec["pivot"]].astype(str).str.strip()
+
+            wide = (
+                df.pivot_table(
+                    index="trade_date",
+                    columns=spec["pivot"],
+                    values=spec["columns"],
+                    aggfunc="last"
+                )
+                .sort_index()
+                .ffill()
+            )
+
+            columns = [
+                f"{index.lower()}_{column}"
+                for column, index in wide.columns
+            ]
+
+            return cls(
+                spec,
+                columns,
+                _days(wide.index),
+                wide.to_numpy(dtype=np.float64)
+            )
+
+        if not spec["company"]:
+
+            daily = (
+                df.groupby("trade_date", sort=True)[spec["columns"]]
+                .mean()
+            )
+
+            return cls(
+                spec,
+                list(spec["columns"]),
+                _days(daily.index),
+                daily.to_numpy(dtype=np.float64)
+            )
+
+        df["company"] = df["company"].astype(str).str.strip().str.upper()
+
+        # Several rows for one company and day (e.g. many headlines)
+        # are averaged.
+        daily = (
+            df.groupby(["company", "trade_date"], sort=True)[spec["columns"]]
+            .mean()
+            .reset_index()
+        )
+
+        companies, codes = np.unique(
+            daily["company"].to_numpy(dtype=str),
+            return_inverse=True
+        )
+
+        return cls(
+            spec,
+            list(spec["columns"]),
+            _days(daily["trade_date"]),
+            daily[spec["columns"]].to_numpy(dtype=np.float64),
+            companies=list(companies),
+            codes=codes.astype(np.int64)
+        )
+
+    def join(self, company_codes, days):
+
+        side = "right" if self.exact else "left"
+
+        if self.companies is None:
+
+            positions = np.searchsorted(self.keys, days, side=side) - 1
+            found = positions >= 0
+
+        else:
+
+            query = company_codes * _COMPANY_SHIFT + days + _DAY_OFFSET
+
+            positions = np.searchsorted(self.keys, query, side=side) - 1
+
+            found = (
+                (company_codes >= 0)
+                & (positions >= 0)
+            )
+
+            found[found] &= self.codes[positions[found]] == company_codes[found]
+
+        result = np.full((len(days), len(self.columns)), np.nan)
+        result[found] = self.values[positions[found]]
+
+        return result
+
+    def company_codes(self, companies):
+
+        if self.companies is None:
+            return None
+
+        return pd.Categorical(
+            companies,
+            categories=self.companies
+        ).codes.astype(np.int64)
+
+
+class FeatureStore:
+
+    # Precomputed, sorted columns for every available source. Training
+    # joins whole columns at once (one searchsorted per source); serving
+    # joins each company at its latest bar's date with the same rules,
+    # and keeps the result until that company's next bar.
+
+    def __init__(self, sources):
+
+        self.sources = sources
+
+        self.columns = [
+            column
+            for source in sources
+            for column in source.columns
+        ]
+
+        self.companies = sorted({
+            company
+            for source in sources
+            if source.companies is not None
+            for company in source.companies
+        })
+
+        # company -> (day, joined row) for the serving rows.
+        self.rows = {}
+
+    @classmethod
+    def load(cls, path, names=None):
+
+        sources = []
+
+        for spec in STORE_SOURCES:
+
+            if names is not None and spec["name"] not in names:
+                continue
+
+            file_path = os.path.join(path, spec["file"])
+
+            if not os.path.exists(file_path):
+                print(f"Feature store: {spec['file']} not found, skipping {spec['name']}")
+                continue
+
+            sources.append(_Source.read(spec, file_path))
+
+        return cls(sources)
+
+    @property
+    def names(self):
+
+        return [source.name for source in self.sources]
+
+    def join(self, companies, dates):
+
+        # As-of join of every source for parallel arrays of company
+        # names and trade dates; returns a (rows, len(columns)) array.
+        return self._join(np.asarray(companies), _days(dates))
+
+    def _join(self, companies, days):
+
+        blocks = [
+            source.join(source.company_codes(companies), days)
+            for source in self.sources
+        ]
+
+        if not blocks:
+            return np.empty((len(days), 0))
+
+        return np.hstack(blocks)
+
+    def prepare(self, companies, dates):
+
+        # Joins every company at its latest bar date in one pass, so
+        # serving starts with all rows built.
+
+        companies = np.asarray(companies)
+        days = _days(dates)
+
+        values = self._join(companies, days)
+
+        for company, day, row in zip(companies, days, values):
+            self.rows[company] = (day, row)
+
+    def latest(self, company, trade_date):
+
+        # The store values a training row for this company and date would
+        # get. Constant time while the company's last bar is unchanged;
+        # a new bar costs one join. None when a value is missing, e.g. a
+        # company no company source has seen.
+
+        day = _days([trade_date])[0]
+
+        cached = self.rows.get(company)
+
+        if cached is None or cached[0] != day:
+            cached = self.rows[company] = (day, self._join(np.array([company]), np.array([day]))[0])
+
+        row = cached[1]
+
+        if np.isnan(row).any():
+            return None
+
+        return row
@@ -0,0 +1,465 @@
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+from feature_index import FeatureIndex, LATEST_COLUMNS, COLUMN_POSITION
+
+
+FEATURES = [
+    "company_encoded",
+    "open",
+    "high",
+    "low",
+    "close",
+    "prev_close",
+    "ma_5",
+    "ma_10",
+    "volatility"
+]
+
+PRICE_COLUMNS = ["open", "high", "low", "close"]
+
+# Longest look-back of any feature (ma_10).
+WINDOW = 10
+
+# Trading days ahead forecast by train_model.py --horizons.
+HORIZONS = [1, 5, 20]
+
+
+def clean_prices(df):
+
+    # Shared by training, the API and the CLI so all three read the
+    # cleaned CSV the same way. trade_date is ISO formatted by
+    # nse_price_cleaning.ipynb, so no dayfirst guessing is needed.
+
+    df = df[df["company"] != "company"].copy()
+
+    df["company"] = (
+        df["company"]
+        .astype(str)
+        .str.strip()
+        .str.upper()
+    )
+
+    for col in PRICE_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    df["trade_date"] = pd.to_datetime(
+        df["trade_date"],
+        errors="coerce"
+    )
+
+    df.dropna(
+        subset=["company", "trade_date"] + PRICE_COLUMNS,
+        inplace=True
+    )
+
+    df.sort_values(["company", "trade_date"], inplace=True)
+
+    df.reset_index(drop=True, inplace=True)
+
+    return df
+
+
+def load_prices(data_path):
+
+    return clean_prices(
+        pd.read_csv(data_path, low_memory=False)
+    )
+
+
+def encoder_mapping(encoder):
+
+    return {
+        company: code
+        for code, company in enumerate(encoder.classes_)
+    }
+
+
+def encode_companies(df, encoder):
+
+    # Same codes as encoder.transform, via one dict lookup per row
+    # instead of a transform call per row. Unknown companies are dropped.
+    df["company_encoded"] = df["company"].map(encoder_mapping(encoder))
+
+    df.dropna(subset=["company_encoded"], inplace=True)
+
+    return df
+
+
+def add_features(df):
+
+    # Bulk mode, used for training: the full-history groupby/rolling
+    # computation. df must be sorted by company and trade_date.
+
+    df["prev_close"] = df.groupby("company")["close"].shift(1)
+
+    df["ma_5"] = (
+        df.groupby("company")["close"]
+        .rolling(5)
+        .mean()
+        .reset_index(0, drop=True)
+    )
+
+    df["ma_10"] = (
+        df.groupby("company")["close"]
+        .rolling(10)
+        .mean()
+        .reset_index(0, drop=True)
+    )
+
+    df["volatility"] = df["high"] - df["low"]
+
+    return df
+
+
+def target_columns(horizons):
+
+    # "target" stays the next-day close, which the backtest, tuning and
+    # shard training use.
+    return [
+        "target" if horizon == 1 else f"target_{horizon}d"
+        for horizon in horizons
+    ]
+
+
+def add_targets(df, horizons=(1,)):
+
+    # Close `horizon` trading days ahead for every horizon, from one
+    # groupby over the sorted frame.
+
+    closes = df.groupby("company")["close"]
+
+    for horizon, column in zip(horizons, target_columns(horizons)):
+        df[column] = closes.shift(-horizon)
+
+    return df
+
+
+def validate_bar(bar):
+
+    # Per-bar version of the OHLC rules in nse_price_cleaning.ipynb.
+    # Returns the normalised bar or raises ValueError.
+
+    if not isinstance(bar, dict):
+        raise ValueError("Invalid bar")
+
+    company = str(bar.get("company") or "").strip().upper()
+
+    if not company:
+        raise ValueError("Missing company")
+
+    trade_date = pd.to_datetime(bar.get("trade_date"), errors="coerce")
+
+    if pd.isna(trade_date):
+        raise ValueError("Invalid trade_date")
+
+    try:
+        open_price, high_price, low_price, close_price = [
+            float(bar[col])
+            for col in PRICE_COLUMNS
+        ]
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Invalid price value")
+
+    if not all(
+        math.isfinite(price) and price > 0
+        for price in [open_price, high_price, low_price, close_price]
+    ):
+        raise ValueError("Prices must be positive")
+
+    if not (
+        high_price >= low_price
+        and high_price >= open_price
+        and high_price >= close_price
+        and low_price <= open_price
+        and low_price <= close_price
+    ):
+        raise ValueError("Inconsistent OHLC values")
+
+    return {
+        "company": company,
+        "trade_date": trade_date.strftime("%Y-%m-%d"),
+        "open": open_price,
+        "high": high_price,
+        "low": low_price,
+        "close": close_price
+    }
+
+
+def feature_row(latest, open_price, high_price, low_price, close_price):
+
+    # Model input in FEATURES order for a company's latest feature state
+    # (a FeatureIndex row) and the bar being scored.
+    return [
+        latest[COLUMN_POSITION["company_encoded"]],
+        open_price,
+        high_price,
+        low_price,
+        close_price,
+        latest[COLUMN_POSITION["prev_close"]],
+        latest[COLUMN_POSITION["ma_5"]],
+        latest[COLUMN_POSITION["ma_10"]],
+        high_price - low_price
+    ]
+
+
+class FeatureEngine:
+
+    # Incremental mode. Each company owns one row of a few small arrays:
+    # a ring buffer of its last WINDOW closes, its last OHLC bar and its
+    # last trade date. Appending a bar touches only that row, so updates
+    # cost the same however much history is behind them. The latest
+    # complete feature rows are kept in a FeatureIndex for serving.
+
+    def __init__(
+        self,
+        mapping,
+        companies,
+        closes,
+        heads,
+        counts,
+        bars,
+        dates
+    ):
+
+        self.mapping = mapping
+        self.companies = list(companies)
+
+        self.positions = {
+            company: position
+            for position, company in enumerate(self.companies)
+        }
+
+        self.closes = closes
+        self.heads = heads
+        self.counts = counts
+        self.bars = bars
+        self.dates = dates
+
+        self.lock = threading.Lock()
+
+        self.index = self._build_index()
+
+    @classmethod
+    def empty(cls, mapping):
+
+        return cls(
+            mapping,
+            [],
+            np.empty((0, WINDOW), dtype=np.float64),
+            np.empty(0, dtype=np.int64),
+            np.empty(0, dtype=np.int64),
+            np.empty((0, len(PRICE_COLUMNS)), dtype=np.float64),
+            np.empty(0, dtype="datetime64[ns]")
+        )
+
+    @classmethod
+    def from_frame(cls, df, mapping):
+
+        # Seeds the buffers from the last WINDOW bars of each company.
+        # df must be cleaned, sorted and limited to known companies.
+
+        tail = df.groupby("company", sort=True).tail(WINDOW)
+
+        companies, inverse = np.unique(
+            tail["company"].to_numpy(dtype=str),
+            return_inverse=True
+        )
+
+        slots = tail.groupby("company", sort=True).cumcount().to_numpy()
+
+        counts = np.bincount(
+            inverse,
+            minlength=len(companies)
+        ).astype(np.int64)
+
+        closes = np.full((len(companies), WINDOW), np.nan)
+        closes[inverse, slots] = tail["close"].to_numpy(dtype=np.float64)
+
+        last = tail.groupby("company", sort=True).tail(1)
+
+        return cls(
+            mapping,
+            companies.tolist(),
+            closes,
+            counts % WINDOW,
+            counts,
+            last[PRICE_COLUMNS].to_numpy(dtype=np.float64),
+            last["trade_date"].to_numpy(dtype="datetime64[ns]")
+        )
+
+    def _chronological(self, closes, heads):
+
+        order = (heads[:, None] + np.arange(WINDOW)) % WINDOW
+
+        return np.take_along_axis(closes, order, axis=1)
+
+    def _rows(self, positions):
+
+        window = self._chronological(
+            self.closes[positions],
+            self.heads[positions]
+        )
+
+        encoded = np.array(
+            [self.mapping[self.companies[p]] for p in positions],
+            dtype=np.float64
+        )
+
+        columns = {
+            "company_encoded": encoded,
+            "prev_close": window[:, -2],
+            "ma_5": window[:, -5:].mean(axis=1),
+            "ma_10": window.mean(axis=1),
+            "open": self.bars[positions, 0],
+            "high": self.bars[positions, 1],
+            "low": self.bars[positions, 2],
+            "close": self.bars[positions, 3]
+        }
+
+        return np.column_stack(
+            [columns[column] for column in LATEST_COLUMNS]
+        )
+
+    def _build_index(self):
+
+        complete = np.flatnonzero(self.counts >= WINDOW)
+
+        return FeatureIndex(
+            [self.companies[p] for p in complete],
+            self._rows(complete).reshape(len(complete), len(LATEST_COLUMNS))
+        )
+
+    def _add_company(self, company):
+
+        # Growing the arrays copies them, which only happens the first
+        # time a company is seen.
+        self.closes = np.vstack([self.closes, np.full((1, WINDOW), np.nan)])
+        self.heads = np.append(self.heads, 0)
+        self.counts = np.append(self.counts, 0)
+        self.bars = np.vstack([self.bars, np.full((1, len(PRICE_COLUMNS)), np.nan)])
+        self.dates = np.append(self.dates, np.datetime64("NaT", "ns"))
+
+        self.companies.append(company)
+        self.positions[company] = len(self.companies) - 1
+
+        return self.positions[company]
+
+    def last_date(self, company):
+
+        position = self.positions.get(company)
+
+        if position is None:
+            return None
+
+        return self.dates[position]
+
+    def latest(self, company):
+
+        # The company's feature row and last bar date, read together
+        # under the lock update() holds, so a row is never half written
+        # and the date always belongs to the row. (None, None) for a
+        # company without a complete row.
+
+        with self.lock:
+
+            row = self.index.get(company)
+
+            if row is None:
+                return None, None
+
+            return row, self.dates[self.positions[company]]
+
+    def newer_bars(self, bars):
+
+        # For bars in the order they would be applied, whether update()
+        # would accept each one (earlier bars of the batch included),
+        # without changing the engine.
+
+        latest = {}
+        accepted = []
+
+        for bar in bars:
+
+            company = bar["company"]
+            trade_date = np.datetime64(pd.Timestamp(bar["trade_date"]), "ns")
+
+            if company not in self.mapping:
+                accepted.append(False)
+                continue
+
+            if company not in latest:
+                last = self.last_date(company)
+                latest[company] = None if last is None or np.isnat(last) else last
+
+            newer = latest[company] is None or trade_date > latest[company]
+
+            if newer:
+                latest[company] = trade_date
+
+            accepted.append(newer)
+
+        return accepted
+
+    def update(self, company, trade_date, open_price, high_price, low_price, close_price):
+
+        # Appends one bar. Returns False when the company is not known
+        # to the encoder or the bar is not newer than the last one seen.
+
+        if company not in self.mapping:
+            return False
+
+        trade_date = np.datetime64(pd.Timestamp(trade_date), "ns")
+
+        with self.lock:
+
+            position = self.positions.get(company)
+
+            if position is None:
+                position = self._add_company(company)
+
+            elif not np.isnat(self.dates[position]) and trade_date <= self.dates[position]:
+                return False
+
+            head = self.heads[position]
+
+            self.closes[position, head] = close_price
+            self.heads[position] = (head + 1) % WINDOW
+            self.counts[position] = min(self.counts[position] + 1, WINDOW)
+            self.bars[position] = [open_price, high_price, low_price, close_price]
+            self.dates[position] = trade_date
+
+            if self.counts[position] >= WINDOW:
+
+                window = self._chronological(
+                    self.closes[position:position + 1],
+                    self.heads[position:position + 1]
+                )[0]
+
+                latest = {
+                    "company_encoded": float(self.mapping[company]),
+                    "prev_close": window[-2],
+                    "ma_5": math.fsum(window[-5:]) / 5,
+                    "ma_10": math.fsum(window) / WINDOW,
+                    "open": open_price,
+                    "high": high_price,
+                    "low": low_price,
+                    "close": close_price
+                }
+
+                self.index.set(
+                    company,
+                    [latest[column] for column in LATEST_COLUMNS]
+                )
+
+        return True
+
+
+def build_feature_engine(data_path, encoder):
+
+    df = encode_companies(load_prices(data_path), encoder)
+
+    return FeatureEngine.from_frame(df, encoder_mapping(encoder))
@@ -0,0 +1,213 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from sklearn.metrics import mean_absolute_error
+
+from features import FEATURES
+from train_model import build_model
+
+
+INCREMENTAL_STRATEGIES = ["replace", "warm_start"]
+
+
+def _day(value):
+
+    return str(np.datetime64(value, "D"))
+
+
+def initial_state(model, dates, params):
+
+    # Registered with every fully trained model. Each tree is tagged
+    # with the last trade date of the rows it was fit on, so
+    # incremental runs know which trees are oldest.
+
+    last_date = _day(np.max(dates))
+
+    return {
+        "last_date": last_date,
+        "params": params,
+        "tree_dates": [last_date] * len(model.estimators_),
+        "updates": []
+    }
+
+
+def _frame(X):
+
+    return pd.DataFrame(X, columns=FEATURES, copy=False)
+
+
+def update_model(
+    model,
+    state,
+    X,
+    y,
+    dates,
+    strategy="replace",
+    window_days=250,
+    trees_per_day=5,
+    max_trees=None
+):
+
+    # Folds in every trade date newer than state["last_date"], one day at
+    # a time, by fitting trees_per_day new trees on the trailing
+    # window_days trading days:
+    #   replace     retire the oldest trees_per_day trees, so the forest
+    #               keeps its size and slowly rolls forward in time;
+    #   warm_start  grow the forest with sklearn's warm_start and trim
+    #               the oldest trees once it exceeds max_trees.
+    # Returns the number of new days applied; model and state are
+    # updated in place.
+
+    if strategy not in INCREMENTAL_STRATEGIES:
+        raise ValueError(f"Unknown incremental strategy: {strategy}")
+
+    if max_trees is None:
+        max_trees = len(model.estimators_)
+
+    dates = np.asarray(dates, dtype="datetime64[D]")
+
+    all_days = np.unique(dates)
+    new_days = all_days[all_days > np.datetime64(state["last_date"], "D")]
+
+    params = state.get("params") or {}
+
+    for day in new_days:
+
+        position = np.searchsorted(all_days, day)
+        start = all_days[max(0, position - window_days + 1)]
+
+        rows = (dates >= start) & (dates <= day)
+
+        if strategy == "warm_start":
+
+            model.set_params(
+                warm_start=True,
+                n_estimators=len(model.estimators_) + trees_per_day
+            )
+            model.fit(_frame(X[rows]), y[rows])
+            model.set_params(warm_start=False)
+
+        else:
+
+            fresh = build_model(**{
+                **params,
+                "n_estimators": trees_per_day,
+                "random_state": int(day.astype(np.int64))
+            })
+            fresh.fit(_frame(X[rows]), y[rows])
+
+            model.estimators_ = model.estimators_ + fresh.estimators_
+
+        state["tree_dates"] += [_day(day)] * trees_per_day
+
+        excess = len(model.estimators_) - max_trees
+
+        if excess > 0:
+            model.estimators_ = model.estimators_[excess:]
+            state["tree_dates"] = state["tree_dates"][excess:]
+
+        model.n_estimators = len(model.estimators_)
+
+        state["last_date"] = _day(day)
+
+    if len(new_days):
+
+        state["updates"] = state.get("updates", [])[-29:] + [{
+            "days": len(new_days),
+            "last_date": state["last_date"],
+            "strategy": strategy,
+            "at": time.strftime("%Y-%m-%dT%H:%M:%S")
+        }]
+
+    return len(new_days)
+
+
+def benchmark(
+    X,
+    y,
+    dates,
+    params,
+    days=10,
+    strategy="replace",
+    window_days=250,
+    trees_per_day=5
+):
+
+    # Replays the last `days` trade dates as nightly runs. Both models
+    # start from a full fit on everything before them; each night the
+    # incremental model absorbs one day while the other is refit from
+    # scratch, and both are scored on the following day's rows.
+
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    all_days = np.unique(dates)
+
+    if len(all_days) < days + 2:
+        raise ValueError("Not enough trade dates to benchmark")
+
+    first = all_days[-days - 1]
+
+    rows = dates < first
+
+    incremental = build_model(**params)
+    incremental.fit(_frame(X[rows]), y[rows])
+
+    state = initial_state(incremental, dates[rows], params)
+
+    nights = []
+
+    for day, following in zip(all_days[-days - 1:-1], all_days[-days:]):
+
+        known = dates <= day
+        test = dates == following
+
+        start = time.perf_counter()
+        update_model(
+            incremental,
+            state,
+            X[known],
+            y[known],
+            dates[known],
+            strategy=strategy,
+            window_days=window_days,
+            trees_per_day=trees_per_day
+        )
+        incremental_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        full = build_model(**params)
+        full.fit(_frame(X[known]), y[known])
+        full_seconds = time.perf_counter() - start
+
+        nights.append({
+            "day": _day(day),
+            "incremental_seconds": incremental_seconds,
+            "full_seconds": full_seconds,
+            "incremental_mae": float(mean_absolute_error(y[test], incremental.predict(_frame(X[test])))),
+            "full_mae": float(mean_absolute_error(y[test], full.predict(_frame(X[test]))))
+        })
+
+        print(
+            f"{nights[-1]['day']}:"
+            f" incremental {incremental_seconds:.2f}s MAE {nights[-1]['incremental_mae']:.2f}"
+            f" | full {full_seconds:.2f}s MAE {nights[-1]['full_mae']:.2f}"
+        )
+
+    summary = {
+        name: float(np.mean([night[name] for night in nights]))
+        for name in [
+            "incremental_seconds",
+            "full_seconds",
+            "incremental_mae",
+            "full_mae"
+        ]
+    }
+
+    return {
+        "strategy": strategy,
+        "window_days": window_days,
+        "trees_per_day": trees_per_day,
+        "nights": nights,
+        "mean": summary
+    }
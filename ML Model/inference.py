@@ -0,0 +1,176 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from features import FEATURES
+
+
+INFERENCE_BACKENDS = ["sklearn", "compiled"]
+
+FOREST_ARRAYS = ["feature", "threshold", "left", "right", "value", "roots"]
+
+
+def model_features(model):
+
+    # Column order the model was fit with: FEATURES, optionally followed
+    # by feature store columns.
+    names = getattr(model, "feature_names_in_", None)
+
+    return FEATURES if names is None else [str(name) for name in names]
+
+
+class CompiledForest:
+
+    # A fitted sklearn forest flattened into one set of NumPy node
+    # arrays covering every tree. Leaves point back at themselves, so
+    # a fixed number of vectorised steps (the deepest tree's depth)
+    # walks every row down every tree at once, with none of sklearn's
+    # per-call validation or joblib dispatch.
+
+    def __init__(self, feature, threshold, left, right, value, roots, depth):
+
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.depth = depth
+
+    @classmethod
+    def from_sklearn(cls, model, feature_names=None):
+
+        if feature_names is not None and model_features(model) != list(feature_names):
+            raise ValueError("Model features do not match the expected features")
+
+        features = []
+        thresholds = []
+        lefts = []
+        rights = []
+        values = []
+        roots = []
+
+        offset = 0
+        depth = 0
+
+        for estimator in model.estimators_:
+
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            leaf = tree.children_left < 0
+
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(np.where(leaf, np.inf, tree.threshold))
+            lefts.append(np.where(leaf, nodes, tree.children_left) + offset)
+            rights.append(np.where(leaf, nodes, tree.children_right) + offset)
+
+            # (node_count, n_outputs, 1) for regression trees.
+            values.append(tree.value[:, :, 0])
+
+            roots.append(offset)
+            offset += tree.node_count
+            depth = max(depth, tree.max_depth)
+
+        return cls(
+            np.concatenate(features).astype(np.intp),
+            np.concatenate(thresholds).astype(np.float64),
+            np.concatenate(lefts).astype(np.intp),
+            np.concatenate(rights).astype(np.intp),
+            np.concatenate(values).astype(np.float64),
+            np.asarray(roots, dtype=np.intp),
+            depth
+        )
+
+    def save(self, path):
+
+        os.makedirs(path, exist_ok=True)
+
+        for name in FOREST_ARRAYS:
+            np.save(os.path.join(path, name + ".npy"), getattr(self, name))
+
+        np.save(os.path.join(path, "depth.npy"), np.asarray(self.depth))
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+
+        arrays = {
+            name: np.load(os.path.join(path, name + ".npy"), mmap_mode=mmap_mode)
+            for name in FOREST_ARRAYS
+        }
+
+        return cls(
+            depth=int(np.load(os.path.join(path, "depth.npy"))),
+            **arrays
+        )
+
+    def predict(self, X):
+
+        # sklearn compares float32 inputs against float64 thresholds,
+        # so inputs go through float32 to take the same branches.
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+
+        if X.ndim == 1:
+            X = X[None, :]
+
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+
+        for _ in range(self.depth):
+
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+
+            nodes = np.where(
+                go_left,
+                self.left[nodes],
+                self.right[nodes]
+            )
+
+        predictions = self.value[nodes].mean(axis=1)
+
+        if predictions.shape[1] == 1:
+            return predictions[:, 0]
+
+        return predictions
+
+    def max_difference(self, model, X):
+
+        expected = model.predict(pd.DataFrame(X, columns=model_features(model)))
+
+        return float(np.max(np.abs(self.predict(X) - expected)))
+
+
+def make_predictor(model, backend="sklearn", sample=None, tolerance=1e-6, forest=None):
+
+    # Returns a callable mapping a list of rows, in the model's feature
+    # order, to predictions. With a sample, the compiled backend is
+    # checked against sklearn before it is used. A prebuilt (for
+    # example memory-mapped) forest is used instead of compiling the
+    # model.
+
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Unknown inference backend: {backend}")
+
+    if backend == "compiled":
+
+        if forest is None:
+            forest = CompiledForest.from_sklearn(model)
+
+        if sample is not None and len(sample):
+
+            difference = forest.max_difference(model, sample)
+
+            if difference > tolerance:
+                raise ValueError(
+                    f"Compiled forest differs from sklearn by {difference}"
+                )
+
+        return forest.predict
+
+    features = model_features(model)
+
+    def predict_sklearn(rows):
+
+        return model.predict(pd.DataFrame(rows, columns=features))
+
+    return predict_sklearn
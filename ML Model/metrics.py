@@ -0,0 +1,226 @@
+import bisect
+import os
+import threading
+import time
+
+from contextlib import contextmanager
+
+
+# METRICS_ENABLED=0 turns every timer into a shared no-op.
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+
+LATENCY_BUCKETS = [
+    0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0
+]
+
+
+class Histogram:
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _NullTimer:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+def _labels(labels):
+
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(labels, extra=None):
+
+    pairs = list(labels)
+
+    if extra is not None:
+        pairs.append(extra)
+
+    if not pairs:
+        return ""
+
+    text = ",".join(
+        '{}="{}"'.format(
+            key,
+            str(value).replace("\\", "\\\\").replace('"', '\\"')
+        )
+        for key, value in pairs
+    )
+
+    return "{" + text + "}"
+
+
+class Metrics:
+
+    # Minimal in-process registry of counters, gauges and latency
+    # histograms, rendered in the Prometheus text exposition format.
+
+    def __init__(self, enabled=True):
+
+        self.enabled = enabled
+        self.lock = threading.Lock()
+
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.help = {}
+
+    def describe(self, name, text):
+
+        self.help[name] = text
+
+    def inc(self, name, value=1, **labels):
+
+        if not self.enabled:
+            return
+
+        key = (name, _labels(labels))
+
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+
+        if not self.enabled:
+            return
+
+        with self.lock:
+            self.gauges[(name, _labels(labels))] = value
+
+    def replace(self, name, value, **labels):
+
+        # Sets the gauge and drops its series with other labels, for
+        # info-style gauges whose labels change (the model version).
+
+        if not self.enabled:
+            return
+
+        with self.lock:
+
+            for key in [key for key in self.gauges if key[0] == name]:
+                del self.gauges[key]
+
+            self.gauges[(name, _labels(labels))] = value
+
+    def observe(self, name, value, **labels):
+
+        if not self.enabled:
+            return
+
+        key = (name, _labels(labels))
+
+        with self.lock:
+
+            histogram = self.histograms.get(key)
+
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+
+            histogram.observe(value)
+
+    def timer(self, name, **labels):
+
+        if not self.enabled:
+            return NULL_TIMER
+
+        return self._timer(name, labels)
+
+    @contextmanager
+    def _timer(self, name, labels):
+
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def render(self):
+
+        lines = []
+
+        with self.lock:
+
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+            histograms = sorted(self.histograms.items())
+
+        def header(name, kind, seen):
+
+            if name in seen:
+                return
+
+            seen.add(name)
+
+            if name in self.help:
+                lines.append(f"# HELP {name} {self.help[name]}")
+
+            lines.append(f"# TYPE {name} {kind}")
+
+        seen = set()
+
+        for (name, labels), value in counters:
+            header(name, "counter", seen)
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for (name, labels), value in gauges:
+            header(name, "gauge", seen)
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for (name, labels), histogram in histograms:
+
+            header(name, "histogram", seen)
+
+            cumulative = 0
+
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(
+                    f"{name}_bucket{_format_labels(labels, ('le', bound))} {cumulative}"
+                )
+
+            lines.append(
+                f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {histogram.count}"
+            )
+            lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+registry = Metrics(enabled=METRICS_ENABLED)
+
+registry.describe("stock_api_requests_total", "HTTP requests by endpoint and status code.")
+registry.describe("stock_api_request_seconds", "End-to-end request latency, including JSON serialisation.")
+registry.describe("stock_api_stage_seconds", "Latency of individual stages inside an endpoint or artifact load.")
+
+
+def stage_timer(endpoint, stage):
+
+    return registry.timer(
+        "stock_api_stage_seconds",
+        endpoint=endpoint,
+        stage=stage
+    )
@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+import secrets
+import shutil
+import time
+
+import joblib
+
+from features import FEATURES
+from inference import CompiledForest
+
+
+# registry/
+#   LATEST                 version id of the newest model
+#   <version>/
+#     model.joblib         fitted forest (uncompressed)
+#     encoder.joblib       company LabelEncoder
+#     forest/*.npy         the same forest flattened for the compiled
+#                          backend, memory-mapped by every process
+#     meta.json            features, params, date range, metrics, data hash
+#     training_state.json  tree ages for incremental updates
+#     run_report.json      per-stage timings of the training run, plus
+#                          profile.prof/.txt with train_model.py --profile
+LATEST_FILE = "LATEST"
+MODEL_FILE = "model.joblib"
+ENCODER_FILE = "encoder.joblib"
+FOREST_DIR = "forest"
+META_FILE = "meta.json"
+STATE_FILE = "training_state.json"
+
+
+def file_hash(path, block_size=1 << 20):
+
+    digest = hashlib.sha1()
+
+    with open(path, "rb") as f:
+
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def new_version_id(data_hash):
+
+    # Sorts by time; the random suffix keeps two runs on the same data
+    # within one second apart.
+    return time.strftime("%Y%m%d-%H%M%S") + "-" + data_hash[:8] + "-" + secrets.token_hex(3)
+
+
+def list_versions(registry_path):
+
+    if not os.path.isdir(registry_path):
+        return []
+
+    return sorted(
+        name
+        for name in os.listdir(registry_path)
+        if os.path.exists(os.path.join(registry_path, name, META_FILE))
+    )
+
+
+def latest_version(registry_path):
+
+    try:
+        with open(os.path.join(registry_path, LATEST_FILE)) as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        version = ""
+
+    if version and os.path.exists(os.path.join(registry_path, version, META_FILE)):
+        return version
+
+    # Pointer missing or stale: fall back to the newest complete version.
+    versions = list_versions(registry_path)
+
+    return versions[-1] if versions else None
+
+
+def resolve_version(registry_path, version="latest"):
+
+    # Directory of a registered model, None when "latest" is asked for
+    # and nothing is registered yet. A pinned version must exist.
+
+    if not version or version == "latest":
+
+        version = latest_version(registry_path)
+
+        if version is None:
+            return None
+
+    path = os.path.join(registry_path, version)
+
+    if not os.path.exists(os.path.join(path, META_FILE)):
+        raise FileNotFoundError(f"Model version {version} not found in {registry_path}")
+
+    return path
+
+
+def is_version_dir(path):
+
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, META_FILE))
+
+
+def read_meta(version_path):
+
+    with open(os.path.join(version_path, META_FILE)) as f:
+        return json.load(f)
+
+
+def read_training_state(version_path):
+
+    path = os.path.join(version_path, STATE_FILE)
+
+    if not os.path.exists(path):
+        return None
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def register_model(registry_path, model, encoder, meta, training_state=None):
+
+    # Everything is written to a hidden staging directory and renamed
+    # into place, then LATEST is switched, so readers only ever see
+    # complete versions.
+
+    version = new_version_id(meta.get("data_hash") or "nodata")
+
+    staging = os.path.join(registry_path, "." + version)
+    final = os.path.join(registry_path, version)
+
+    # exist_ok=False: an id collision fails loudly instead of mixing
+    # two runs' files.
+    os.makedirs(staging)
+
+    try:
+
+        # Uncompressed: quicker to load. It is not shared between
+        # processes (see load_version); forest/ is.
+        joblib.dump(model, os.path.join(staging, MODEL_FILE))
+        joblib.dump(encoder, os.path.join(staging, ENCODER_FILE))
+
+        CompiledForest.from_sklearn(model).save(os.path.join(staging, FOREST_DIR))
+
+        if training_state is not None:
+
+            with open(os.path.join(staging, STATE_FILE), "w") as f:
+                json.dump(training_state, f, indent=2)
+
+        meta = {
+            "version": version,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "features": FEATURES,
+            **meta
+        }
+
+        with open(os.path.join(staging, META_FILE), "w") as f:
+            json.dump(meta, f, indent=2)
+
+        os.rename(staging, final)
+
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    with open(os.path.join(registry_path, LATEST_FILE + ".tmp"), "w") as f:
+        f.write(version + "\n")
+
+    os.replace(
+        os.path.join(registry_path, LATEST_FILE + ".tmp"),
+        os.path.join(registry_path, LATEST_FILE)
+    )
+
+    return version
+
+
+def load_version(version_path, mmap_mode="r"):
+
+    # sklearn copies tree nodes into its own buffers when unpickling, so
+    # the memory that is really shared between processes is the
+    # compiled forest, whose .npy files stay mapped from the page cache.
+
+    meta = read_meta(version_path)
+
+    # Extra columns after FEATURES come from the feature store.
+    if meta["features"][:len(FEATURES)] != FEATURES:
+        raise ValueError("Registered model features do not match FEATURES")
+
+    model = joblib.load(os.path.join(version_path, MODEL_FILE), mmap_mode=mmap_mode)
+    encoder = joblib.load(os.path.join(version_path, ENCODER_FILE))
+
+    forest = None
+
+    if os.path.isdir(os.path.join(version_path, FOREST_DIR)):
+        forest = CompiledForest.load(os.path.join(version_path, FOREST_DIR), mmap_mode=mmap_mode)
+
+    return model, encoder, forest, meta
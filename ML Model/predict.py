@@ -1,12 +1,17 @@
-
-
-import pandas as pd
-import joblib
+import numpy as np
 import os
 
+from bar_log import BarLog
+from feature_index import COLUMN_POSITION
+from serving_state import load_state, resolve_model_paths
+
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+MODEL_REGISTRY = os.environ.get("MODEL_REGISTRY", os.path.join(BASE_DIR, "registry"))
+MODEL_VERSION = os.environ.get("MODEL_VERSION", "latest")
+MODEL_SHARDS = os.environ.get("MODEL_SHARDS", "")
+
 MODEL_PATH = os.path.join(BASE_DIR, "stock_model.pkl")
 ENCODER_PATH = os.path.join(BASE_DIR, "company_encoder.pkl")
 
@@ -17,118 +22,103 @@ DATA_PATH = os.path.join(
     "nse_prices.csv"
 )
 
-print("Loading Model and Encoder...")
-
-model = joblib.load(MODEL_PATH)
-encoder = joblib.load(ENCODER_PATH)
-
-print("Model and Encoder Loaded Successfully")
-
-
-
-print("Loading Dataset...")
-
-df = pd.read_csv(DATA_PATH, low_memory=False)
-
-df = df[df["company"] != "company"]
-
-df["company"] = df["company"].astype(str).str.strip().str.upper()
-
-numeric_cols = ["open", "high", "low", "close"]
-
-for col in numeric_cols:
-    df[col] = pd.to_numeric(df[col], errors="coerce")
+SNAPSHOT_PATH = os.path.join(BASE_DIR, "feature_snapshot")
 
-df["trade_date"] = pd.to_datetime(
-    df["trade_date"],
-    dayfirst=True,
-    errors="coerce"
+FEATURE_STORE_PATH = os.environ.get(
+    "FEATURE_STORE_PATH",
+    os.path.join(BASE_DIR, "..", "stock_market_clean_dataset_with_Feature_Eng")
 )
 
-df.dropna(inplace=True)
-
-df.sort_values(["company", "trade_date"], inplace=True)
-
-df.reset_index(drop=True, inplace=True)
-
-print("Dataset Loaded Successfully")
-
-
-print("Performing Feature Engineering...")
-
-def safe_encode(company):
-    if company in encoder.classes_:
-        return encoder.transform([company])[0]
-    return None
-
-df["company_encoded"] = df["company"].apply(safe_encode)
-
-df.dropna(subset=["company_encoded"], inplace=True)
+BAR_LOG_PATH = os.environ.get(
+    "BAR_LOG_PATH",
+    os.path.join(BASE_DIR, "ingested_bars.jsonl")
+)
 
-df["prev_close"] = df.groupby("company")["close"].shift(1)
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "sklearn")
 
-df["ma_5"] = (
-    df.groupby("company")["close"]
-    .rolling(5)
-    .mean()
-    .reset_index(level=0, drop=True)
-)
+print("Loading Model and Encoder...")
 
-df["ma_10"] = (
-    df.groupby("company")["close"]
-    .rolling(10)
-    .mean()
-    .reset_index(level=0, drop=True)
+# The same loader as the API, so predictions here include the bars
+# ingested through POST /bars and go through the same backend check.
+state = load_state(
+    *resolve_model_paths(
+        MODEL_REGISTRY,
+        MODEL_VERSION,
+        MODEL_PATH,
+        ENCODER_PATH,
+        shards=MODEL_SHARDS
+    ),
+    DATA_PATH,
+    snapshot_path=SNAPSHOT_PATH,
+    bar_log=BarLog(BAR_LOG_PATH),
+    backend=INFERENCE_BACKEND,
+    strict=True,
+    store_path=FEATURE_STORE_PATH
 )
-df["volatility"] = df["high"] - df["low"]
 
-df.dropna(inplace=True)
+if state.model_version:
+    print("Model Version:", state.model_version)
 
-print("Feature Engineering Completed")
+feature_index = state.feature_index
+predictor = state.predictor
 
 
 def predict_company(company_name):
 
     company_name = company_name.strip().upper()
 
-    if company_name not in encoder.classes_:
+    # Encoder classes minus companies without a shard, as in app.py.
+    if company_name not in state.supported:
         print(f"❌ Company '{company_name}' not found in trained model")
         return None
 
-    company_data = df[df["company"] == company_name]
+    row, last_date = state.engine.latest(company_name)
 
-    if company_data.empty:
+    if row is None:
         print(f"❌ No dataset data found for {company_name}")
         return None
 
-    latest = company_data.iloc[-1]
+    latest = {
+        column: float(row[position])
+        for column, position in COLUMN_POSITION.items()
+    }
 
     print("\n===============================")
     print("Company:", company_name)
     print("Current Price:", latest["close"])
 
-    input_df = pd.DataFrame([{
-        "company_encoded": latest["company_encoded"],
-        "open": latest["open"],
-        "high": latest["high"],
-        "low": latest["low"],
-        "close": latest["close"],
-        "prev_close": latest["prev_close"],
-        "ma_5": latest["ma_5"],
-        "ma_10": latest["ma_10"],
-        "volatility": latest["volatility"]
-    }])
+    features = state.feature_row(
+        company_name,
+        row,
+        last_date,
+        latest["open"],
+        latest["high"],
+        latest["low"],
+        latest["close"]
+    )
+
+    if features is None:
+        print(f"❌ No feature store data found for {company_name}")
+        return None
+
+    # One value per horizon; the first is the shortest.
+    predictions = np.atleast_1d(predictor([features])[0])
+
+    for horizon, prediction in zip(state.horizons, predictions):
 
-    prediction = model.predict(input_df)[0]
+        predicted_price = round(float(prediction), 2)
 
-    predicted_price = round(float(prediction), 2)
+        if horizon == 1:
+            print("Predicted Next Day Price:", predicted_price)
+        else:
+            print(f"Predicted {horizon}-Day Price:", predicted_price)
 
-    print("Predicted Next Day Price:", predicted_price)
+        if predicted_price > latest["close"]:
+            print("Trend: UP 📈")
+        else:
+            print("Trend: DOWN 📉")
 
-    if predicted_price > latest["close"]:
-        print("Trend: UP 📈")
-    else:
-        print("Trend: DOWN 📉")
+    predicted_price = round(float(predictions[0]), 2)
 
     print("===============================")
 
@@ -139,7 +129,11 @@ if __name__ == "__main__":
 
     print("\nAvailable Companies:\n")
 
-    companies = sorted(df["company"].unique())
+    companies = sorted(
+        company
+        for company in feature_index.companies
+        if company in state.supported
+    )
 
     for comp in companies[:50]:
         print(comp)
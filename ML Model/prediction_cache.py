@@ -0,0 +1,109 @@
+import hashlib
+import os
+import threading
+import time
+
+from collections import OrderedDict
+
+
+def artifact_version(*paths):
+
+    # Token that changes whenever any of the files is replaced or
+    # rewritten; missing files still contribute their path.
+    digest = hashlib.sha1()
+
+    for path in paths:
+
+        digest.update(os.path.abspath(path).encode())
+
+        try:
+            info = os.stat(path)
+        except OSError:
+            continue
+
+        digest.update(f"{info.st_mtime_ns}:{info.st_size}".encode())
+
+    return digest.hexdigest()[:12]
+
+
+class PredictionCache:
+
+    # Bounded LRU with a per-entry time to live. Keys carry the
+    # model/dataset version, so a new version never sees old entries.
+
+    def __init__(self, max_entries=4096, ttl_seconds=300.0):
+
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl_seconds)
+
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+
+        now = time.monotonic()
+
+        with self.lock:
+
+            entry = self.entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires = entry
+
+            if self.ttl > 0 and now >= expires:
+                del self.entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+
+            return value
+
+    def put(self, key, value):
+
+        expires = time.monotonic() + self.ttl
+
+        with self.lock:
+
+            self.entries[key] = (value, expires)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+
+        with self.lock:
+
+            lookups = self.hits + self.misses
+
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": (
+                    self.hits / lookups
+                    if lookups
+                    else 0.0
+                )
+            }
@@ -0,0 +1,180 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+
+from contextlib import contextmanager
+
+
+# Written next to the model artifact (a registry version or the shard
+# bundle) by every training run.
+REPORT_FILE = "run_report.json"
+PROFILE_FILE = "profile.prof"
+PROFILE_TEXT_FILE = "profile.txt"
+
+PROFILE_TOP = 30
+
+
+class RunProfiler:
+
+    # Records named stages of a training run: wall and CPU time, peak
+    # traced Python memory (tracemalloc, which also sees numpy buffers)
+    # and row counts. With profile=True every stage runs under cProfile
+    # and the profile of the slowest one is kept.
+
+    def __init__(self, run, trace_memory=True, profile=False):
+
+        self.run = run
+        self.trace_memory = trace_memory
+        self.profile = profile
+
+        self.stages = []
+        self.profiles = {}
+        self.info = {}
+
+        self.started_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+
+        self.owns_tracing = False
+
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.owns_tracing = True
+
+    @contextmanager
+    def stage(self, name):
+
+        # Yields a dict the caller can add "rows" (or anything else) to.
+
+        record = {"name": name}
+
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            traced_before = tracemalloc.get_traced_memory()[0]
+
+        profile = None
+
+        if self.profile:
+            profile = cProfile.Profile()
+            profile.enable()
+
+        wall = time.perf_counter()
+        cpu = time.process_time()
+
+        try:
+            yield record
+
+        finally:
+
+            record["seconds"] = time.perf_counter() - wall
+            record["cpu_seconds"] = time.process_time() - cpu
+
+            if profile is not None:
+                profile.disable()
+                self.profiles[name] = profile
+
+            if self.trace_memory:
+
+                current, peak = tracemalloc.get_traced_memory()
+
+                record["peak_traced_mb"] = peak / (1024 * 1024)
+                record["retained_mb"] = (current - traced_before) / (1024 * 1024)
+
+            self.stages.append(record)
+
+    def slowest(self):
+
+        if not self.stages:
+            return None
+
+        return max(self.stages, key=lambda record: record["seconds"])["name"]
+
+    def finish(self):
+
+        if self.owns_tracing:
+            tracemalloc.stop()
+            self.owns_tracing = False
+
+        return self.report()
+
+    def report(self):
+
+        # training_data imports this module for its stages.
+        from training_data import peak_rss_mb
+
+        return {
+            "run": self.run,
+            "started_at": self.started_at,
+            "seconds": time.perf_counter() - self.wall_start,
+            "cpu_seconds": time.process_time() - self.cpu_start,
+            "peak_rss_mb": peak_rss_mb(),
+            "trace_memory": self.trace_memory,
+            **self.info,
+            "slowest_stage": self.slowest(),
+            "stages": self.stages
+        }
+
+    def print_summary(self):
+
+        print("\nTRAINING STAGES:")
+
+        for record in self.stages:
+
+            line = f"  {record['name']:<14}{record['seconds']:>8.2f}s wall {record['cpu_seconds']:>8.2f}s cpu"
+
+            if "peak_traced_mb" in record:
+                line += f" {record['peak_traced_mb']:>9.1f} MB peak"
+
+            if "rows" in record:
+                line += f" {record['rows']:>10} rows"
+
+            print(line)
+
+    def write(self, directory):
+
+        # run_report.json, plus the slowest stage's profile as a .prof
+        # file (for snakeviz, pstats, ...) and a readable top list.
+
+        report = self.finish()
+
+        slowest = self.slowest()
+
+        if slowest in self.profiles:
+
+            profile = self.profiles[slowest]
+            profile.dump_stats(os.path.join(directory, PROFILE_FILE))
+
+            text = io.StringIO()
+
+            pstats.Stats(profile, stream=text).sort_stats("cumulative").print_stats(PROFILE_TOP)
+
+            with open(os.path.join(directory, PROFILE_TEXT_FILE), "w") as f:
+                f.write(f"Stage: {slowest}\n")
+                f.write(text.getvalue())
+
+            report["profile"] = {
+                "stage": slowest,
+                "file": PROFILE_FILE,
+                "text": PROFILE_TEXT_FILE
+            }
+
+        with open(os.path.join(directory, REPORT_FILE), "w") as f:
+            json.dump(report, f, indent=2)
+
+        return report
+
+
+class _NullProfiler:
+
+    # Stand-in when a caller does not profile; stage() costs nothing.
+
+    @contextmanager
+    def stage(self, name):
+        yield {}
+
+
+NULL_PROFILER = _NullProfiler()
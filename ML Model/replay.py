@@ -0,0 +1,266 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import time
+
+import httpx
+import pandas as pd
+
+from benchmark import git_commit, percentiles
+from features import clean_prices
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DATA_PATH = os.path.join(
+    BASE_DIR,
+    "..",
+    "stock_market_clean_dataset_with_Feature_Eng",
+    "nse_prices.csv"
+)
+
+REPLAY_ENDPOINTS = ["latest", "predict"]
+
+# Trading days replayed by default: the most recent ones in the file.
+REPLAY_DAYS = 5
+
+
+def load_bars(data_path, days=REPLAY_DAYS, market="NSE"):
+
+    # Bars in replay order (day by day, companies within a day). Reads
+    # the cleaned CSV or the generator's raw one, whose date column is
+    # "date" and which carries a market column.
+
+    df = pd.read_csv(data_path, low_memory=False)
+
+    if "trade_date" not in df.columns and "date" in df.columns:
+        df = df.rename(columns={"date": "trade_date"})
+
+    if "market" in df.columns:
+        df = df[df["market"].astype(str).str.upper() == market]
+
+    df = clean_prices(df)
+
+    if days:
+
+        last_days = df["trade_date"].drop_duplicates().nlargest(days)
+
+        df = df[df["trade_date"].isin(last_days)]
+
+    return df.sort_values(["trade_date", "company"], kind="stable").reset_index(drop=True)
+
+
+def replay_requests(bars, endpoints=REPLAY_ENDPOINTS):
+
+    # (endpoint, method, path, body) for every bar and endpoint, lazily,
+    # so a long replay never materialises its request list.
+
+    for company, open_price, high_price, low_price, close_price in bars[
+        ["company", "open", "high", "low", "close"]
+    ].itertuples(index=False):
+
+        if "latest" in endpoints:
+            yield "latest", "GET", f"/latest/{company}", None
+
+        if "predict" in endpoints:
+            yield "predict", "POST", "/predict", {
+                "company": company,
+                "open": float(open_price),
+                "high": float(high_price),
+                "low": float(low_price),
+                "close": float(close_price)
+            }
+
+
+async def replay(client, requests, rate=0, concurrency=32, limit=None):
+
+    # Open loop when rate > 0: request i is due at start + i / rate and
+    # its latency is measured from that moment, so time spent waiting
+    # for a free slot counts against the server instead of silently
+    # lowering the offered load. With rate 0, `concurrency` workers send
+    # back to back and latency is measured from the send.
+
+    results = {}
+
+    requests = enumerate(requests)
+
+    start = time.perf_counter()
+
+    async def worker():
+
+        for number, (endpoint, method, path, body) in requests:
+
+            if limit is not None and number >= limit:
+                return
+
+            if rate > 0:
+                due = start + number / rate
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            else:
+                due = time.perf_counter()
+
+            result = results.setdefault(endpoint, {"latencies": [], "errors": 0, "status": {}})
+
+            try:
+
+                response = await client.request(method, path, json=body)
+
+                status = str(response.status_code)
+
+                failed = (
+                    response.status_code != 200
+                    or "error" in response.json()
+                )
+
+            except (httpx.HTTPError, ValueError) as e:
+
+                status = type(e).__name__
+                failed = True
+
+            result["latencies"].append(time.perf_counter() - due)
+            result["status"][status] = result["status"].get(status, 0) + 1
+
+            if failed:
+                result["errors"] += 1
+
+    # The workers share one iterator; asyncio runs one at a time, so
+    # each request is taken exactly once.
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    seconds = time.perf_counter() - start
+
+    report = {}
+
+    for endpoint, result in results.items():
+
+        count = len(result["latencies"])
+
+        report[endpoint] = {
+            **percentiles(result["latencies"]),
+            "requests_per_second": count / seconds,
+            "errors": result["errors"],
+            "error_rate": result["errors"] / count,
+            "status": result["status"]
+        }
+
+    return seconds, report
+
+
+def in_process_client(timeout):
+
+    # The real app through its ASGI interface, with the artifacts app.py
+    # loads on import (MODEL_REGISTRY, FEATURE_STORE_PATH, ... apply).
+
+    import app
+
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app.app),
+        base_url="http://replay",
+        timeout=timeout
+    )
+
+
+def print_report(report):
+
+    print(f"\n{report['requests']} requests in {report['seconds']:.2f}s ({report['requests_per_second']:,.0f}/s)")
+
+    for endpoint, values in report["endpoints"].items():
+
+        print(
+            f"  {endpoint:<10}{values['count']:>8} req {values['requests_per_second']:>9,.0f}/s"
+            f"  p50 {values['p50_ms']:.2f}ms p95 {values['p95_ms']:.2f}ms p99 {values['p99_ms']:.2f}ms"
+            f"  errors {values['error_rate']:.2%}"
+        )
+
+
+async def run(args):
+
+    bars = load_bars(args.data, args.days, args.market)
+
+    endpoints = [endpoint.strip() for endpoint in args.endpoints.split(",")]
+
+    for endpoint in endpoints:
+
+        if endpoint not in REPLAY_ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint: {endpoint}")
+
+    print(
+        f"Replaying {len(bars)} bars over {bars['trade_date'].nunique()} days"
+        f" against {args.url or 'the in-process app'}"
+    )
+
+    if args.url:
+        client = httpx.AsyncClient(
+            base_url=args.url,
+            timeout=args.timeout,
+            limits=httpx.Limits(max_connections=args.concurrency)
+        )
+    else:
+        client = in_process_client(args.timeout)
+
+    async with client:
+        seconds, endpoint_report = await replay(
+            client,
+            replay_requests(bars, endpoints),
+            rate=args.rate,
+            concurrency=args.concurrency,
+            limit=args.limit
+        )
+
+    requests = sum(values["count"] for values in endpoint_report.values())
+
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "target": args.url or "asgi",
+        "config": {
+            "data": args.data,
+            "days": args.days,
+            "endpoints": endpoints,
+            "rate": args.rate,
+            "concurrency": args.concurrency,
+            "limit": args.limit
+        },
+        "requests": requests,
+        "seconds": seconds,
+        "requests_per_second": requests / seconds,
+        "endpoints": endpoint_report
+    }
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Replay market days against the prediction API as /latest and /predict calls."
+    )
+
+    parser.add_argument("--data", default=DATA_PATH, help="nse_prices.csv, cleaned or generated")
+    parser.add_argument("--market", default="NSE", help="market to replay from a generated file")
+    parser.add_argument("--days", type=int, default=REPLAY_DAYS, help="most recent days to replay; 0 for all")
+    parser.add_argument("--url", default=None, help="e.g. http://127.0.0.1:8000; in process when omitted")
+    parser.add_argument("--endpoints", default=",".join(REPLAY_ENDPOINTS))
+    parser.add_argument("--rate", type=float, default=0, help="requests per second; 0 sends as fast as possible")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many requests")
+    parser.add_argument("--timeout", type=float, default=10)
+    parser.add_argument("--output", default=None, help="write the report as JSON")
+
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    print_report(report)
+
+    if args.output:
+
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+        print("\nSaved replay report to", args.output)
+
+
+if __name__ == "__main__":
+    main()
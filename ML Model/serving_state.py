@@ -0,0 +1,374 @@
+import os
+import time
+
+import joblib
+
+from feature_index import COLUMN_POSITION
+from features import FEATURES, build_feature_engine, feature_row
+from feature_snapshot import load_snapshot, META_FILE
+from feature_store import STORE_SOURCES, FeatureStore
+from inference import make_predictor, model_features
+from metrics import stage_timer
+from model_registry import (
+    ENCODER_FILE,
+    META_FILE as VERSION_META_FILE,
+    is_version_dir,
+    load_version,
+    resolve_version
+)
+from prediction_cache import artifact_version
+from sharding import MANIFEST_FILE, SHARD_ENCODER_FILE, ShardedModel
+
+
+class ServingState:
+
+    # Snapshot of everything a request needs. The API swaps whole
+    # snapshots on reload, so a request that grabbed one keeps a
+    # consistent model, encoder and feature index until it finishes.
+    # Only the feature engine changes in place, as bars are ingested.
+
+    def __init__(
+        self,
+        model,
+        encoder,
+        engine,
+        version,
+        predictor=None,
+        model_version=None,
+        store=None,
+        horizons=None
+    ):
+
+        self.model = model
+        self.model_version = model_version
+        self.predictor = predictor
+        self.encoder = encoder
+        self.engine = engine
+        self.feature_index = (
+            engine.index
+            if engine is not None
+            else None
+        )
+        self.store = store
+
+        # Trading days ahead of each model output; predictors return one
+        # column per horizon when there are several.
+        self.horizons = horizons or [1]
+
+        self.version = version
+        self.loaded_at = time.time()
+
+        self.supported = (
+            set(encoder.classes_)
+            if encoder is not None
+            else set()
+        )
+
+        if isinstance(model, ShardedModel):
+            self.supported &= model.companies
+
+    def feature_row(self, company, latest, last_date, open_price, high_price, low_price, close_price):
+
+        # Model input for one bar: the FEATURES row, followed by the
+        # feature store values as of the company's latest bar date
+        # (last_date, read with `latest`) when the model uses them. None
+        # when the store has nothing for the company.
+        row = feature_row(latest, open_price, high_price, low_price, close_price)
+
+        if self.store is None:
+            return row
+
+        extra = self.store.latest(company, last_date)
+
+        if extra is None:
+            return None
+
+        return row + extra.tolist()
+
+
+def resolve_model_paths(registry_path, version, model_path, encoder_path, shards=""):
+
+    # (model, encoder) paths to serve: a shard bundle when one is set,
+    # else the pinned or latest registry version, else the plain
+    # stock_model.pkl / company_encoder.pkl pair. Called on every
+    # (re)load, so "latest" follows new registrations.
+
+    if shards:
+
+        # Bundles written before the encoder moved into them still pair
+        # with company_encoder.pkl.
+        if os.path.exists(os.path.join(shards, SHARD_ENCODER_FILE)):
+            return shards, os.path.join(shards, SHARD_ENCODER_FILE)
+
+        return shards, encoder_path
+
+    if version and version != "latest":
+
+        # A missing pinned version is reported by load_state.
+        path = os.path.join(registry_path, version)
+
+        return path, os.path.join(path, ENCODER_FILE)
+
+    path = resolve_version(registry_path)
+
+    if path is None:
+        return model_path, encoder_path
+
+    return path, os.path.join(path, ENCODER_FILE)
+
+
+def watched_version(model_path, encoder_path, data_path, snapshot_path=None, store_path=None):
+
+    # Registry versions and shard bundles are directories; watch the
+    # file that is written last.
+    if is_version_dir(model_path):
+        model_path = os.path.join(model_path, VERSION_META_FILE)
+
+    elif os.path.isdir(model_path):
+        model_path = os.path.join(model_path, MANIFEST_FILE)
+
+    watched = [model_path, encoder_path, data_path]
+
+    if snapshot_path is not None:
+        watched.append(os.path.join(snapshot_path, META_FILE))
+
+    if store_path is not None:
+        watched += [
+            os.path.join(store_path, source["file"])
+            for source in STORE_SOURCES
+        ]
+
+    return artifact_version(*watched)
+
+
+def load_feature_engine(data_path, encoder, snapshot_path=None):
+
+    # Prefer the binary snapshot written by train_model.py and fall back
+    # to rebuilding the features from the CSV when it is missing or stale.
+    if snapshot_path is not None:
+
+        engine = load_snapshot(
+            snapshot_path,
+            encoder,
+            data_path=data_path
+        )
+
+        if engine is not None:
+            print("✅ Feature snapshot mapped")
+            return engine
+
+    return build_feature_engine(data_path, encoder)
+
+
+def load_model(model_path, encoder, backend="sklearn"):
+
+    # model_path is either a single pickled forest or a shard bundle
+    # directory written by train_model.py --shard-by.
+    if os.path.isdir(model_path):
+        return ShardedModel.load(model_path, encoder, backend)
+
+    return joblib.load(model_path)
+
+
+def load_store(model, store_path):
+
+    # The feature store a registered model was trained with, or None
+    # for models that only use FEATURES.
+    columns = model_features(model)[len(FEATURES):]
+
+    if not columns:
+        return None
+
+    if store_path is None:
+        raise ValueError("Model uses feature store columns but no store path is set")
+
+    store = FeatureStore.load(store_path)
+
+    if store.columns != columns:
+        raise ValueError("Feature store columns do not match the model")
+
+    print("✅ Feature store loaded:", ", ".join(store.names))
+
+    return store
+
+
+def sample_rows(engine, store=None, limit=256):
+
+    # Real feature rows to check an alternative backend against sklearn.
+    if engine is None:
+        return []
+
+    rows = []
+
+    for company in engine.index.companies[:limit]:
+
+        row, last_date = engine.latest(company)
+
+        sample = feature_row(
+            row,
+            row[COLUMN_POSITION["open"]],
+            row[COLUMN_POSITION["high"]],
+            row[COLUMN_POSITION["low"]],
+            row[COLUMN_POSITION["close"]]
+        )
+
+        if store is not None:
+
+            extra = store.latest(company, last_date)
+
+            if extra is None:
+                continue
+
+            sample += extra.tolist()
+
+        rows.append(sample)
+
+    return rows
+
+
+def load_predictor(model, backend, engine, strict=False, forest=None, store=None):
+
+    try:
+
+        return make_predictor(
+            model,
+            backend,
+            sample=sample_rows(engine, store),
+            forest=forest
+        )
+
+    except Exception as e:
+
+        if strict:
+            raise
+
+        print("❌ Inference backend error:", str(e))
+
+        return make_predictor(model, "sklearn")
+
+
+def load_state(
+    model_path,
+    encoder_path,
+    data_path,
+    snapshot_path=None,
+    bar_log=None,
+    backend="sklearn",
+    strict=False,
+    store_path=None
+):
+
+    # With strict=False a failed artifact is reported and left as None,
+    # which is what startup wants. Reloads pass strict=True so that a
+    # broken artifact raises instead of producing a half-loaded state.
+
+    version = watched_version(
+        model_path,
+        encoder_path,
+        data_path,
+        snapshot_path,
+        store_path
+    )
+
+    model = None
+    encoder = None
+    engine = None
+    forest = None
+    model_version = None
+    store = None
+    horizons = None
+
+    try:
+
+        with stage_timer("load", "model"):
+
+            if is_version_dir(model_path):
+                model, encoder, forest, meta = load_version(model_path)
+                model_version = meta["version"]
+                horizons = meta.get("horizons")
+            else:
+                encoder = joblib.load(encoder_path)
+                model = load_model(model_path, encoder, backend)
+
+        print("✅ Model and Encoder Loaded")
+
+        if not isinstance(model, ShardedModel):
+
+            with stage_timer("load", "feature_store"):
+                store = load_store(model, store_path)
+
+    except Exception as e:
+
+        if strict:
+            raise
+
+        print("❌ Model load error:", str(e))
+
+        # A model whose store columns are unavailable cannot be served.
+        model = None
+
+    try:
+
+        with stage_timer("load", "features"):
+
+            engine = load_feature_engine(
+                data_path,
+                encoder,
+                snapshot_path
+            )
+
+        print("✅ Dataset Loaded Successfully")
+
+        if bar_log is not None:
+
+            with stage_timer("load", "bar_replay"):
+                applied = bar_log.replay(engine)
+
+            if applied:
+                print("✅ Replayed", applied, "ingested bars")
+
+    except Exception as e:
+
+        if strict:
+            raise
+
+        print("❌ Dataset load error:", str(e))
+
+    if store is not None and engine is not None:
+
+        with stage_timer("load", "feature_store_rows"):
+
+            companies = engine.index.companies
+
+            store.prepare(companies, [engine.last_date(company) for company in companies])
+
+    predictor = None
+
+    if isinstance(model, ShardedModel):
+
+        # Shards pick and check their backend when they are first used.
+        predictor = model.predict
+
+    elif model is not None:
+
+        with stage_timer("load", "predictor"):
+
+            predictor = load_predictor(
+                model,
+                backend,
+                engine,
+                strict=strict,
+                forest=forest,
+                store=store
+            )
+
+    return ServingState(
+        model,
+        encoder,
+        engine,
+        version,
+        predictor,
+        model_version=model_version,
+        store=store,
+        horizons=horizons
+    )
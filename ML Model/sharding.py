@@ -0,0 +1,365 @@
+import json
+import os
+import re
+import threading
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from sklearn.metrics import mean_absolute_error, r2_score
+
+from features import FEATURES, encoder_mapping
+from inference import make_predictor
+
+
+# A shard bundle is a directory holding one pickled forest per shard,
+# a manifest.json that maps every company to its shard, and the company
+# encoder the shards were trained with.
+MANIFEST_FILE = "manifest.json"
+SHARD_ENCODER_FILE = "encoder.pkl"
+
+SHARD_MODES = ["sector", "company"]
+
+DEFAULT_SECTOR = "Other"
+
+
+def load_sector_map(fundamentals_path):
+
+    df = pd.read_csv(
+        fundamentals_path,
+        usecols=["company_name", "business_sector"]
+    )
+
+    df["company_name"] = df["company_name"].astype(str).str.strip().str.upper()
+    df["business_sector"] = df["business_sector"].astype(str).str.strip()
+
+    return dict(zip(df["company_name"], df["business_sector"]))
+
+
+def shard_assignments(companies, by="sector", sector_map=None):
+
+    if by not in SHARD_MODES:
+        raise ValueError(f"Unknown shard mode: {by}")
+
+    if by == "company":
+        return {company: company for company in companies}
+
+    sector_map = sector_map or {}
+
+    return {
+        company: sector_map.get(company, DEFAULT_SECTOR)
+        for company in companies
+    }
+
+
+def shard_filename(name, taken):
+
+    slug = re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_") or "shard"
+    filename = slug + ".pkl"
+    suffix = 2
+
+    # Distinct names can share a slug (M&M and M-M both become m_m).
+    while filename in taken:
+        filename = f"{slug}_{suffix}.pkl"
+        suffix += 1
+
+    return filename
+
+
+def read_manifest(path):
+
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+
+    if not os.path.exists(manifest_path):
+        return None
+
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def _fit_shard(name, filename, X, y, dates, params, output_dir):
+
+    # Runs in a worker process. Holds out the most recent 20% of the
+    # shard's rows by trade date, like train() does for the global model.
+
+    from train_model import build_model
+
+    start = time.perf_counter()
+
+    order = np.argsort(dates, kind="stable")
+    split = int(len(order) * 0.8)
+
+    train_rows = order[:split]
+    test_rows = order[split:]
+
+    model = build_model(**{**params, "n_jobs": 1})
+    model.fit(pd.DataFrame(X[train_rows], columns=FEATURES), y[train_rows])
+
+    result = {
+        "file": filename,
+        "rows": int(len(X)),
+        "mae": None,
+        "r2": None
+    }
+
+    if len(test_rows):
+
+        predictions = model.predict(pd.DataFrame(X[test_rows], columns=FEATURES))
+
+        result["mae"] = float(mean_absolute_error(y[test_rows], predictions))
+
+        if len(test_rows) > 1:
+            result["r2"] = float(r2_score(y[test_rows], predictions))
+
+    # Written beside the old shard and renamed over it, so a server
+    # loading shards lazily never reads a half-written file.
+    path = os.path.join(output_dir, filename)
+
+    joblib.dump(model, path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+    result["seconds"] = time.perf_counter() - start
+    result["trained_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+    return name, result
+
+
+def train_shards(
+    df,
+    encoder,
+    output_dir,
+    by="sector",
+    sector_map=None,
+    only=None,
+    params=None,
+    workers=None
+):
+
+    # Fits one forest per shard in parallel worker processes and writes
+    # the manifest last. With `only`, the other shards of an existing
+    # bundle are left untouched on disk and in the manifest.
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    classes = [str(company) for company in encoder.classes_]
+    assignments = shard_assignments(classes, by, sector_map)
+
+    existing = read_manifest(output_dir)
+
+    if only:
+
+        if existing is None or existing["by"] != by:
+            raise ValueError("Retraining selected shards needs an existing bundle of the same kind")
+
+        # company_encoded codes come from the encoder, so kept shards
+        # are only valid while the company list is unchanged.
+        if existing["classes"] != classes:
+            raise ValueError("Company list changed; retrain every shard")
+
+        unknown = set(only) - set(assignments.values())
+
+        if unknown:
+            raise ValueError(f"Unknown shards: {sorted(unknown)}")
+
+    shards = dict(existing["shards"]) if only else {}
+    selected = sorted(set(only) if only else set(assignments.values()))
+
+    taken = {
+        shard["file"]
+        for name, shard in shards.items()
+        if name not in selected
+    }
+
+    filenames = {}
+
+    for name in selected:
+
+        filename = (
+            shards[name]["file"]
+            if name in shards
+            else shard_filename(name, taken)
+        )
+
+        taken.add(filename)
+        filenames[name] = filename
+
+    shard_of = df["company"].map(assignments).to_numpy()
+
+    X = df[FEATURES].to_numpy(dtype=np.float64)
+    y = df["target"].to_numpy(dtype=np.float64)
+    dates = df["trade_date"].to_numpy()
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    workers = max(1, min(workers, len(selected)))
+
+    print(f"Training {len(selected)} {by} shards on {workers} workers")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+
+        futures = []
+
+        for name in selected:
+
+            rows = shard_of == name
+
+            if not rows.any():
+                print(f"Skipping shard {name}: no training rows")
+                continue
+
+            futures.append(executor.submit(
+                _fit_shard,
+                name,
+                filenames[name],
+                X[rows],
+                y[rows],
+                dates[rows],
+                params or {},
+                output_dir
+            ))
+
+        for future in futures:
+
+            name, result = future.result()
+
+            result["companies"] = sorted(
+                company
+                for company, shard in assignments.items()
+                if shard == name
+            )
+
+            shards[name] = result
+
+            mae = (
+                round(result["mae"], 2)
+                if result["mae"] is not None
+                else "n/a"
+            )
+
+            print(f"Shard {name}: {result['rows']} rows | MAE {mae} | {result['seconds']:.1f}s")
+
+    manifest = {
+        "by": by,
+        "features": FEATURES,
+        "classes": classes,
+        "companies": {
+            company: shard
+            for company, shard in assignments.items()
+            if shard in shards
+        },
+        "shards": shards,
+        "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+class ShardedModel:
+
+    # Routes each FEATURES row to the forest of its company's shard,
+    # using the company_encoded column. Shards are unpickled on first
+    # use, so a process that only serves a few companies only pays for
+    # their shards.
+
+    def __init__(self, path, manifest, encoder, backend="sklearn"):
+
+        self.path = path
+        self.manifest = manifest
+        self.backend = backend
+
+        mapping = encoder_mapping(encoder)
+
+        self.shard_of_code = {
+            mapping[company]: shard
+            for company, shard in manifest["companies"].items()
+            if company in mapping
+        }
+
+        self.predictors = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path, encoder, backend="sklearn"):
+
+        manifest = read_manifest(path)
+
+        if manifest is None:
+            raise FileNotFoundError(f"No {MANIFEST_FILE} in {path}")
+
+        if manifest["features"] != FEATURES:
+            raise ValueError("Shard features do not match FEATURES")
+
+        if manifest["classes"] != [str(company) for company in encoder.classes_]:
+            raise ValueError("Shard bundle was trained with a different encoder")
+
+        return cls(path, manifest, encoder, backend)
+
+    @property
+    def companies(self):
+
+        return set(self.manifest["companies"])
+
+    def loaded_shards(self):
+
+        return sorted(self.predictors)
+
+    def _predictor(self, name, sample):
+
+        predictor = self.predictors.get(name)
+
+        if predictor is not None:
+            return predictor
+
+        with self.lock:
+
+            predictor = self.predictors.get(name)
+
+            if predictor is not None:
+                return predictor
+
+            model = joblib.load(
+                os.path.join(self.path, self.manifest["shards"][name]["file"])
+            )
+
+            try:
+                predictor = make_predictor(model, self.backend, sample=sample)
+            except ValueError as e:
+                print(f"❌ Inference backend error for shard {name}:", str(e))
+                predictor = make_predictor(model, "sklearn")
+
+            self.predictors[name] = predictor
+
+            print(f"✅ Loaded model shard {name}")
+
+        return predictor
+
+    def predict(self, rows):
+
+        rows = np.asarray(rows, dtype=np.float64)
+
+        if rows.ndim == 1:
+            rows = rows[None, :]
+
+        codes = rows[:, FEATURES.index("company_encoded")].astype(np.int64)
+
+        predictions = np.empty(len(rows), dtype=np.float64)
+        groups = {}
+
+        for position, code in enumerate(codes.tolist()):
+            groups.setdefault(self.shard_of_code[code], []).append(position)
+
+        for name, positions in groups.items():
+
+            shard_rows = rows[positions]
+
+            predictions[positions] = self._predictor(name, shard_rows)(shard_rows)
+
+        return predictions
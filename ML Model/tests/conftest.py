@@ -0,0 +1,90 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+# The ML Model modules are flat scripts imported by name.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+COMPANIES = ["ALPHA", "BETA", "GAMMA", "DELTA"]
+
+
+def make_prices(companies=COMPANIES, days=80, seed=7):
+
+    # Small random-walk universe in the cleaned nse_prices.csv layout.
+
+    rng = np.random.default_rng(seed)
+
+    dates = pd.bdate_range("2024-01-01", periods=days)
+
+    frames = []
+
+    for company in companies:
+
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.02, days))
+        open_price = close * (1 + rng.normal(0, 0.005, days))
+
+        frames.append(pd.DataFrame({
+            "trade_date": dates.strftime("%Y-%m-%d"),
+            "company": company,
+            "open": open_price.round(2),
+            "high": (np.maximum(open_price, close) * 1.01).round(2),
+            "low": (np.minimum(open_price, close) * 0.99).round(2),
+            "close": close.round(2)
+        }))
+
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.fixture
+def prices_csv(tmp_path):
+
+    path = tmp_path / "nse_prices.csv"
+
+    make_prices().to_csv(path, index=False)
+
+    return str(path)
+
+
+@pytest.fixture
+def store_dir(tmp_path, prices_csv):
+
+    # Sentiment (per company, with gaps), macro (market-wide) and global
+    # index (previous session only) sources.
+
+    prices = pd.read_csv(prices_csv)
+    dates = sorted(prices["trade_date"].unique())
+
+    rng = np.random.default_rng(3)
+
+    sentiment = prices[["trade_date", "company"]].iloc[::3].copy()
+    sentiment["sentiment_score"] = rng.uniform(-1, 1, len(sentiment)).round(3)
+
+    macro = pd.DataFrame({
+        "trade_date": dates[::2],
+        "inflation_rate": rng.uniform(4, 7, len(dates[::2])).round(2),
+        "interest_rate": rng.uniform(5, 8, len(dates[::2])).round(2)
+    })
+    macro["real_interest_rate"] = macro["interest_rate"] - macro["inflation_rate"]
+
+    indices = pd.DataFrame({
+        "trade_date": dates,
+        "index_name": "SP500",
+        "index_daily_return_pct": rng.normal(0, 1, len(dates)).round(3),
+        "avg_return_7d": rng.normal(0, 0.5, len(dates)).round(3),
+        "volatility_7d_pct": rng.uniform(0.5, 2, len(dates)).round(3),
+        "drawdown_pct": rng.uniform(-10, 0, len(dates)).round(3)
+    })
+
+    directory = tmp_path / "store"
+    directory.mkdir()
+
+    sentiment.to_csv(directory / "daily_sentiment.csv", index=False)
+    macro.to_csv(directory / "inflation_interest.csv", index=False)
+    indices.to_csv(directory / "global_indices.csv", index=False)
+
+    return str(directory)
@@ -0,0 +1,98 @@
+import importlib
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import LabelEncoder
+
+from features import FEATURES, FeatureEngine, add_features, clean_prices, encoder_mapping
+from inference import make_predictor
+from serving_state import ServingState
+
+from conftest import make_prices
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+
+    # A fresh app module with no artifacts loaded; tests install their
+    # own snapshots.
+
+    monkeypatch.setenv("LOAD_ARTIFACTS", "0")
+    monkeypatch.setenv("MICRO_BATCHING", "0")
+    monkeypatch.setenv("RELOAD_POLL_SECONDS", "0")
+    monkeypatch.setenv("BAR_LOG_PATH", str(tmp_path / "ingested_bars.jsonl"))
+
+    sys.modules.pop("app", None)
+
+    app = importlib.import_module("app")
+
+    yield app
+
+    sys.modules.pop("app", None)
+
+
+def serving_state(version, seed):
+
+    df = clean_prices(make_prices())
+
+    encoder = LabelEncoder().fit(df["company"])
+    df["company_encoded"] = encoder.transform(df["company"])
+
+    engine = FeatureEngine.from_frame(df, encoder_mapping(encoder))
+
+    train = add_features(df).dropna()
+
+    model = RandomForestRegressor(n_estimators=3, random_state=seed)
+    model.fit(train[FEATURES], train["close"])
+
+    return ServingState(model, encoder, engine, version, make_predictor(model))
+
+
+def test_reload_clears_the_prediction_cache(api, monkeypatch):
+
+    api.state = serving_state("v1", seed=0)
+
+    client = TestClient(api.app)
+
+    bar = {"company": "ALPHA", "open": 100.0, "high": 102.0, "low": 99.0, "close": 101.0}
+
+    first = client.post("/predict", json=bar).json()
+    again = client.post("/predict", json=bar).json()
+
+    assert again == first
+    assert api.prediction_cache.stats()["hits"] == 1
+
+    new_state = serving_state("v2", seed=1)
+
+    monkeypatch.setattr(api, "load_state", lambda *args, **kwargs: new_state)
+
+    assert api.reload_state()
+    assert api.state is new_state
+    assert api.prediction_cache.stats()["entries"] == 0
+
+    reloaded = client.post("/predict", json=bar).json()
+
+    latest, last_date = new_state.engine.latest("ALPHA")
+    expected = new_state.predictor([new_state.feature_row("ALPHA", latest, last_date, 100.0, 102.0, 99.0, 101.0)])[0]
+
+    # Computed by the new model, not served from the old entry.
+    assert reloaded["prediction"] == round(float(expected), 2)
+    assert api.prediction_cache.stats()["hits"] == 1
+
+
+@pytest.mark.parametrize("configured, sent, status", [
+    ("", "", 403),
+    ("secret", "", 401),
+    ("secret", "wrong", 401),
+    ("secret", "secret", 200)
+])
+def test_admin_reload_needs_the_token(api, monkeypatch, configured, sent, status):
+
+    monkeypatch.setattr(api, "ADMIN_TOKEN", configured)
+    monkeypatch.setattr(api, "reload_state", lambda: True)
+
+    response = TestClient(api.app).post("/admin/reload?wait=true", headers={"X-Admin-Token": sent})
+
+    assert response.status_code == status
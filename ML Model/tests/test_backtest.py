@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import walk_forward_folds
+
+
+@pytest.mark.parametrize("mode", ["expanding", "rolling"])
+@pytest.mark.parametrize("gap", [1, 5])
+def test_folds_purge_labels_that_reach_the_test_block(mode, gap):
+
+    dates = pd.bdate_range("2024-01-01", periods=120).to_numpy()
+
+    plan = walk_forward_folds(dates, folds=4, mode=mode, window=30, gap=gap)
+
+    assert len(plan) == 4
+
+    for fold in plan:
+
+        train_end = np.searchsorted(dates, fold["train_end"])
+        test_start = np.searchsorted(dates, fold["test_start"])
+
+        # The last training row's target is `gap` days ahead at most.
+        assert train_end + gap < test_start
+        assert train_end + gap + 1 == test_start
+
+        if mode == "rolling":
+            assert train_end - np.searchsorted(dates, fold["train_start"]) + 1 == 30
@@ -0,0 +1,21 @@
+import numpy as np
+
+from feature_index import COLUMN_POSITION, LATEST_COLUMNS, FeatureIndex
+
+
+def test_lookups_follow_set():
+
+    rows = np.arange(2 * len(LATEST_COLUMNS), dtype=np.float64).reshape(2, -1)
+
+    index = FeatureIndex(["ALPHA", "BETA"], rows)
+
+    np.testing.assert_array_equal(index.get("BETA"), rows[1])
+    assert index.get("GAMMA") is None
+
+    index.set("ALPHA", np.full(len(LATEST_COLUMNS), 7.0))
+    index.set("GAMMA", np.full(len(LATEST_COLUMNS), 9.0))
+
+    assert index.get("ALPHA")[COLUMN_POSITION["close"]] == 7.0
+    assert index.get("GAMMA")[COLUMN_POSITION["ma_5"]] == 9.0
+    np.testing.assert_array_equal(index.get("BETA"), rows[1])
+    assert len(index) == 3 and "GAMMA" in index
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+from feature_store import FeatureStore
+from features import FEATURES
+from train_model import add_store_columns, load_training_frame
+
+
+def test_join_is_as_of(store_dir):
+
+    store = FeatureStore.load(store_dir)
+
+    sentiment = pd.read_csv(f"{store_dir}/daily_sentiment.csv", parse_dates=["trade_date"])
+    macro = pd.read_csv(f"{store_dir}/inflation_interest.csv", parse_dates=["trade_date"])
+
+    queries = pd.DataFrame({
+        "company": ["ALPHA", "ALPHA", "BETA", "UNKNOWN"],
+        "trade_date": pd.to_datetime(["2024-01-01", "2024-02-14", "2024-03-20", "2024-02-14"])
+    })
+
+    joined = store.join(queries["company"], queries["trade_date"])
+
+    for row, query in enumerate(queries.itertuples()):
+
+        known = sentiment[
+            (sentiment["company"] == query.company)
+            & (sentiment["trade_date"] <= query.trade_date)
+        ]
+
+        expected = known["sentiment_score"].iloc[-1] if len(known) else np.nan
+
+        np.testing.assert_equal(joined[row, store.columns.index("sentiment_score")], expected)
+
+        expected_macro = macro[macro["trade_date"] <= query.trade_date].iloc[-1]
+
+        assert joined[row, store.columns.index("inflation_rate")] == expected_macro["inflation_rate"]
+
+
+def test_store_columns_keep_float_values(prices_csv, store_dir):
+
+    df, encoder, engine = load_training_frame(prices_csv)
+
+    X = df[FEATURES]
+    dates = df["trade_date"].to_numpy()
+    companies = df["company"].to_numpy()
+
+    X_store, y, kept_dates, store = add_store_columns(X, df["target"], dates, companies, store_dir)
+
+    assert len(X_store) == len(y) == len(kept_dates)
+
+    values = X_store[store.columns].to_numpy()
+
+    assert X_store[store.columns].dtypes.eq(np.float64).all()
+    assert not np.isnan(values).any()
+    assert (values != np.round(values)).any(axis=0).all()
+
+    expected = store.join(companies, dates)
+    expected = expected[~np.isnan(expected).any(axis=1)]
+
+    np.testing.assert_array_equal(values, expected)
+
+
+def test_serving_rows_match_training_rows(prices_csv, store_dir):
+
+    df, encoder, engine = load_training_frame(prices_csv)
+
+    dates = df["trade_date"].to_numpy()
+    companies = df["company"].to_numpy()
+
+    X_store, y, kept_dates, store = add_store_columns(df[FEATURES], df["target"], dates, companies, store_dir)
+
+    kept_companies = df.loc[X_store.index, "company"].to_numpy()
+
+    for company, trade_date, row in zip(kept_companies, kept_dates, X_store[store.columns].to_numpy()):
+        np.testing.assert_array_equal(store.latest(company, trade_date), row)
+
+    # At each company's last bar, the global index is the previous
+    # session's, exactly as in training.
+    store.prepare(engine.index.companies, [engine.last_date(company) for company in engine.index.companies])
+
+    indices = pd.read_csv(f"{store_dir}/global_indices.csv", parse_dates=["trade_date"])
+    column = store.columns.index("sp500_drawdown_pct")
+
+    for company in engine.index.companies:
+
+        last = engine.last_date(company)
+
+        expected = indices[indices["trade_date"] < last]["drawdown_pct"].iloc[-1]
+
+        assert store.rows[company][1][column] == expected
+        np.testing.assert_array_equal(store.latest(company, last), store.join([company], [last])[0])
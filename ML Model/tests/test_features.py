@@ -0,0 +1,85 @@
+import numpy as np
+
+from feature_index import COLUMN_POSITION
+from features import FeatureEngine, add_features, clean_prices
+
+from conftest import make_prices
+
+
+def engine_for(prices):
+
+    df = clean_prices(prices)
+
+    mapping = {company: code for code, company in enumerate(sorted(df["company"].unique()))}
+
+    return FeatureEngine.from_frame(df, mapping)
+
+
+def test_newer_bars_matches_update_without_applying():
+
+    engine = engine_for(make_prices())
+
+    last = str(engine.last_date("ALPHA"))[:10]
+
+    bars = [
+        {"company": "ALPHA", "trade_date": "2030-01-02"},
+        {"company": "ALPHA", "trade_date": "2030-01-02"},
+        {"company": "ALPHA", "trade_date": last},
+        {"company": "BETA", "trade_date": "2030-01-03"},
+        {"company": "UNKNOWN", "trade_date": "2030-01-03"}
+    ]
+
+    expected = [True, False, False, True, False]
+
+    assert engine.newer_bars(bars) == expected
+    assert str(engine.last_date("ALPHA"))[:10] == last
+
+    applied = [
+        engine.update(bar["company"], bar["trade_date"], 1.0, 1.0, 1.0, 1.0)
+        for bar in bars
+    ]
+
+    assert applied == expected
+
+
+def test_incremental_engine_matches_bulk_features():
+
+    prices = clean_prices(make_prices())
+
+    dates = sorted(prices["trade_date"].unique())
+
+    seed = prices[prices["trade_date"] < dates[30]]
+    rest = prices[prices["trade_date"] >= dates[30]].sort_values(["trade_date", "company"])
+
+    engine = engine_for(seed)
+
+    for bar in rest.itertuples(index=False):
+        assert engine.update(bar.company, bar.trade_date, bar.open, bar.high, bar.low, bar.close)
+
+    bulk = add_features(prices.copy()).groupby("company").tail(1).set_index("company")
+
+    for company, expected in bulk.iterrows():
+
+        row = engine.index.get(company)
+
+        for column in ["prev_close", "ma_5", "ma_10", "open", "high", "low", "close"]:
+            assert np.isclose(row[COLUMN_POSITION[column]], expected[column], rtol=1e-12)
+
+
+def test_latest_row_and_date_are_read_together():
+
+    engine = engine_for(make_prices())
+
+    row, last = engine.latest("ALPHA")
+
+    assert last == engine.last_date("ALPHA")
+
+    assert engine.update("ALPHA", "2030-01-02", 1.0, 2.0, 0.5, 1.5)
+
+    # The earlier read is a snapshot, not a view of the updated row.
+    new_row, new_last = engine.latest("ALPHA")
+
+    assert row[COLUMN_POSITION["close"]] != 1.5
+    assert new_row[COLUMN_POSITION["close"]] == 1.5
+    assert new_last > last
+    assert engine.latest("UNKNOWN") == (None, None)
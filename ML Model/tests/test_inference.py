@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from features import FEATURES
+from inference import CompiledForest, make_predictor
+
+
+def fitted_forest(outputs=1):
+
+    rng = np.random.default_rng(1)
+
+    X = pd.DataFrame(rng.normal(100, 10, (300, len(FEATURES))), columns=FEATURES)
+    y = X["close"].to_numpy()[:, None] + rng.normal(0, 1, (len(X), outputs))
+
+    model = RandomForestRegressor(n_estimators=5, max_depth=8, random_state=0)
+    model.fit(X, y[:, 0] if outputs == 1 else y)
+
+    return model, X
+
+
+@pytest.mark.parametrize("outputs", [1, 3])
+def test_compiled_forest_matches_sklearn(outputs):
+
+    model, X = fitted_forest(outputs)
+
+    predictor = make_predictor(model, "compiled", sample=X.to_numpy()[:50])
+
+    np.testing.assert_allclose(predictor(X.to_numpy()), model.predict(X), rtol=0, atol=1e-9)
+
+
+def test_saved_forest_predicts_the_same(tmp_path):
+
+    model, X = fitted_forest()
+
+    CompiledForest.from_sklearn(model).save(str(tmp_path / "forest"))
+
+    forest = CompiledForest.load(str(tmp_path / "forest"))
+
+    assert forest.max_difference(model, X.to_numpy()) <= 1e-9
@@ -0,0 +1,16 @@
+from metrics import Metrics
+
+
+def test_replace_keeps_only_the_current_label_set():
+
+    metrics = Metrics()
+
+    metrics.replace("model_info", 1, version="old")
+    metrics.set("other", 1, version="old")
+    metrics.replace("model_info", 1, version="new")
+
+    text = metrics.render()
+
+    assert 'model_info{version="new"} 1' in text
+    assert 'model_info{version="old"}' not in text
+    assert 'other{version="old"} 1' in text
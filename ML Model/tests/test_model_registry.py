@@ -0,0 +1,21 @@
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import LabelEncoder
+
+from model_registry import latest_version, list_versions, register_model
+
+
+def test_same_second_registrations_get_distinct_versions(tmp_path):
+
+    X = np.random.default_rng(0).normal(size=(40, 3))
+    model = RandomForestRegressor(n_estimators=2, random_state=0).fit(X, X[:, 0])
+    encoder = LabelEncoder().fit(["ALPHA", "BETA"])
+
+    versions = [
+        register_model(str(tmp_path), model, encoder, {"data_hash": "abc123def456"})
+        for _ in range(3)
+    ]
+
+    assert len(set(versions)) == 3
+    assert sorted(list_versions(str(tmp_path))) == sorted(versions)
+    assert latest_version(str(tmp_path)) == versions[-1]
@@ -0,0 +1,46 @@
+import os
+
+import joblib
+
+import train_model
+
+from model_registry import file_hash
+from serving_state import load_state, resolve_model_paths
+from sharding import SHARD_ENCODER_FILE
+
+
+def test_sharded_training_keeps_the_legacy_encoder(prices_csv, tmp_path, monkeypatch):
+
+    shards = tmp_path / "model_shards"
+
+    monkeypatch.setattr(train_model, "SHARDS_PATH", str(shards))
+    monkeypatch.setattr(train_model, "SNAPSHOT_PATH", str(tmp_path / "feature_snapshot"))
+
+    legacy = os.path.join(train_model.BASE_DIR, "company_encoder.pkl")
+    before = file_hash(legacy)
+
+    train_model.train_sharded(
+        prices_csv,
+        by="company",
+        params={"n_estimators": 3},
+        workers=1,
+        trace_memory=False
+    )
+
+    assert file_hash(legacy) == before
+    assert os.path.exists(shards / SHARD_ENCODER_FILE)
+
+    model_path, encoder_path = resolve_model_paths(
+        str(tmp_path / "registry"),
+        "latest",
+        "unused.pkl",
+        legacy,
+        shards=str(shards)
+    )
+
+    assert encoder_path == str(shards / SHARD_ENCODER_FILE)
+
+    state = load_state(model_path, encoder_path, prices_csv, strict=True)
+
+    assert list(state.encoder.classes_) == list(joblib.load(encoder_path).classes_)
+    assert state.supported == {"ALPHA", "BETA", "GAMMA", "DELTA"}
@@ -0,0 +1,20 @@
+import json
+
+from train_model import MODEL_PARAMS, load_model_params
+
+
+def test_tuned_params_are_opt_in_and_keep_the_tree_count(tmp_path):
+
+    path = tmp_path / "model_params.json"
+
+    path.write_text(json.dumps({
+        "params": {"max_depth": 8, "min_samples_leaf": 5, "max_features": "sqrt", "n_estimators": 10}
+    }))
+
+    assert load_model_params(str(path)) == (MODEL_PARAMS, "defaults")
+
+    params, source = load_model_params(str(path), use_tuned=True)
+
+    assert source == "model_params.json"
+    assert params["n_estimators"] == MODEL_PARAMS["n_estimators"]
+    assert (params["max_depth"], params["min_samples_leaf"], params["max_features"]) == (8, 5, "sqrt")
@@ -0,0 +1,27 @@
+import numpy as np
+
+from features import FEATURES
+from train_model import load_training_frame
+from training_data import load_training_matrix
+
+
+def test_chunked_loader_matches_pandas_path(prices_csv):
+
+    df, encoder, engine = load_training_frame(prices_csv, horizons=(1, 5))
+
+    X, y, dates, chunked_encoder, chunked_engine = load_training_matrix(
+        prices_csv,
+        chunksize=50,
+        horizons=(1, 5)
+    )
+
+    assert list(chunked_encoder.classes_) == list(encoder.classes_)
+
+    # The chunked loader reads prices as float32, so high - low carries
+    # float32 rounding of the ~100 price level.
+    np.testing.assert_allclose(X, df[FEATURES].to_numpy(dtype=np.float32), rtol=1e-6, atol=1e-5)
+    np.testing.assert_allclose(y, df[["target", "target_5d"]].to_numpy(), rtol=1e-6)
+    assert (dates == df["trade_date"].to_numpy(dtype="datetime64[ns]")).all()
+
+    assert chunked_engine.index.companies == engine.index.companies
+    np.testing.assert_array_equal(chunked_engine.index.values, engine.index.values)
@@ -1,3 +1,7 @@
+import argparse
+import json
+import os
+import time
 
 import pandas as pd
 import numpy as np
@@ -8,103 +12,824 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, r2_score
 from sklearn.preprocessing import LabelEncoder
 
+from features import (
+    FEATURES,
+    HORIZONS,
+    FeatureEngine,
+    add_features,
+    add_targets,
+    encoder_mapping,
+    load_prices,
+    target_columns
+)
+from feature_snapshot import save_snapshot
+from profiling import NULL_PROFILER, REPORT_FILE, RunProfiler
+from training_data import CHUNK_SIZE, load_training_matrix
+
 
-df = pd.read_csv(
-    r"stock_market_clean_dataset_with_Feature_Eng\nse_prices.csv"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DATA_PATH = os.path.join(
+    BASE_DIR,
+    "..",
+    "stock_market_clean_dataset_with_Feature_Eng",
+    "nse_prices.csv"
 )
 
-print("Dataset Loaded")
+FUNDAMENTALS_PATH = os.path.join(
+    BASE_DIR,
+    "..",
+    "stock_market_clean_dataset_with_Feature_Eng",
+    "company_fundamentals.csv"
+)
 
+# Every trained model is registered here under a new version id.
+REGISTRY_PATH = os.environ.get("MODEL_REGISTRY", os.path.join(BASE_DIR, "registry"))
 
-df = df.dropna()
+SNAPSHOT_PATH = os.path.join(BASE_DIR, "feature_snapshot")
+SHARDS_PATH = os.path.join(BASE_DIR, "model_shards")
 
-df["trade_date"] = pd.to_datetime(df["trade_date"])
+# Cleaned auxiliary CSVs joined on by --store (see feature_store.py).
+STORE_PATH = os.environ.get(
+    "FEATURE_STORE_PATH",
+    os.path.join(BASE_DIR, "..", "stock_market_clean_dataset_with_Feature_Eng")
+)
 
-df = df.sort_values(["company", "trade_date"])
+# Winning config of the last --tune run; used by train() when present.
+PARAMS_PATH = os.path.join(BASE_DIR, "model_params.json")
+TUNING_CACHE_PATH = os.path.join(BASE_DIR, "tuning_cache.jsonl")
 
+MODEL_PARAMS = {
+    "n_estimators": 100,
+    "max_depth": 5,
+    "random_state": 42,
+    "n_jobs": -1
+}
 
-encoder = LabelEncoder()
 
-df["company_encoded"] = encoder.fit_transform(df["company"])
+def build_model(**overrides):
 
+    return RandomForestRegressor(**{**MODEL_PARAMS, **overrides})
 
-df["prev_close"] = df.groupby("company")["close"].shift(1)
 
-df["ma_5"] = df.groupby("company")["close"].rolling(5).mean().reset_index(0, drop=True)
+# Parameters --use-tuned takes from model_params.json. The tree count
+# stays MODEL_PARAMS': the search's last round may have used far fewer.
+TUNED_PARAMS = ["max_depth", "min_samples_leaf", "max_features"]
 
-df["ma_10"] = df.groupby("company")["close"].rolling(10).mean().reset_index(0, drop=True)
 
-df["volatility"] = df["high"] - df["low"]
+def load_model_params(path=PARAMS_PATH, use_tuned=False):
 
-df["target"] = df.groupby("company")["close"].shift(-1)
+    # (params, source): MODEL_PARAMS, with the tuned structural
+    # parameters on top when asked for. The source is recorded in the
+    # run report and the registered version.
 
-df = df.dropna()
+    if not use_tuned:
+        return dict(MODEL_PARAMS), "defaults"
 
-print("Feature Engineering Done")
+    if not os.path.exists(path):
+        raise SystemExit(f"--use-tuned: {path} not found; run train_model.py --tune first")
 
+    with open(path) as f:
+        tuned = json.load(f)
 
-features = [
-    "company_encoded",
-    "open",
-    "high",
-    "low",
-    "close",
-    "prev_close",
-    "ma_5",
-    "ma_10",
-    "volatility"
-]
+    print("Using tuned parameters from", path)
 
-X = df[features]
-y = df["target"]
+    return {
+        **MODEL_PARAMS,
+        **{name: tuned["params"][name] for name in TUNED_PARAMS if name in tuned["params"]}
+    }, os.path.basename(path)
 
 
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, shuffle=False
-)
+def load_training_frame(data_path=DATA_PATH, horizons=(1,), profiler=NULL_PROFILER):
 
+    with profiler.stage("read_csv") as stage:
 
+        df = load_prices(data_path)
 
-model = RandomForestRegressor(
-    n_estimators=100,
-    max_depth=5,
-    random_state=42,
-    n_jobs=-1
-)
+        stage["rows"] = len(df)
 
-model.fit(X_train, y_train)
+    print("Dataset Loaded")
 
-print("Model Trained")
 
+    with profiler.stage("encode") as stage:
 
-predictions = model.predict(X_test)
+        encoder = LabelEncoder()
 
-mae = mean_absolute_error(y_test, predictions)
-r2 = r2_score(y_test, predictions)
+        df["company_encoded"] = encoder.fit_transform(df["company"])
 
-print("\nRESULTS:")
-print("MAE:", round(mae, 2))
-print("R2 Score:", round(r2, 4))
+        stage["rows"] = len(df)
 
 
+    with profiler.stage("snapshot_state") as stage:
 
-joblib.dump(
-    model,
-    r"FULL_STACK_FROJECT\ML Model\stock_model.pkl"
-)
+        # Ring buffers for the serving snapshot, seeded from the last bars of
+        # each company before the target drops its final day.
+        engine = FeatureEngine.from_frame(df, encoder_mapping(encoder))
 
-joblib.dump(
-    encoder,
-    r"FULL_STACK_FROJECT\ML Model\company_encoder.pkl"
-)
+        stage["rows"] = len(engine.index)
+
+    with profiler.stage("features") as stage:
+
+        df = add_features(df)
+
+        df = add_targets(df, horizons)
+
+        df = df.dropna()
+
+        stage["rows"] = len(df)
+
+    print("Feature Engineering Done")
+
+    return df, encoder, engine
+
+
+def add_store_columns(X, y, dates, companies, store_path):
+
+    # Appends the as-of feature store columns and drops the rows that
+    # have no value for one of them (e.g. before a source begins).
+
+    from feature_store import FeatureStore
+
+    store = FeatureStore.load(store_path)
+
+    joined = store.join(companies, dates)
+
+    keep = ~np.isnan(joined).any(axis=1)
+
+    print(f"Feature store: {', '.join(store.names)} ({len(store.columns)} columns), kept {int(keep.sum())} of {len(keep)} rows")
+
+    # Store values are real-valued: float32 on the --lean path (float32
+    # prices), float64 otherwise; never the dtype of company_encoded.
+    dtype = np.float32 if X["close"].dtype == np.float32 else np.float64
+
+    extra = pd.DataFrame(
+        joined[keep].astype(dtype),
+        columns=store.columns,
+        index=X.index[keep]
+    )
+
+    X = pd.concat([X[keep], extra], axis=1)
+
+    return X, y[keep], dates[keep], store
+
+
+def parse_horizons(value):
+
+    horizons = sorted({int(horizon) for horizon in value.split(",")})
+
+    if not horizons or horizons[0] < 1:
+        raise argparse.ArgumentTypeError("horizons must be positive trading day counts")
+
+    return horizons
+
+
+def horizon_metrics(y_test, predictions, horizons):
+
+    y_test = np.asarray(y_test).reshape(len(predictions), -1)
+    predictions = np.asarray(predictions).reshape(len(y_test), -1)
+
+    return {
+        str(horizon): {
+            "mae": float(mean_absolute_error(y_test[:, column], predictions[:, column])),
+            "r2": float(r2_score(y_test[:, column], predictions[:, column]))
+        }
+        for column, horizon in enumerate(horizons)
+    }
+
+
+def train(
+    data_path=DATA_PATH,
+    params=None,
+    lean=False,
+    chunksize=CHUNK_SIZE,
+    store_path=None,
+    horizons=(1,),
+    profile=False,
+    trace_memory=True,
+    params_source="defaults"
+):
+
+    # With several horizons one forest is fit on all targets at once
+    # (RandomForestRegressor is natively multi-output), so features are
+    # built and trees are grown once for every horizon. Every stage is
+    # timed; the run report is written into the registered version.
+
+    profiler = RunProfiler("full", trace_memory=trace_memory, profile=profile)
+
+    horizons = list(horizons)
+    targets = target_columns(horizons)
+
+    if lean:
+
+        X, y, dates, encoder, engine = load_training_matrix(
+            data_path,
+            chunksize,
+            horizons,
+            profiler=profiler
+        )
+
+        X = pd.DataFrame(X, columns=FEATURES, copy=False)
+        y = (
+            pd.Series(y, name=targets[0])
+            if len(targets) == 1
+            else pd.DataFrame(y, columns=targets)
+        )
+
+        companies = encoder.classes_[X["company_encoded"].to_numpy().astype(np.int64)]
+
+    else:
+
+        df, encoder, engine = load_training_frame(data_path, horizons, profiler)
+
+        features = FEATURES
+
+        X = df[features]
+        y = df[targets[0]] if len(targets) == 1 else df[targets]
+        dates = df["trade_date"].to_numpy()
+
+        companies = df["company"].to_numpy()
+
+    store = None
+
+    if store_path is not None:
+
+        with profiler.stage("store_join") as stage:
+
+            X, y, dates, store = add_store_columns(X, y, dates, companies, store_path)
+
+            stage["rows"] = len(X)
+
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, shuffle=False
+    )
+
+
+
+    with profiler.stage("fit") as stage:
+
+        model = build_model(**(params or {}))
+
+        model.fit(X_train, y_train)
+
+        stage["rows"] = len(X_train)
+
+    print("Model Trained")
+
+
+    with profiler.stage("evaluate") as stage:
+
+        predictions = model.predict(X_test)
+
+        metrics = horizon_metrics(y_test, predictions, horizons)
+
+        stage["rows"] = len(X_test)
+
+    # The shortest horizon is the headline number.
+    mae = metrics[str(horizons[0])]["mae"]
+    r2 = metrics[str(horizons[0])]["r2"]
+
+    print("\nRESULTS:")
+
+    if len(horizons) == 1:
+        print("MAE:", round(mae, 2))
+        print("R2 Score:", round(r2, 4))
+    else:
+        for horizon, scores in metrics.items():
+            print(f"{horizon}d  MAE: {round(scores['mae'], 2)}  R2 Score: {round(scores['r2'], 4)}")
+
+
+
+    with profiler.stage("save_snapshot") as stage:
+
+        save_snapshot(
+            SNAPSHOT_PATH,
+            engine,
+            encoder,
+            data_path
+        )
+
+        stage["rows"] = len(engine.index)
+
+
+    from incremental import initial_state
+    from model_registry import file_hash, register_model
+
+    train_dates = dates[:len(X_train)]
+    params = {**MODEL_PARAMS, **(params or {})}
+
+    with profiler.stage("register"):
+
+        version = register_model(
+            REGISTRY_PATH,
+            model,
+            encoder,
+            {
+                "kind": "full",
+                "features": list(X.columns),
+                "store": {
+                    "sources": store.names,
+                    "columns": store.columns
+                } if store is not None else None,
+                "params": params,
+                "params_source": params_source,
+                "horizons": horizons,
+                "train_start": str(np.min(train_dates))[:10],
+                "train_end": str(np.max(train_dates))[:10],
+                "train_rows": int(len(X_train)),
+                "metrics": {
+                    "mae": float(mae),
+                    "r2": float(r2),
+                    "test_rows": int(len(X_test)),
+                    "horizons": metrics
+                },
+                "data_path": os.path.basename(data_path),
+                "data_hash": file_hash(data_path)
+            },
+            training_state=initial_state(model, train_dates, params)
+        )
+
+    print("\nRegistered model version", version)
+
+    print("\nModel Saved Successfully")
+
+
+    sample = X_test.iloc[-1:]
+
+    pred = np.atleast_1d(model.predict(sample)[0])
+    actual = np.atleast_1d(y_test.iloc[-1])
+
+    for horizon, predicted, expected in zip(horizons, pred, actual):
+
+        label = "" if len(horizons) == 1 else f" ({horizon}d)"
+
+        print(f"\nPrediction{label}:", round(float(predicted), 2))
+        print(f"Actual{label}:", round(float(expected), 2))
+
+    write_run_report(
+        profiler,
+        os.path.join(REGISTRY_PATH, version),
+        version=version,
+        data_path=data_path,
+        params=params,
+        params_source=params_source
+    )
+
+
+def write_run_report(profiler, directory, **info):
+
+    profiler.info.update(info)
+    profiler.print_summary()
+
+    report = profiler.write(directory)
+
+    peak = report["peak_rss_mb"]
+
+    if peak is not None:
+        print("Peak RSS:", round(peak, 1), "MB")
+
+    print(f"Slowest stage: {report['slowest_stage']}")
+
+    if "profile" in report:
+        print("Profile:", os.path.join(directory, report["profile"]["file"]))
+
+    print("Run report:", os.path.join(directory, REPORT_FILE))
+
+
+def train_incremental(
+    data_path=DATA_PATH,
+    strategy="replace",
+    window_days=250,
+    trees_per_day=5,
+    forest_size=None,
+    chunksize=CHUNK_SIZE,
+    profile=False,
+    trace_memory=True
+):
+
+    # Nightly update: folds the trade dates added since the last run
+    # into the saved forest instead of refitting every tree.
+
+    from incremental import update_model
+    from model_registry import (
+        file_hash,
+        load_version,
+        read_training_state,
+        register_model,
+        resolve_version
+    )
+
+    started = time.perf_counter()
+
+    profiler = RunProfiler("incremental", trace_memory=trace_memory, profile=profile)
+
+    version_path = resolve_version(REGISTRY_PATH)
+    state = (
+        read_training_state(version_path)
+        if version_path is not None
+        else None
+    )
+
+    if state is None:
+        raise SystemExit("No registered training state found; run a full training first")
+
+    with profiler.stage("load_model") as stage:
+
+        model, saved_encoder, _, meta = load_version(version_path, mmap_mode=None)
+
+        stage["trees"] = len(model.estimators_)
+
+    if meta["features"] != FEATURES:
+        raise SystemExit("Incremental updates do not support feature store models; run a full training")
+
+    # New trees are fit on the same targets as the old ones.
+    X, y, dates, encoder, engine = load_training_matrix(
+        data_path,
+        chunksize,
+        meta.get("horizons", [1]),
+        profiler=profiler
+    )
+
+    # New trees must see the same company_encoded codes as the old ones.
+    if list(encoder.classes_) != list(saved_encoder.classes_):
+        raise SystemExit("Company list changed; run a full training first")
+
+    with profiler.stage("update") as stage:
+
+        applied = update_model(
+            model,
+            state,
+            X,
+            y,
+            dates,
+            strategy=strategy,
+            window_days=window_days,
+            trees_per_day=trees_per_day,
+            max_trees=forest_size
+        )
+
+        stage["days"] = applied
+
+    if not applied:
+        print("No new trade dates since", state["last_date"])
+        profiler.finish()
+        return
+
+    with profiler.stage("save_snapshot") as stage:
+
+        save_snapshot(
+            SNAPSHOT_PATH,
+            engine,
+            encoder,
+            data_path
+        )
+
+        stage["rows"] = len(engine.index)
+
+    with profiler.stage("register"):
+
+        version = register_model(
+            REGISTRY_PATH,
+            model,
+            encoder,
+            {
+                "kind": "incremental",
+                "parent": meta["version"],
+                "strategy": strategy,
+                "params": meta.get("params"),
+                "horizons": meta.get("horizons", [1]),
+                "train_start": meta.get("train_start"),
+                "train_end": state["last_date"],
+                "metrics": None,
+                "data_path": os.path.basename(data_path),
+                "data_hash": file_hash(data_path)
+            },
+            training_state=state
+        )
+
+    print(
+        f"Added {applied} trade dates up to {state['last_date']}"
+        f" ({len(model.estimators_)} trees) in {time.perf_counter() - started:.1f}s"
+    )
+    print("Registered model version", version)
+
+    write_run_report(profiler, os.path.join(REGISTRY_PATH, version), version=version, data_path=data_path)
+
+
+def train_sharded(
+    data_path=DATA_PATH,
+    by="sector",
+    only=None,
+    params=None,
+    workers=None,
+    profile=False,
+    trace_memory=True,
+    params_source="defaults"
+):
+
+    from sharding import SHARD_ENCODER_FILE, load_sector_map, train_shards
+
+    # Shards are fit in worker processes, so the fit_shards stage's CPU
+    # time and traced memory only cover this (waiting) process.
+    profiler = RunProfiler("sharded", trace_memory=trace_memory, profile=profile)
+
+    df, encoder, engine = load_training_frame(data_path, profiler=profiler)
+
+    sector_map = (
+        load_sector_map(FUNDAMENTALS_PATH)
+        if by == "sector"
+        else None
+    )
+
+    with profiler.stage("fit_shards") as stage:
+
+        manifest = train_shards(
+            df,
+            encoder,
+            SHARDS_PATH,
+            by=by,
+            sector_map=sector_map,
+            only=only,
+            params=params,
+            workers=workers
+        )
+
+        stage["rows"] = len(df)
+
+    # Kept with the shards: company_encoder.pkl belongs to stock_model.pkl.
+    joblib.dump(encoder, os.path.join(SHARDS_PATH, SHARD_ENCODER_FILE))
+
+    with profiler.stage("save_snapshot") as stage:
+
+        save_snapshot(
+            SNAPSHOT_PATH,
+            engine,
+            encoder,
+            data_path
+        )
+
+        stage["rows"] = len(engine.index)
+
+    print(f"\nSaved {len(manifest['shards'])} shards to", SHARDS_PATH)
+
+    write_run_report(
+        profiler,
+        SHARDS_PATH,
+        data_path=data_path,
+        params=params,
+        params_source=params_source
+    )
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Train the next-day close price model."
+    )
+
+    parser.add_argument("--data", default=DATA_PATH)
+
+    parser.add_argument(
+        "--backtest",
+        action="store_true",
+        help="run a walk-forward backtest instead of training"
+    )
+
+    parser.add_argument("--folds", type=int, default=8)
+    parser.add_argument("--mode", choices=["expanding", "rolling"], default="expanding")
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=None,
+        help="trading days per training window in rolling mode"
+    )
+    parser.add_argument(
+        "--gap",
+        type=int,
+        default=1,
+        help="trading days purged between each training block and its test block (at least the target horizon)"
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--report", default=None, help="write the backtest or benchmark report as JSON")
+
+    parser.add_argument(
+        "--lean",
+        action="store_true",
+        help="build the training matrix with the chunked float32 loader"
+    )
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="run every training stage under cProfile and save the slowest stage's profile"
+    )
+    parser.add_argument(
+        "--no-trace-memory",
+        dest="trace_memory",
+        action="store_false",
+        help="skip tracemalloc (peak traced memory per stage) to avoid its overhead"
+    )
+
+    parser.add_argument(
+        "--horizons",
+        type=parse_horizons,
+        default=[1],
+        help=f"comma-separated trading days ahead to forecast with one model, e.g. {','.join(map(str, HORIZONS))}"
+    )
+
+    parser.add_argument(
+        "--store",
+        nargs="?",
+        const=STORE_PATH,
+        default=None,
+        help="also train on the as-of sentiment, volume, macro and index features (optionally from another directory)"
+    )
+
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="fold new trade dates into the saved model instead of refitting it"
+    )
+    parser.add_argument("--strategy", choices=["replace", "warm_start"], default="replace")
+    parser.add_argument("--window-days", type=int, default=250)
+    parser.add_argument("--trees-per-day", type=int, default=5)
+    parser.add_argument(
+        "--forest-size",
+        type=int,
+        default=None,
+        help="trees kept after an incremental update (default: current size)"
+    )
+    parser.add_argument(
+        "--benchmark-days",
+        type=int,
+        default=0,
+        help="compare --incremental against a full refit over the last N days"
+    )
+
+    parser.add_argument(
+        "--shard-by",
+        choices=["sector", "company"],
+        default=None,
+        help="train one model per sector or per company instead of one global model"
+    )
+    parser.add_argument(
+        "--shards",
+        default=None,
+        help="comma-separated shard names to retrain, keeping the others"
+    )
+
+    parser.add_argument(
+        "--tune",
+        action="store_true",
+        help="search hyperparameters with successive halving and save the winner"
+    )
+    parser.add_argument(
+        "--use-tuned",
+        action="store_true",
+        help=f"train or backtest with {', '.join(TUNED_PARAMS)} from model_params.json"
+    )
+
+    parser.add_argument("--candidates", type=int, default=24)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--min-trees", type=int, default=10)
+    parser.add_argument("--max-trees", type=int, default=200)
+    parser.add_argument(
+        "--tune-cache",
+        default=TUNING_CACHE_PATH,
+        help="finished evaluations, reused when a search is resumed"
+    )
+
+    args = parser.parse_args()
+
+    if args.tune:
+
+        from tuning import run_search
+
+        df, _, _ = load_training_frame(args.data)
+
+        result = run_search(
+            df,
+            candidates=args.candidates,
+            min_trees=args.min_trees,
+            max_trees=args.max_trees,
+            eta=args.eta,
+            workers=args.workers,
+            cache_path=args.tune_cache,
+            gap=args.gap
+        )
+
+        with open(PARAMS_PATH, "w") as f:
+            json.dump(result, f, indent=2)
+
+        print("\nBest MAE:", round(result["mae"], 2))
+        print("Best parameters:", result["params"])
+        print("Saved to", PARAMS_PATH)
+
+        return
+
+    params, params_source = load_model_params(use_tuned=args.use_tuned)
+
+    if args.backtest:
+
+        from backtest import run_backtest, print_report, write_report
+
+        df, _, _ = load_training_frame(args.data)
+
+        report = run_backtest(
+            df,
+            folds=args.folds,
+            mode=args.mode,
+            window=args.window,
+            workers=args.workers,
+            params=params,
+            gap=args.gap
+        )
+
+        report["params"] = params
+        report["params_source"] = params_source
+
+        print_report(report)
+
+        if args.report:
+            write_report(report, args.report)
+
+        return
+
+    if args.incremental and args.benchmark_days:
+
+        from incremental import benchmark
+
+        X, y, dates, _, _ = load_training_matrix(args.data, args.chunksize)
+
+        report = benchmark(
+            X,
+            y,
+            dates,
+            params,
+            days=args.benchmark_days,
+            strategy=args.strategy,
+            window_days=args.window_days,
+            trees_per_day=args.trees_per_day
+        )
+
+        mean = report["mean"]
+
+        print(
+            f"\nMean per night: incremental {mean['incremental_seconds']:.2f}s"
+            f" MAE {mean['incremental_mae']:.2f}"
+            f" | full refit {mean['full_seconds']:.2f}s MAE {mean['full_mae']:.2f}"
+        )
+
+        if args.report:
+
+            with open(args.report, "w") as f:
+                json.dump(report, f, indent=2)
+
+        return
+
+    if args.incremental:
+
+        train_incremental(
+            args.data,
+            strategy=args.strategy,
+            window_days=args.window_days,
+            trees_per_day=args.trees_per_day,
+            forest_size=args.forest_size,
+            chunksize=args.chunksize,
+            profile=args.profile,
+            trace_memory=args.trace_memory
+        )
+
+        return
 
+    if args.shard_by:
 
-print("\nModel Saved Successfully")
+        train_sharded(
+            args.data,
+            by=args.shard_by,
+            only=args.shards.split(",") if args.shards else None,
+            params=params,
+            workers=args.workers,
+            profile=args.profile,
+            trace_memory=args.trace_memory,
+            params_source=params_source
+        )
 
+        return
 
-sample = X_test.iloc[-1:]
+    train(
+        args.data,
+        params,
+        lean=args.lean,
+        chunksize=args.chunksize,
+        store_path=args.store,
+        horizons=args.horizons,
+        profile=args.profile,
+        trace_memory=args.trace_memory,
+        params_source=params_source
+    )
 
-pred = model.predict(sample)
 
-print("\nPrediction:", round(pred[0], 2))
-print("Actual:", round(y_test.iloc[-1], 2))
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+from sklearn.preprocessing import LabelEncoder
+
+from features import (
+    FEATURES,
+    PRICE_COLUMNS,
+    WINDOW,
+    FeatureEngine,
+    encoder_mapping
+)
+from profiling import NULL_PROFILER
+
+
+# Explicit schema for the cleaned price CSV: one small integer code per
+# company instead of a Python string per row, and float32 prices.
+# trade_date is read as a category too, so each chunk parses its few
+# thousand distinct dates once instead of every row (read_csv's own
+# parse_dates is several times slower than the rest of the read).
+PRICE_DTYPES = {
+    "trade_date": "category",
+    "company": "category",
+    "open": np.float32,
+    "high": np.float32,
+    "low": np.float32,
+    "close": np.float32
+}
+
+CHUNK_SIZE = 250_000
+
+
+def peak_rss_mb():
+
+    # Peak resident set size of this process, or None where it is not
+    # available. ru_maxrss is in kilobytes on Linux and bytes on macOS.
+
+    try:
+        import resource
+    except ImportError:
+        return _peak_working_set_mb()
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+
+    return peak / 1024
+
+
+def _peak_working_set_mb():
+
+    if sys.platform != "win32":
+        return None
+
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t)
+        ]
+
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+
+    ok = ctypes.windll.psapi.GetProcessMemoryInfo(
+        ctypes.windll.kernel32.GetCurrentProcess(),
+        ctypes.byref(counters),
+        counters.cb
+    )
+
+    if not ok:
+        return None
+
+    return counters.PeakWorkingSetSize / (1024 * 1024)
+
+
+def read_price_columns(data_path, chunksize=CHUNK_SIZE):
+
+    # Reads the CSV chunk by chunk into compact columns: an int32
+    # company id, int64 trade dates (ns) and a float32 (rows, 4) OHLC
+    # block. Names and dates are normalised per category, not per row.
+
+    ids = {}
+
+    companies = []
+    dates = []
+    prices = []
+
+    reader = pd.read_csv(
+        data_path,
+        usecols=["trade_date", "company"] + PRICE_COLUMNS,
+        dtype=PRICE_DTYPES,
+        chunksize=chunksize
+    )
+
+    for chunk in reader:
+
+        names = (
+            chunk["company"].cat.categories
+            .astype(str)
+            .str.strip()
+            .str.upper()
+        )
+
+        global_ids = np.array(
+            [ids.setdefault(name, len(ids)) for name in names],
+            dtype=np.int32
+        )
+
+        codes = chunk["company"].cat.codes.to_numpy()
+
+        day_codes = chunk["trade_date"].cat.codes.to_numpy()
+
+        days = pd.to_datetime(
+            chunk["trade_date"].cat.categories,
+            errors="coerce"
+        ).to_numpy(dtype="datetime64[ns]")
+
+        # Missing dates (code -1) become NaT.
+        trade_date = np.append(days, np.datetime64("NaT", "ns"))[day_codes]
+
+        block = chunk[PRICE_COLUMNS].to_numpy(dtype=np.float32)
+
+        keep = (
+            (codes >= 0)
+            & ~np.isnat(trade_date)
+            & np.isfinite(block).all(axis=1)
+        )
+
+        companies.append(global_ids[codes[keep]])
+        dates.append(trade_date[keep].view(np.int64))
+        prices.append(block[keep])
+
+    names = list(ids)
+
+    if not companies:
+        return names, np.empty(0, np.int32), np.empty(0, np.int64), np.empty((0, 4), np.float32)
+
+    return (
+        names,
+        np.concatenate(companies),
+        np.concatenate(dates),
+        np.concatenate(prices)
+    )
+
+
+def load_training_matrix(data_path, chunksize=CHUNK_SIZE, horizons=(1,), profiler=NULL_PROFILER):
+
+    # Low-memory equivalent of load_training_frame: the same rows, in
+    # the same (company, trade_date) order, written company by company
+    # into one preallocated float32 FEATURES matrix. No DataFrame of the
+    # full history is ever built. Returns (X, y, dates, encoder, engine);
+    # y has one column per horizon when more than one is asked for.
+
+    with profiler.stage("read_csv") as stage:
+
+        names, companies, dates, prices = read_price_columns(data_path, chunksize)
+
+        stage["rows"] = len(companies)
+
+    print("Dataset Loaded")
+
+    with profiler.stage("features") as stage:
+
+        X, y, row_dates, encoder, counts, companies, dates, prices = _feature_matrix(
+            names,
+            companies,
+            dates,
+            prices,
+            horizons
+        )
+
+        stage["rows"] = len(X)
+
+    print("Feature Engineering Done")
+
+    with profiler.stage("snapshot_state") as stage:
+
+        engine = _engine_from_columns(encoder, counts, companies, dates, prices)
+
+        stage["rows"] = len(engine.index)
+
+    if len(horizons) == 1:
+        y = y[:, 0]
+
+    return X, y, row_dates, encoder, engine
+
+
+def _feature_matrix(names, companies, dates, prices, horizons):
+
+    # LabelEncoder codes are positions in the sorted class list.
+    encoder = LabelEncoder()
+    encoder.classes_ = np.array(sorted(names), dtype=object)
+
+    ranks = np.empty(len(names), dtype=np.int32)
+    ranks[np.argsort(np.array(names, dtype=object))] = np.arange(len(names))
+
+    companies = ranks[companies]
+
+    order = np.lexsort((dates, companies))
+
+    companies = companies[order]
+    dates = dates[order]
+    prices = prices[order]
+
+    del order
+
+    counts = np.bincount(companies, minlength=len(names))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    ahead = max(horizons)
+
+    # Rows survive once prev_close, ma_10 and every future close exist.
+    usable = np.maximum(counts - WINDOW - ahead + 1, 0)
+
+    X = np.empty((int(usable.sum()), len(FEATURES)), dtype=np.float32)
+    y = np.empty((len(X), len(horizons)), dtype=np.float64)
+    row_dates = np.empty(len(X), dtype="datetime64[ns]")
+
+    column = {name: position for position, name in enumerate(FEATURES)}
+
+    position = 0
+
+    for code, (start, count, rows) in enumerate(zip(starts, counts, usable)):
+
+        if not rows:
+            continue
+
+        bars = prices[start:start + count]
+        close = bars[:, 3].astype(np.float64)
+
+        sums = np.concatenate([[0.0], np.cumsum(close)])
+        current = np.arange(WINDOW - 1, count - ahead)
+
+        block = X[position:position + rows]
+
+        block[:, column["company_encoded"]] = code
+        block[:, column["open"]] = bars[current, 0]
+        block[:, column["high"]] = bars[current, 1]
+        block[:, column["low"]] = bars[current, 2]
+        block[:, column["close"]] = close[current]
+        block[:, column["prev_close"]] = close[current - 1]
+        block[:, column["ma_5"]] = (sums[current + 1] - sums[current - 4]) / 5
+        block[:, column["ma_10"]] = (sums[current + 1] - sums[current + 1 - WINDOW]) / WINDOW
+        block[:, column["volatility"]] = (
+            bars[current, 1].astype(np.float64)
+            - bars[current, 2].astype(np.float64)
+        )
+
+        for target, horizon in enumerate(horizons):
+            y[position:position + rows, target] = close[current + horizon]
+        row_dates[position:position + rows] = dates[start + current]
+
+        position += rows
+
+    return X, y, row_dates, encoder, counts, companies, dates, prices
+
+
+def _engine_from_columns(encoder, counts, companies, dates, prices):
+
+    # Seeds the serving ring buffers from the last WINDOW bars of each
+    # company. Going through str restores the CSV's decimal values
+    # instead of their float32 approximations (1641.13, not
+    # 1641.1300048828125), so the snapshot matches the pandas path.
+
+    within = np.arange(len(companies)) - np.repeat(
+        np.cumsum(counts) - counts,
+        counts
+    )
+
+    tail = within >= np.repeat(counts - WINDOW, counts)
+
+    frame = pd.DataFrame(
+        prices[tail].astype(str).astype(np.float64),
+        columns=PRICE_COLUMNS
+    )
+
+    frame["company"] = encoder.classes_[companies[tail]]
+    frame["trade_date"] = dates[tail].view("datetime64[ns]")
+
+    return FeatureEngine.from_frame(frame, encoder_mapping(encoder))
@@ -0,0 +1,284 @@
+import hashlib
+import json
+import math
+import os
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from sklearn.metrics import mean_absolute_error
+
+from backtest import walk_forward_folds
+from features import FEATURES
+from train_model import build_model
+
+
+SEARCH_SPACE = {
+    "max_depth": [4, 5, 6, 8, 10, 12, 16, None],
+    "min_samples_leaf": [1, 2, 5, 10, 20, 50],
+    "max_features": [1.0, 0.8, 0.6, 0.4, "sqrt"]
+}
+
+
+_data = {}
+
+
+def sample_candidates(count, seed=42):
+
+    # Distinct random draws from SEARCH_SPACE, in a fixed order for a
+    # given seed so a resumed search evaluates the same candidates.
+
+    rng = np.random.default_rng(seed)
+
+    total = math.prod(len(values) for values in SEARCH_SPACE.values())
+    count = min(count, total)
+
+    picks = rng.choice(total, size=count, replace=False)
+
+    candidates = []
+
+    for pick in picks:
+
+        params = {}
+
+        for name, values in SEARCH_SPACE.items():
+            pick, position = divmod(int(pick), len(values))
+            params[name] = values[position]
+
+        candidates.append(params)
+
+    return candidates
+
+
+def halving_rounds(candidates, min_trees, max_trees, eta):
+
+    # (n_estimators, survivors) per round: the tree budget grows by eta
+    # while only the best 1/eta of the candidates go on to the next round.
+
+    rounds = []
+    trees = min_trees
+    survivors = candidates
+
+    while True:
+
+        rounds.append((min(trees, max_trees), survivors))
+
+        if survivors <= 1 or trees >= max_trees:
+            return rounds
+
+        trees *= eta
+        survivors = max(1, survivors // eta)
+
+
+def data_fingerprint(X, y, dates):
+
+    digest = hashlib.sha1()
+
+    for array in (X, y, dates.astype("datetime64[ns]").view(np.int64)):
+        digest.update(np.ascontiguousarray(array).tobytes())
+
+    return digest.hexdigest()[:12]
+
+
+def evaluation_key(fingerprint, params, trees, plan):
+
+    text = json.dumps(
+        {
+            "data": fingerprint,
+            "params": params,
+            "n_estimators": trees,
+            "folds": [
+                [str(fold[name])[:10] for name in sorted(fold)]
+                for fold in plan
+            ]
+        },
+        sort_keys=True
+    )
+
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class TuningCache:
+
+    # JSON-lines file of finished evaluations, appended one line per
+    # candidate as soon as it completes, so an interrupted search picks
+    # up where it stopped.
+
+    def __init__(self, path):
+
+        self.path = path
+        self.results = {}
+
+        if path and os.path.exists(path):
+
+            with open(path, encoding="utf-8") as f:
+
+                for line in f:
+
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+
+                    self.results[entry["key"]] = entry
+
+    def get(self, key):
+
+        return self.results.get(key)
+
+    def put(self, entry):
+
+        self.results[entry["key"]] = entry
+
+        if not self.path:
+            return
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _init_worker(X, y, dates):
+
+    _data["X"] = X
+    _data["y"] = y
+    _data["dates"] = dates
+
+
+def _evaluate(key, params, trees, plan):
+
+    X = _data["X"]
+    y = _data["y"]
+    dates = _data["dates"]
+
+    start = time.perf_counter()
+
+    scores = []
+
+    for fold in plan:
+
+        train_rows = (dates >= fold["train_start"]) & (dates <= fold["train_end"])
+        test_rows = (dates >= fold["test_start"]) & (dates <= fold["test_end"])
+
+        model = build_model(**params, n_estimators=trees, n_jobs=1)
+        model.fit(X[train_rows], y[train_rows])
+
+        scores.append(mean_absolute_error(y[test_rows], model.predict(X[test_rows])))
+
+    return {
+        "key": key,
+        "params": params,
+        "n_estimators": trees,
+        "fold_mae": [float(score) for score in scores],
+        "mae": float(np.mean(scores)),
+        "seconds": time.perf_counter() - start
+    }
+
+
+def run_search(
+    df,
+    candidates=24,
+    min_trees=10,
+    max_trees=200,
+    eta=3,
+    folds=3,
+    workers=None,
+    cache_path=None,
+    seed=42,
+    gap=1
+):
+
+    # Successive halving over time-ordered validation folds: every
+    # candidate is scored with a small forest, then only the best 1/eta
+    # are refit with eta times more trees, until one is left or the
+    # tree budget is reached. The folds purge `gap` trading days before
+    # each validation block, as in the backtest, so candidates are not
+    # ranked on labels that overlap it.
+
+    df = df.sort_values(["trade_date", "company"])
+
+    X = df[FEATURES].to_numpy(dtype=np.float64)
+    y = df["target"].to_numpy(dtype=np.float64)
+    dates = df["trade_date"].to_numpy()
+
+    plan = walk_forward_folds(dates, folds=folds, gap=gap)
+    fingerprint = data_fingerprint(X, y, dates)
+    cache = TuningCache(cache_path)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    pool = sample_candidates(candidates, seed=seed)
+    rounds = halving_rounds(len(pool), min_trees, max_trees, eta)
+
+    started = time.perf_counter()
+    history = []
+
+    with ProcessPoolExecutor(
+        max_workers=max(1, workers),
+        initializer=_init_worker,
+        initargs=(X, y, dates)
+    ) as executor:
+
+        for number, (trees, survivors) in enumerate(rounds, start=1):
+
+            pool = pool[:survivors]
+
+            results = []
+            pending = []
+
+            for params in pool:
+
+                key = evaluation_key(fingerprint, params, trees, plan)
+                cached = cache.get(key)
+
+                if cached is not None:
+                    results.append(cached)
+                else:
+                    pending.append(executor.submit(_evaluate, key, params, trees, plan))
+
+            print(
+                f"Round {number}/{len(rounds)}: {len(pool)} candidates"
+                f" x {trees} trees ({len(results)} cached)"
+            )
+
+            for future in pending:
+
+                result = future.result()
+                cache.put(result)
+                results.append(result)
+
+            results.sort(key=lambda result: result["mae"])
+
+            history.append({
+                "n_estimators": trees,
+                "results": [
+                    {"params": r["params"], "mae": r["mae"]}
+                    for r in results
+                ]
+            })
+
+            print(f"  best MAE {results[0]['mae']:.3f} with {results[0]['params']}")
+
+            pool = [result["params"] for result in results]
+
+    best = results[0]
+
+    return {
+        # Structural parameters only; the last round's tree count is a
+        # search budget, not a recommendation.
+        "params": best["params"],
+        "n_estimators": best["n_estimators"],
+        "mae": best["mae"],
+        "gap": gap,
+        "folds": [
+            {name: str(value)[:10] for name, value in fold.items()}
+            for fold in plan
+        ],
+        "rounds": history,
+        "data": fingerprint,
+        "seconds": time.perf_counter() - started
+    }